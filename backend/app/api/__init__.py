@@ -1,5 +1,11 @@
 from fastapi import APIRouter
 from .projects import router as projects_router
+from .batches import router as batches_router
+from .storage import router as storage_router
+from .admin import router as admin_router
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(projects_router)
+api_router.include_router(batches_router)
+api_router.include_router(storage_router)
+api_router.include_router(admin_router)
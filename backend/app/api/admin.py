@@ -0,0 +1,93 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from ..config import get_settings
+from ..services.admission_service import analysis_admission, generation_admission
+from ..services.credential_pool import groq_pool, replicate_pool
+from ..services.lifecycle_service import lifecycle_service
+from ..services.music_library import music_library
+from ..services.profiling_service import profiling_service
+
+settings = get_settings()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(settings.admin_token) and token is not None and hmac.compare_digest(
+        token.encode(), settings.admin_token.encode()
+    )
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """관리자 토큰 확인 (토큰 미설정 시 관리자 API 비활성)"""
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """저장된 프로파일 캡처 목록 (헤더 요청 + 느린 요청)"""
+    if not profiling_service.enabled:
+        raise HTTPException(status_code=404, detail="Profiling disabled")
+    return {"captures": profiling_service.list_captures()}
+
+
+@router.get("/profiles/{capture_id}")
+async def download_profile(capture_id: str):
+    """folded 스택 다운로드 (flamegraph.pl / speedscope 호환)"""
+    capture = profiling_service.get_capture(capture_id)
+    if not capture:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return PlainTextResponse(
+        capture["folded"],
+        headers={"Content-Disposition": f'attachment; filename="profile-{capture_id}.folded"'},
+    )
+
+
+@router.get("/profiling/loop")
+async def loop_stats():
+    """이벤트 루프 지연 / 블로킹 기록"""
+    return profiling_service.loop_stats()
+
+
+@router.get("/storage")
+async def storage_usage():
+    """저장소 사용량 (사용자별) + 마지막 수명 주기 스윕 결과"""
+    return lifecycle_service.usage_report()
+
+
+@router.post("/storage/sweep")
+async def run_storage_sweep():
+    """수명 주기 스윕 즉시 실행 (TTL 만료, 고아 파일, 할당량)"""
+    return await lifecycle_service.sweep()
+
+
+@router.get("/credentials")
+async def credential_usage():
+    """제공자 API 키별 사용량 (요청 수, 실행 중, 429 횟수, 남은 쿨다운)"""
+    return {pool.provider: pool.usage() for pool in (groq_pool, replicate_pool)}
+
+
+@router.get("/admission")
+async def admission_usage():
+    """입장 제어 현황 (용량, 실행 중, 레인별 대기 수와 새 요청의 예상 대기 시간)"""
+    return {controller.kind: controller.snapshot() for controller in (analysis_admission, generation_admission)}
+
+
+@router.get("/music")
+async def music_index():
+    """배경 음악 인덱스 (곡별 길이/BPM/라우드니스/분위기)"""
+    return music_library.snapshot()
+
+
+@router.post("/music/reindex")
+async def reindex_music(force: bool = False):
+    """배경 음악 인덱스 갱신 (force면 모든 곡 다시 분석)"""
+    if not music_library.available:
+        raise HTTPException(status_code=404, detail="Music library disabled")
+    return await music_library.refresh(force=force)
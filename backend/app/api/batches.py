@@ -0,0 +1,305 @@
+import uuid
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks, Header
+from typing import Optional
+from pydantic import ValidationError
+
+from ..models.schemas import (
+    BatchCreate,
+    BatchProjectStatus,
+    BatchResponse,
+    ProjectStatus,
+)
+from ..services import gemini_service, storage_service
+from ..services.admission_service import Ticket, analysis_admission, lane_for
+from ..services.dedup_service import dedup_service, duplicate_map
+from ..services.eta_service import eta_service
+from ..services.gemini_service import with_duplicates
+from ..services.lifecycle_service import lifecycle_service
+from ..services.metrics_service import projects_in_flight, track_stage
+from ..config import get_settings
+from .projects import (
+    PROGRESS_MAP,
+    projects_db,
+    _new_project,
+    _admit,
+    _check_quota,
+    _set_status,
+    _acquire_generation,
+    _generate_video_task,
+    _create_thumbnail_task,
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batches", tags=["batches"])
+
+# In-memory 배치 저장소 (projects_db와 동일)
+batches_db: dict = {}
+
+
+def _project_progress(project: dict, generate: bool) -> int:
+    # 분석이 끝난 DRAFT는 생성 대기(25) 또는 분석 전용 배치의 완료(100)
+    if project["status"] == ProjectStatus.DRAFT and project.get("photo_analyses"):
+        return 25 if generate else 100
+    return PROGRESS_MAP.get(project["status"], 0)
+
+
+def _batch_response(batch: dict) -> BatchResponse:
+    projects = []
+    status_counts: dict[str, int] = {}
+    for project_id in batch["project_ids"]:
+        project = projects_db.get(project_id)
+        if project is None:
+            continue  # 개별 삭제된 프로젝트
+        status = project["status"]
+        status_counts[status.value] = status_counts.get(status.value, 0) + 1
+        projects.append(BatchProjectStatus(
+            id=project_id,
+            title=project["title"],
+            status=status,
+            progress=_project_progress(project, batch["generate"]),
+            video_url=project.get("video_url"),
+            error=project.get("error"),
+        ))
+
+    return BatchResponse(
+        id=batch["id"],
+        status=batch["status"],
+        progress=sum(p.progress for p in projects) // len(projects) if projects else 100,
+        project_count=len(projects),
+        unique_photo_count=batch["unique_photo_count"],
+        status_counts=status_counts,
+        projects=projects,
+        created_at=batch["created_at"],
+        completed_at=batch["completed_at"],
+    )
+
+
+@router.post("", response_model=BatchResponse)
+async def create_batch(
+    background_tasks: BackgroundTasks,
+    spec: str = Form(...),
+    files: list[UploadFile] = File(...),
+    x_api_key: Optional[str] = Header(None),
+):
+    """여러 프로젝트 일괄 생성
+
+    spec: BatchCreate JSON, 각 프로젝트의 photos는 함께 업로드한 파일명.
+    같은 사진(내용 기준)은 프로젝트가 여러 개여도 한 번만 분석.
+    사진 분석은 단일 프로젝트 분석과 같은 입장 제어를 거침 (과부하면 429 + Retry-After).
+    """
+    try:
+        batch_spec = BatchCreate.model_validate_json(spec)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch spec: {e}")
+
+    if not batch_spec.projects:
+        raise HTTPException(status_code=400, detail="No projects in batch")
+    if len(batch_spec.projects) > settings.batch_max_projects:
+        raise HTTPException(
+            status_code=400, detail=f"Maximum {settings.batch_max_projects} projects per batch"
+        )
+
+    # 파일명 -> 내용 해시 (중복 사진은 한 번만 보관)
+    photo_keys: dict[str, str] = {}
+    photo_data: dict[str, bytes] = {}
+    photo_names: dict[str, str] = {}
+    for file in files:
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail=f"Invalid file type: {file.filename}")
+        data = await file.read()
+        key = hashlib.sha1(data).hexdigest()
+        photo_keys[file.filename] = key
+        photo_data.setdefault(key, data)
+        photo_names.setdefault(key, file.filename)
+
+    project_photo_keys = []
+    for item in batch_spec.projects:
+        names = list(dict.fromkeys(item.photos))
+        if not names:
+            raise HTTPException(status_code=400, detail="No photos for project")
+        if len(names) > 10:
+            raise HTTPException(status_code=400, detail="Maximum 10 photos allowed")
+        missing = [name for name in names if name not in photo_keys]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Photos not uploaded: {', '.join(missing)}")
+        project_photo_keys.append(list(dict.fromkeys(photo_keys[name] for name in names)))
+
+    # 같은 사진도 프로젝트마다 따로 저장되므로 저장될 총량 기준
+    _check_quota(
+        {"owner_id": batch_spec.owner_id},
+        sum(len(photo_data[key]) for keys in project_photo_keys for key in keys),
+    )
+    # 고유 사진 수 기준 - 프로젝트를 만들기 전에 거절
+    ticket = _admit(
+        analysis_admission,
+        lane_for(x_api_key),
+        eta_service.quantiles("analysis", "vision")[0] * len(photo_data),
+    )
+
+    batch_id = str(uuid.uuid4())
+    project_ids = []
+    for item in batch_spec.projects:
+        project = _new_project(item.title, batch_spec.owner_id)
+        project.update(
+            status=ProjectStatus.ANALYZING,
+            narrative=item.narrative,
+            style=item.style.value,
+            batch_id=batch_id,
+            stage="analysis",
+            stage_started_at=time.time(),
+        )
+        projects_db[project["id"]] = project
+        project_ids.append(project["id"])
+        await lifecycle_service.register(project["id"], batch_spec.owner_id)
+
+    batches_db[batch_id] = {
+        "id": batch_id,
+        "status": ProjectStatus.ANALYZING,
+        "project_ids": project_ids,
+        "generate": batch_spec.generate,
+        "unique_photo_count": len(photo_data),
+        "created_at": datetime.now(),
+        "completed_at": None,
+    }
+
+    background_tasks.add_task(_run_batch, batch_id, project_photo_keys, photo_data, photo_names, ticket)
+
+    return _batch_response(batches_db[batch_id])
+
+
+@router.get("/{batch_id}", response_model=BatchResponse)
+async def get_batch(batch_id: str):
+    """배치 진행 상황 (프로젝트별 상태 + 전체 진행률)"""
+    if batch_id not in batches_db:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return _batch_response(batches_db[batch_id])
+
+
+async def _run_batch(
+    batch_id: str,
+    project_photo_keys: list[list[str]],
+    photo_data: dict[str, bytes],
+    photo_names: dict[str, str],
+    ticket: Ticket,
+):
+    """백그라운드 배치 태스크: 사진 저장 -> 고유 사진 분석 -> 프로젝트별 스크립트/렌더링
+
+    ticket: 분석 입장 제어 항목 - 슬롯을 받은 뒤 분석, 분석이 끝나면 반환
+    """
+    batch = batches_db[batch_id]
+    project_ids = batch["project_ids"]
+    # (project_id, 사진 해시) -> 프로젝트 내 photo_id
+    photo_ids: dict[tuple[str, str], str] = {}
+    thumbnail_tasks = []
+
+    projects_in_flight.labels("analyzing").inc(len(project_ids))
+    try:
+        async with ticket:
+            async with track_stage("batch_analysis"):
+                # 1. 프로젝트별 사진 저장 (생성 파이프라인은 프로젝트 단위로 사진을 읽음)
+                for project_id, keys in zip(project_ids, project_photo_keys):
+                    for key in keys:
+                        photo_id = await storage_service.upload_photo(project_id, photo_data[key], photo_names[key])
+                        lifecycle_service.note_write(project_id, len(photo_data[key]))
+                        photo_ids[(project_id, key)] = photo_id
+                        projects_db[project_id]["photos"].append({"id": photo_id, "filename": photo_names[key]})
+
+                    if settings.preview_enabled:
+                        thumbnail_tasks.append(asyncio.create_task(
+                            _create_thumbnail_task(project_id, photo_data[keys[0]])
+                        ))
+
+                # 2. 고유 사진만 분석 (거의 같은 사진은 대표 사진 결과 공유)
+                semaphore = asyncio.Semaphore(settings.batch_analysis_concurrency)
+
+                async def analyze(key: str):
+                    async with semaphore:
+                        return await gemini_service.analyze_image(photo_data[key], key)
+
+                unique_keys = list(dict.fromkeys(key for keys in project_photo_keys for key in keys))
+                duplicate_groups = await dedup_service.find_duplicate_groups(
+                    [(key, photo_data[key]) for key in unique_keys]
+                )
+                duplicate_of = duplicate_map(duplicate_groups)
+                representatives = [key for key in unique_keys if key not in duplicate_of]
+                results = await asyncio.gather(*(analyze(key) for key in representatives), return_exceptions=True)
+                analyses = dict(zip(representatives, results))
+                analyses.update({key: analyses[rep] for key, rep in duplicate_of.items()})
+                await asyncio.gather(*thumbnail_tasks)
+    except Exception as e:
+        logger.warning("Batch %s failed before analysis: %s", batch_id, e)
+        analyses, duplicate_groups = {}, []
+        for project_id in project_ids:
+            await _set_status(project_id, ProjectStatus.FAILED, error=str(e))
+    finally:
+        projects_in_flight.labels("analyzing").dec(len(project_ids))
+
+    # 3. 프로젝트별 요약 -> 스크립트/렌더링 (같은 사진 조합의 요약은 재사용)
+    batch["status"] = ProjectStatus.GENERATING if batch["generate"] else ProjectStatus.ANALYZING
+    summaries: dict[tuple[str, ...], asyncio.Task] = {}
+    generation_semaphore = asyncio.Semaphore(settings.batch_generation_concurrency)
+
+    async def run_project(project_id: str, keys: list[str]):
+        if project_id not in projects_db or projects_db[project_id]["status"] == ProjectStatus.FAILED:
+            return
+        failed = [analyses.get(key) for key in keys if not isinstance(analyses.get(key), dict)]
+        if failed:
+            await _set_status(project_id, ProjectStatus.FAILED, error=f"Analysis failed: {failed[0]}")
+            return
+
+        project_photo_ids = [photo_ids[(project_id, key)] for key in keys]
+        project_groups = [
+            [photo_ids[(project_id, key)] for key in group if key in keys]
+            for group in duplicate_groups
+        ]
+        project_groups = [group for group in project_groups if len(group) > 1]
+        photo_analyses = with_duplicates(
+            project_photo_ids,
+            {photo_ids[(project_id, key)]: {**analyses[key], "photo_id": photo_ids[(project_id, key)]} for key in keys},
+            project_groups,
+        )
+        summary_key = tuple(sorted(keys))
+        if summary_key not in summaries:
+            summaries[summary_key] = asyncio.create_task(
+                gemini_service.summarize_analyses(photo_analyses, project_groups)
+            )
+        try:
+            summary = await summaries[summary_key]
+        except Exception as e:
+            await _set_status(project_id, ProjectStatus.FAILED, error=f"Analysis failed: {e}")
+            return
+
+        # 분석 완료, 생성 대기
+        await _set_status(
+            project_id,
+            ProjectStatus.DRAFT,
+            photo_analyses={**summary, "photos": photo_analyses, "duplicate_groups": project_groups},
+        )
+        if not batch["generate"]:
+            return
+
+        async with generation_semaphore:
+            if project_id not in projects_db:
+                return
+            job_id, acquired = await _acquire_generation(project_id)
+            if not acquired:
+                return  # 개별 generate 요청으로 이미 실행 중
+            await _set_status(project_id, ProjectStatus.GENERATING, generation_job_id=job_id)
+            await _generate_video_task(project_id, job_id)
+
+    await asyncio.gather(*(
+        run_project(project_id, keys) for project_id, keys in zip(project_ids, project_photo_keys)
+    ))
+
+    statuses = [projects_db[pid]["status"] for pid in project_ids if pid in projects_db]
+    all_failed = statuses and all(status == ProjectStatus.FAILED for status in statuses)
+    batch["status"] = ProjectStatus.FAILED if all_failed else ProjectStatus.COMPLETED
+    batch["completed_at"] = datetime.now()
@@ -1,6 +1,10 @@
 import uuid
-from datetime import datetime
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Request, Header, Query
+from fastapi.responses import JSONResponse, Response
 from typing import Optional
 
 from ..models.schemas import (
@@ -10,23 +14,164 @@ from ..models.schemas import (
     ProjectStatus,
     AnalysisResponse,
     GenerationStatusResponse,
+    RenderMode,
 )
-from ..services import gemini_service, groq_service, replicate_service, storage_service
+from ..services import (
+    gemini_service,
+    groq_service,
+    replicate_service,
+    storage_service,
+    video_delivery_service,
+    preview_service,
+)
+from ..services.admission_service import (
+    STANDARD,
+    AdmissionController,
+    Overloaded,
+    Ticket,
+    analysis_admission,
+    generation_admission,
+    lane_for,
+)
+from ..services.assembly_service import assembly_service
+from ..services.music_library import music_library
+from ..services import text_overlay
+from ..services.metrics_service import forget_project, projects_in_flight, span, track_stage
+from ..services.eta_service import eta_service
+from ..services.lease_service import idempotency_store, lease_service
+from ..services.lifecycle_service import QuotaExceeded, lifecycle_service
+from ..services.storage_service import CLIP_PREFIX
+from ..services.render_router import DRAFT, FULL, LOCAL, render_router
+from ..services.status_cache import status_cache
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 # In-memory 프로젝트 저장소 (실제로는 DB 사용)
 projects_db: dict = {}
 
+# 진행 중인 초안 -> full 교체 태스크 (GC 방지용 참조)
+_upgrade_tasks: set = set()
+
+# 진행률 계산 (간단한 예시)
+PROGRESS_MAP = {
+    ProjectStatus.DRAFT: 0,
+    ProjectStatus.ANALYZING: 25,
+    ProjectStatus.GENERATING: 50,
+    ProjectStatus.COMPLETED: 100,
+    ProjectStatus.FAILED: 0,
+}
+
+STATUS_MESSAGES = {
+    ProjectStatus.DRAFT: "Ready to generate",
+    ProjectStatus.ANALYZING: "Analyzing photos...",
+    ProjectStatus.GENERATING: "Generating video...",
+    ProjectStatus.COMPLETED: "Video ready!",
+}
+
+
+def _eta_steps(project: dict) -> list[tuple[str, int, str]]:
+    """현재 단계부터 남은 단계 목록 [(stage, units, model)]"""
+    photo_count = len(project["photos"]) or 1
+    stage = project.get("stage")
+    if project["status"] == ProjectStatus.ANALYZING:
+        return [("analysis", photo_count, "vision")]
+    if project["status"] != ProjectStatus.GENERATING:
+        return []
+
+    render_model = project["render_request"]["mode"] if project["render_request"]["mode"] in (DRAFT, LOCAL) else FULL
+    # 스크립트 전에는 중복을 제외한 사진 수만큼 씬이 있다고 가정
+    scene_count = project["scenes_total"] or len(
+        [photo for photo in (project.get("photo_analyses") or {}).get("photos", []) if not photo.get("duplicate_of")]
+    ) or photo_count
+    steps = []
+    if stage in ("queued", "script"):
+        steps.append(("script", photo_count, groq_service.model))
+    if stage in ("queued", "script", "render"):
+        steps.append(("render_scene", max(scene_count - project["scenes_done"], 0), render_model))
+    if assembly_service.available:
+        steps.append(("assemble", scene_count, "default"))
+    elif settings.video_ingest_enabled:
+        steps.append(("ingest", 1, "default"))
+    return [step for step in steps if step[1] > 0]
+
+
+def _status_payload(project_id: str, project: dict) -> dict:
+    """GET /status 응답 본문 (ETA는 상태가 갱신되는 시점 기준, 조회 시 _fresh_payload로 보정)"""
+    status = project["status"]
+    if status == ProjectStatus.FAILED:
+        message = f"Failed: {project.get('error', 'Unknown error')}"
+    elif status == ProjectStatus.COMPLETED and project.get("upgrading"):
+        message = "Draft ready, upgrading to full quality..."
+    elif status == ProjectStatus.GENERATING and project.get("stage") == "queued":
+        message = f"Queued for generation (position {project.get('queue_position')})"
+    else:
+        message = STATUS_MESSAGES.get(status, "Unknown status")
+
+    eta = None
+    if project.get("stage_started_at"):
+        elapsed = time.time() - project["stage_started_at"]
+        if project.get("stage") == "queued":
+            # 대기열: 남은 대기 시간 + 전체 단계
+            eta = eta_service.estimate(_eta_steps(project))
+            wait = max(project.get("queue_wait_seconds", 0.0) - elapsed, 0.0)
+            if eta:
+                eta["eta_seconds"] = round(eta["eta_seconds"] + wait, 1)
+                eta["eta_p90_seconds"] = round(eta["eta_p90_seconds"] + wait, 1)
+        else:
+            eta = eta_service.estimate(_eta_steps(project), elapsed)
 
-@router.post("", response_model=ProjectResponse)
-async def create_project(project: ProjectCreate = None):
-    """새 프로젝트 생성"""
+    return GenerationStatusResponse(
+        project_id=project_id,
+        status=status,
+        progress=PROGRESS_MAP.get(status, 0),
+        message=message,
+        video_url=project.get("video_url"),
+        hls_url=project.get("hls_url"),
+        quality=project.get("quality"),
+        upgrading=project.get("upgrading", False),
+        queue_position=project.get("queue_position"),
+        eta_seconds=eta and eta["eta_seconds"],
+        eta_p90_seconds=eta and eta["eta_p90_seconds"],
+        eta_confidence=eta and eta["confidence"],
+        estimated_completion_at=eta and datetime.now() + timedelta(seconds=eta["eta_seconds"]),
+        poll_interval_seconds=eta_service.poll_interval(eta and eta["eta_seconds"]),
+    ).model_dump(mode="json")
+
+
+async def _mark_stage(project_id: str, stage: str, **fields):
+    """파이프라인 단계 시작 기록 + 상태 캐시 갱신 (ETA 재계산)"""
+    project = projects_db.get(project_id)
+    if project is None:
+        return
+    await _set_status(project_id, project["status"], stage=stage, stage_started_at=time.time(), **fields)
+
+
+async def _set_status(project_id: str, status: ProjectStatus, **fields):
+    """상태 변경 + 상태 캐시 갱신 (모든 상태 전이는 이 함수를 통해)"""
+    project = projects_db.get(project_id)
+    if project is None:
+        return  # 진행 중 삭제된 프로젝트
+    project["status"] = status
+    project.update(fields)
+    await status_cache.set(project_id, _status_payload(project_id, project))
+
+
+def _new_project(title: Optional[str] = None, owner_id: Optional[str] = None) -> dict:
+    """projects_db에 넣을 새 프로젝트 레코드"""
     project_id = str(uuid.uuid4())
+    # 이후 단계 span이 link할 프로젝트 시작 span
+    with span("project.create", project_id=project_id):
+        pass
 
-    projects_db[project_id] = {
+    now = datetime.now()
+    return {
         "id": project_id,
-        "title": project.title if project else None,
+        "title": title,
+        "owner_id": owner_id,
         "status": ProjectStatus.DRAFT,
         "photos": [],
         "photo_analyses": [],
@@ -34,10 +179,103 @@ async def create_project(project: ProjectCreate = None):
         "style": None,
         "script": None,
         "video_url": None,
-        "created_at": datetime.now(),
+        "hls_url": None,
+        # 저장소에 있는 최종 영상 (교체 시 이전 영상 삭제용)
+        "video_id": None,
+        "thumbnail_url": None,
+        "storyboard_url": None,
+        "poster_urls": [],
+        # 서사/분석이 바뀔 때마다 증가 - 같은 버전은 한 번만 생성
+        "script_version": 1,
+        "generation_job_id": None,
+        "generated_script_version": None,
+        # 렌더 모드 요청 / 씬별 결과 (초안 교체용)
+        "render_request": {"mode": RenderMode.AUTO.value, "deadline_seconds": None, "upgrade": True},
+        "scene_videos": [],
+        "quality": None,
+        "upgrading": False,
+        # 최종 영상 배경 음악 (라이브러리 파일 이름)
+        "music_track": None,
+        # ETA 계산용 진행 단계 (stage_started_at: epoch 초)
+        "stage": None,
+        "stage_started_at": None,
+        # 입장 제어 대기열 순서 / 예상 대기 시간 (stage == "queued"일 때)
+        "queue_position": None,
+        "queue_wait_seconds": None,
+        "scenes_total": 0,
+        "scenes_done": 0,
+        "created_at": now,
         "completed_at": None,
+        # 수명 주기 TTL / 할당량 LRU 기준 (사용자 요청 시 갱신)
+        "last_accessed_at": now,
     }
 
+
+def _touch(project: dict):
+    project["last_accessed_at"] = datetime.now()
+
+
+def _check_quota(project: dict, incoming: int):
+    """저장소 할당량 초과 시 업로드 거부 (사용자 할당량 413, 전체 용량 507)"""
+    try:
+        lifecycle_service.check_quota(project.get("owner_id"), incoming)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=413 if e.scope == "user" else 507, detail=str(e))
+
+
+def _admit(controller: AdmissionController, lane: str, expected_seconds: float) -> Ticket:
+    """입장 제어 - 예상 대기 시간이 한도를 넘으면 429 + Retry-After"""
+    try:
+        return controller.admit(lane, expected_seconds)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def _generation_seconds(project: dict, mode: str) -> float:
+    """생성 작업 하나의 예상 소요 시간 (뒤에 들어온 요청의 대기 시간 추정용)"""
+    eta = eta_service.estimate(_eta_steps({
+        **project,
+        "status": ProjectStatus.GENERATING,
+        "stage": "script",
+        "scenes_total": 0,
+        "scenes_done": 0,
+        "render_request": {**project["render_request"], "mode": mode},
+    }))
+    return eta["eta_seconds"] if eta else 0.0
+
+
+async def _remove_project(project_id: str):
+    """프로젝트 파일 + 레코드 + 상태 캐시 삭제 (DELETE 요청, 수명 주기 만료)"""
+    await storage_service.delete_project_files(project_id)
+    projects_db.pop(project_id, None)
+    await lifecycle_service.unregister(project_id)
+    forget_project(project_id)
+    await status_cache.invalidate(project_id)
+
+
+async def _clear_derived(project_id: str):
+    """수명 주기 관리자가 파생 파일(미리보기/HLS/씬 클립)을 정리한 뒤 URL 제거"""
+    project = projects_db.get(project_id)
+    if project is None:
+        return
+    project.update(thumbnail_url=None, storyboard_url=None, poster_urls=[])
+    # 정리된 씬 클립은 다시 조립에 쓰지 않음
+    project["scene_videos"] = [
+        {**video, "video_id": None, "video_url": None}
+        if str(video.get("video_id") or "").startswith(CLIP_PREFIX) else video
+        for video in project["scene_videos"]
+    ]
+    await _set_status(project_id, project["status"], hls_url=None)
+
+
+@router.post("", response_model=ProjectResponse)
+async def create_project(project: ProjectCreate = None):
+    """새 프로젝트 생성"""
+    record = _new_project(project.title if project else None, project.owner_id if project else None)
+    project_id = record["id"]
+    projects_db[project_id] = record
+    await lifecycle_service.register(project_id, record["owner_id"])
+
     return ProjectResponse(
         id=project_id,
         title=projects_db[project_id]["title"],
@@ -57,6 +295,7 @@ async def get_project(project_id: str):
         raise HTTPException(status_code=404, detail="Project not found")
 
     project = projects_db[project_id]
+    _touch(project)
     return ProjectResponse(
         id=project_id,
         title=project["title"],
@@ -64,13 +303,29 @@ async def get_project(project_id: str):
         photo_count=len(project["photos"]),
         narrative=project["narrative"],
         video_url=project["video_url"],
+        hls_url=project.get("hls_url"),
+        thumbnail_url=project.get("thumbnail_url"),
+        storyboard_url=project.get("storyboard_url"),
+        poster_urls=project.get("poster_urls", []),
         created_at=project["created_at"],
         completed_at=project["completed_at"],
     )
 
 
+async def _create_thumbnail_task(project_id: str, photo_data: bytes):
+    """프로젝트 목록용 썸네일 생성"""
+    try:
+        thumbnail_url = await preview_service.create_thumbnail(project_id, photo_data)
+        if project_id in projects_db:
+            projects_db[project_id]["thumbnail_url"] = thumbnail_url
+    except Exception as e:
+        logger.warning("Thumbnail failed for %s: %s", project_id, e)
+
+
 @router.post("/{project_id}/photos")
-async def upload_photos(project_id: str, files: list[UploadFile] = File(...)):
+async def upload_photos(
+    project_id: str, background_tasks: BackgroundTasks, files: list[UploadFile] = File(...)
+):
     """사진 업로드 (여러 장)"""
     if project_id not in projects_db:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -78,19 +333,29 @@ async def upload_photos(project_id: str, files: list[UploadFile] = File(...)):
     if len(files) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 photos allowed")
 
+    project = projects_db[project_id]
+    _touch(project)
     uploaded_photos = []
+    first_photo_data = None
     for file in files:
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail=f"Invalid file type: {file.filename}")
 
         photo_data = await file.read()
+        _check_quota(project, len(photo_data))
         photo_id = await storage_service.upload_photo(project_id, photo_data, file.filename)
+        lifecycle_service.note_write(project_id, len(photo_data))
 
         projects_db[project_id]["photos"].append({
             "id": photo_id,
             "filename": file.filename,
         })
         uploaded_photos.append({"id": photo_id, "filename": file.filename})
+        first_photo_data = first_photo_data or photo_data
+
+    # 첫 사진으로 썸네일 생성 (목록용)
+    if settings.preview_enabled and first_photo_data and not projects_db[project_id].get("thumbnail_url"):
+        background_tasks.add_task(_create_thumbnail_task, project_id, first_photo_data)
 
     return {
         "message": f"{len(uploaded_photos)} photos uploaded",
@@ -104,95 +369,394 @@ async def set_narrative(project_id: str, narrative_input: NarrativeInput):
     if project_id not in projects_db:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    projects_db[project_id]["narrative"] = narrative_input.narrative
-    projects_db[project_id]["style"] = narrative_input.style.value
+    project = projects_db[project_id]
+    _touch(project)
+    if (project["narrative"], project["style"]) != (narrative_input.narrative, narrative_input.style.value):
+        project["script_version"] += 1
+    project["narrative"] = narrative_input.narrative
+    project["style"] = narrative_input.style.value
 
     return {"message": "Narrative saved", "narrative": narrative_input.narrative}
 
 
 @router.post("/{project_id}/analyze", response_model=AnalysisResponse)
-async def analyze_photos(project_id: str):
-    """사진 분석 시작"""
+async def analyze_photos(project_id: str, x_api_key: Optional[str] = Header(None)):
+    """사진 분석 시작
+
+    동시 분석이 용량을 넘으면 슬롯이 빌 때까지 기다리고,
+    예상 대기 시간이 한도를 넘으면 429 (Retry-After).
+    """
     if project_id not in projects_db:
         raise HTTPException(status_code=404, detail="Project not found")
 
     project = projects_db[project_id]
+    _touch(project)
 
     if not project["photos"]:
         raise HTTPException(status_code=400, detail="No photos uploaded")
 
-    # 상태 업데이트
-    project["status"] = ProjectStatus.ANALYZING
-
-    # 모든 사진 로드
-    images = []
-    all_photos = await storage_service.get_all_photos(project_id)
+    ticket = _admit(
+        analysis_admission,
+        lane_for(x_api_key),
+        eta_service.quantiles("analysis", "vision")[0] * len(project["photos"]),
+    )
+    async with ticket:
+        # 상태 업데이트
+        await _set_status(project_id, ProjectStatus.ANALYZING, stage="analysis", stage_started_at=time.time())
+        projects_in_flight.labels("analyzing").inc()
+
+        # 모든 사진 로드
+        images = []
+        all_photos = await storage_service.get_all_photos(project_id)
+
+        for photo in project["photos"]:
+            photo_id = photo["id"]
+            if photo_id in all_photos:
+                images.append((photo_id, all_photos[photo_id]))
+
+        # Gemini로 분석 (무료)
+        try:
+            async with track_stage("analysis", project_id), eta_service.timed("analysis", len(images), "vision"):
+                analysis_result = await gemini_service.analyze_all_images(images)
+            # 분석 완료, 생성 대기
+            await _set_status(
+                project_id,
+                ProjectStatus.DRAFT,
+                photo_analyses=analysis_result,
+                script_version=project["script_version"] + 1,
+            )
+
+            return AnalysisResponse(
+                project_id=project_id,
+                photos=analysis_result["photos"],
+                overall_theme=analysis_result["overall_theme"],
+                suggested_narrative_arc=analysis_result["suggested_narrative_arc"],
+                emotional_journey=analysis_result["emotional_journey"],
+                duplicate_groups=analysis_result.get("duplicate_groups", []),
+                color_profile=analysis_result.get("color_profile"),
+            )
+        except Exception as e:
+            await _set_status(project_id, ProjectStatus.FAILED, error=str(e))
+            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        finally:
+            projects_in_flight.labels("analyzing").dec()
+
+
+async def _create_storyboard_task(project_id: str, scenes: list[dict], images: dict[str, bytes]):
+    """렌더링 대기 중 보여줄 스토리보드 생성"""
+    try:
+        storyboard_url = await preview_service.create_storyboard(project_id, scenes, images)
+        if project_id in projects_db:
+            projects_db[project_id]["storyboard_url"] = storyboard_url
+    except Exception as e:
+        logger.warning("Storyboard failed for %s: %s", project_id, e)
 
-    for photo in project["photos"]:
-        photo_id = photo["id"]
-        if photo_id in all_photos:
-            images.append((photo_id, all_photos[photo_id]))
 
-    # Gemini로 분석 (무료)
+async def _create_poster(project_id: str, scene_video: dict):
+    """완료된 씬 클립의 포스터 프레임 생성"""
+    if not settings.preview_enabled or not scene_video.get("video_url"):
+        return
+    if scene_video.get("video_id"):
+        return  # 로컬 렌더링 클립 - 원본 사진과 같은 장면이라 스토리보드로 충분
     try:
-        analysis_result = await gemini_service.analyze_all_images(images)
-        project["photo_analyses"] = analysis_result
-        project["status"] = ProjectStatus.DRAFT  # 분석 완료, 생성 대기
-
-        return AnalysisResponse(
-            project_id=project_id,
-            photos=analysis_result["photos"],
-            overall_theme=analysis_result["overall_theme"],
-            suggested_narrative_arc=analysis_result["suggested_narrative_arc"],
-            emotional_journey=analysis_result["emotional_journey"],
-        )
+        poster_url = await preview_service.create_poster(project_id, scene_video["video_url"])
+        if poster_url and project_id in projects_db:
+            projects_db[project_id]["poster_urls"].append(poster_url)
     except Exception as e:
-        project["status"] = ProjectStatus.FAILED
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        logger.warning("Poster failed for %s: %s", project_id, e)
 
 
-async def _generate_video_task(project_id: str):
-    """백그라운드 영상 생성 태스크"""
-    project = projects_db[project_id]
+def _generation_lease_key(project_id: str) -> str:
+    return f"generation:{project_id}"
 
-    try:
-        # 1. 스크립트 생성 (Groq - 무료)
-        script = await groq_service.generate_script(
-            image_analysis=project["photo_analyses"],
-            narrative=project["narrative"],
-            style=project["style"],
+
+async def _acquire_generation(project_id: str) -> tuple[str, bool]:
+    """프로젝트당 하나의 생성 작업만 실행되도록 lease 획득
+
+    Returns:
+        (job_id, 새로 획득 여부) - 이미 실행 중이면 실행 중인 작업의 job_id
+    """
+    job_id = str(uuid.uuid4())
+    holder = await lease_service.acquire(
+        _generation_lease_key(project_id), job_id, settings.generation_lease_ttl_seconds
+    )
+    return holder, holder == job_id
+
+
+async def _keep_generation_lease(project_id: str, job_id: str):
+    """실행 중 lease 주기적 연장"""
+    ttl = settings.generation_lease_ttl_seconds
+    while True:
+        await asyncio.sleep(ttl / 3)
+        if not await lease_service.renew(_generation_lease_key(project_id), job_id, ttl):
+            logger.warning("Generation lease lost for %s (job %s)", project_id, job_id)
+            return
+
+
+async def _generate_video_task(project_id: str, job_id: str, ticket: Optional[Ticket] = None):
+    """백그라운드 영상 생성 태스크 (_acquire_generation으로 lease를 얻은 뒤 실행)
+
+    ticket: 입장 제어 대기열 항목 - 없으면(배치 생성) 한도 없이 standard 레인에 등록
+    """
+    project = projects_db.get(project_id)
+    if project is None:
+        # 대기 중 프로젝트가 삭제됨 - 입장 슬롯과 lease를 바로 반환
+        if ticket is not None:
+            ticket.release()
+        await lease_service.release(_generation_lease_key(project_id), job_id)
+        return
+    if ticket is None:
+        ticket = generation_admission.admit(
+            STANDARD, _generation_seconds(project, project["render_request"]["mode"]), limit=False
         )
-        project["script"] = script
+    script_version = project["script_version"]
+    preview_tasks = []
+    lease_task = asyncio.create_task(_keep_generation_lease(project_id, job_id))
 
-        # 2. 이미지 로드
-        images = await storage_service.get_all_photos(project_id)
+    async def on_queue_update(waiting: Ticket):
+        await _mark_stage(
+            project_id, "queued", queue_position=waiting.position, queue_wait_seconds=round(waiting.wait_seconds(), 1)
+        )
+
+    async def on_scene_complete(scene_video: dict):
+        # 포스터 추출이 다음 씬 렌더링을 지연시키지 않도록 별도 태스크로 실행
+        preview_tasks.append(asyncio.create_task(_create_poster(project_id, scene_video)))
+        await _mark_stage(project_id, "render", scenes_done=project["scenes_done"] + 1)
 
-        # 3. 각 씬별 영상 생성 (Replicate - Minimax video-01)
-        scene_videos = await replicate_service.generate_scene_videos(
-            scenes=script["scenes"],
-            images=images,
+    projects_in_flight.labels("generating").inc()
+    try:
+        await ticket.wait(on_queue_update)
+        if projects_db.get(project_id) is not project:
+            # 슬롯을 기다리는 동안 삭제됨 - 제공자 호출 없이 종료 (finally에서 슬롯/lease 반환)
+            return
+        async with track_stage("generation", project_id):
+            # 1. 스크립트 생성 (Groq - 무료)
+            await _mark_stage(
+                project_id, "script", scenes_total=0, scenes_done=0, queue_position=None, queue_wait_seconds=None
+            )
+            async with track_stage("script", project_id), eta_service.timed(
+                "script", len(project["photos"]), groq_service.model
+            ):
+                script = await groq_service.generate_script(
+                    image_analysis=project["photo_analyses"],
+                    narrative=project["narrative"],
+                    style=project["style"],
+                )
+            project["script"] = script
+            await _mark_stage(project_id, "render", scenes_total=len(script["scenes"]))
+
+            # 2. 이미지 로드
+            images = await storage_service.get_all_photos(project_id)
+
+            # 미리보기는 렌더링과 병렬로 생성
+            if settings.preview_enabled:
+                preview_tasks.append(asyncio.create_task(
+                    _create_storyboard_task(project_id, script["scenes"], images)
+                ))
+
+            # 3. 각 씬별 영상 생성 (Replicate) - 마감 시간이 빠듯하면 씬별로 초안 모드
+            project["poster_urls"] = []
+            render_request = project["render_request"]
+            async with track_stage("render", project_id):
+                scene_videos = await replicate_service.generate_scene_videos(
+                    scenes=script["scenes"],
+                    images=images,
+                    on_scene_complete=on_scene_complete,
+                    route=render_router.route(render_request["mode"], render_request["deadline_seconds"]),
+                    project_id=project_id,
+                )
+            replaced = _stored_video_ids(project) - _stored_video_ids({"scene_videos": scene_videos})
+            project["scene_videos"] = scene_videos
+            is_draft = any(video.get("upgrade") for video in scene_videos)
+
+            # 4-5. 최종 영상 URL 저장 + 저장소 전송
+            project.update(await _deliver_video(project_id, scene_videos, script, project["style"]))
+            replaced -= _stored_video_ids(project)
+
+            # 완료 응답 후 삭제되는 프로젝트에 미리보기가 남지 않도록 먼저 마무리
+            async with track_stage("previews", project_id):
+                await asyncio.gather(*preview_tasks)
+
+        upgrade = is_draft and render_request["upgrade"] and settings.render_upgrade_enabled
+        await _set_status(
+            project_id,
+            ProjectStatus.COMPLETED,
+            completed_at=datetime.now(),
+            generated_script_version=script_version,
+            quality=DRAFT if is_draft else FULL,
+            upgrading=upgrade,
         )
+        # 다시 생성하기 전의 최종 영상/씬 클립 (새 URL로 바뀐 뒤 삭제)
+        await _delete_videos(project_id, replaced)
+        if upgrade:
+            upgrade_task = asyncio.create_task(_upgrade_render_task(project_id, job_id, script_version))
+            _upgrade_tasks.add(upgrade_task)
+            upgrade_task.add_done_callback(_upgrade_tasks.discard)
+
+    except Exception as e:
+        await _set_status(project_id, ProjectStatus.FAILED, error=str(e))
+
+    finally:
+        ticket.release()
+        projects_in_flight.labels("generating").dec()
+        for task in preview_tasks:
+            task.cancel()
+        lease_task.cancel()
+        await lease_service.release(_generation_lease_key(project_id), job_id)
+
+
+async def _deliver_video(
+    project_id: str, scene_videos: list[dict], script: dict, style: Optional[str] = None
+) -> dict:
+    """씬 영상 -> 최종 영상 URL
+
+    ffmpeg가 있으면 씬 클립을 이어 붙이며 컬러 그레이딩 + 타이틀/자막 합성 + 배경 음악 믹싱해 저장.
+    없거나 실패하면 첫 번째 씬 영상을 대표로 faststart 변환 후 저장 (실패 시 원본 URL 유지).
+    """
+    if scene_videos and assembly_service.available:
+        try:
+            await _mark_stage(project_id, "assemble")
+            # 곡 선택은 미리 계산된 인덱스 조회라 요청마다 오디오를 분석하지 않음
+            music = music_library.plan(script, style, seed=project_id) if music_library.available else None
+            async with track_stage("assemble", project_id), eta_service.timed("assemble", len(scene_videos)):
+                delivery = await assembly_service.assemble(
+                    project_id, scene_videos, script.get("color_grading"), music, text_overlay.plan(script, style)
+                )
+            return {**delivery, "music_track": music["name"] if music else None}
+        except Exception as e:
+            logger.warning("Video assembly failed for %s: %s", project_id, e)
+
+    if scene_videos and scene_videos[0].get("video_id"):
+        # 로컬 렌더링 클립은 할당량 초과 시 정리되는 파생 파일 -> 최종 영상으로 따로 저장
+        try:
+            data = await storage_service.get_video(project_id, scene_videos[0]["video_id"])
+            if data:
+                return await video_delivery_service.store_video(project_id, data)
+        except Exception as e:
+            logger.warning("Storing local clip as final video failed for %s: %s", project_id, e)
+        return {"video_id": None, "video_url": scene_videos[0]["video_url"], "hls_url": scene_videos[0].get("hls_url")}
+    delivery = {
+        "video_id": None, "video_url": scene_videos[0].get("video_url") if scene_videos else None, "hls_url": None
+    }
+    if delivery["video_url"] and settings.video_ingest_enabled:
+        try:
+            await _mark_stage(project_id, "ingest")
+            async with track_stage("ingest", project_id), eta_service.timed("ingest"):
+                delivery = await video_delivery_service.ingest_final_video(project_id, delivery["video_url"])
+        except Exception as e:
+            logger.warning("Video ingest failed for %s: %s", project_id, e)
+    return delivery
+
+
+def _stored_video_ids(project: dict) -> set[str]:
+    """프로젝트가 저장소에 가진 영상 (최종 영상 + 로컬 렌더링 씬 클립)"""
+    ids = {project.get("video_id")}
+    ids.update(
+        video.get("video_id") for video in project.get("scene_videos") or []
+        if str(video.get("video_id") or "").startswith(CLIP_PREFIX)
+    )
+    ids.discard(None)
+    return ids
 
-        # 4. 최종 영상 URL 저장 (실제로는 영상 병합 필요)
-        # 여기서는 첫 번째 씬 영상을 대표로 사용
-        if scene_videos:
-            project["video_url"] = scene_videos[0].get("video_url")
 
-        project["status"] = ProjectStatus.COMPLETED
-        project["completed_at"] = datetime.now()
+async def _delete_videos(project_id: str, video_ids: set[str]):
+    """더 이상 참조하지 않는 저장 영상 삭제 (실패해도 고아/할당량 스윕에 맡김)"""
+    for video_id in video_ids:
+        try:
+            await storage_service.delete_video(project_id, video_id)
+        except Exception as e:
+            logger.warning("Deleting replaced video %s/%s failed: %s", project_id, video_id, e)
 
+
+async def _upgrade_render_task(project_id: str, job_id: str, script_version: int):
+    """초안/대체 렌더링 씬을 full 품질로 다시 렌더링해 교체 (같은 생성 작업/스크립트 버전일 때만)"""
+
+    def current_project() -> Optional[dict]:
+        project = projects_db.get(project_id)
+        if project and project["generation_job_id"] == job_id and project["script_version"] == script_version:
+            return project
+        return None  # 삭제되었거나 다시 생성됨
+
+    project = current_project()
+    if project is None:
+        return
+    drafts = [
+        scene
+        for scene, video in zip(project["script"]["scenes"], project["scene_videos"])
+        if video.get("upgrade")
+    ]
+
+    try:
+        images = await storage_service.get_all_photos(project_id)
+        async with track_stage("render_upgrade", project_id):
+            upgraded = await replicate_service.generate_scene_videos(
+                scenes=drafts, images=images, route=render_router.route(FULL), project_id=project_id
+            )
+
+        project = current_project()
+        if project is None:
+            return
+        by_scene = {video.get("scene_id"): video for video in upgraded}
+        scene_videos = [by_scene.get(video.get("scene_id"), video) for video in project["scene_videos"]]
+        delivery = await _deliver_video(project_id, scene_videos, project["script"], project["style"])
+
+        if current_project() is None:
+            # 그 사이 다시 생성/삭제됨 - 방금 만든 영상은 쓰이지 않음
+            await _delete_videos(project_id, _stored_video_ids({"video_id": delivery.get("video_id")}))
+            return
+        replaced = _stored_video_ids(project) - _stored_video_ids({**delivery, "scene_videos": scene_videos})
+        project["scene_videos"] = scene_videos
+        # 제공자 장애가 계속되면 다시 로컬로 대체될 수 있음
+        quality = DRAFT if any(video.get("upgrade") for video in scene_videos) else FULL
+        await _set_status(project_id, project["status"], **delivery, quality=quality, upgrading=False)
+        # 초안 최종 영상과 교체된 씬 클립
+        await _delete_videos(project_id, replaced)
     except Exception as e:
-        project["status"] = ProjectStatus.FAILED
-        project["error"] = str(e)
+        # 초안은 그대로 유지
+        logger.warning("Render upgrade failed for %s: %s", project_id, e)
+        if current_project() is not None:
+            await _set_status(project_id, project["status"], upgrading=False)
+
+
+def _generation_handle(project: dict, message: str) -> dict:
+    return {
+        "message": message,
+        "project_id": project["id"],
+        "job_id": project["generation_job_id"],
+        "script_version": project["script_version"],
+        "status": project["status"],
+        "queue_position": project.get("queue_position"),
+    }
 
 
 @router.post("/{project_id}/generate")
-async def start_generation(project_id: str, background_tasks: BackgroundTasks):
-    """영상 생성 시작"""
+async def start_generation(
+    project_id: str,
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    mode: RenderMode = RenderMode.AUTO,
+    deadline_seconds: Optional[float] = Query(None, gt=0),
+    upgrade: bool = True,
+    idempotency_key: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None),
+):
+    """영상 생성 시작
+
+    같은 프로젝트에 실행 중인 작업이 있거나 현재 스크립트 버전이 이미 생성되었으면
+    새로 시작하지 않고 해당 작업의 handle(job_id)을 반환. force=true면 완료된 버전도 재생성.
+    같은 Idempotency-Key의 재요청에는 첫 응답을 그대로 반환.
+
+    mode=auto는 deadline_seconds 안에 끝낼 수 있도록 씬별로 full/draft 선택 (단순 카메라 무빙
+    씬과 제공자 장애 중인 씬은 로컬 렌더링), upgrade=true면 초안 완료 후 백그라운드에서 full로 교체.
+
+    동시 생성이 용량을 넘으면 대기열에 넣고 queue_position을 반환, 예상 대기 시간이 한도를
+    넘으면 429 (Retry-After). X-Api-Key가 우선 레인 키면 대기열 앞에서 예약 슬롯 사용.
+    """
     if project_id not in projects_db:
         raise HTTPException(status_code=404, detail="Project not found")
 
     project = projects_db[project_id]
+    _touch(project)
 
     if not project["photos"]:
         raise HTTPException(status_code=400, detail="No photos uploaded")
@@ -203,48 +767,85 @@ async def start_generation(project_id: str, background_tasks: BackgroundTasks):
     if not project.get("photo_analyses"):
         raise HTTPException(status_code=400, detail="Photos not analyzed yet")
 
-    # 상태 업데이트
-    project["status"] = ProjectStatus.GENERATING
+    stored_key = f"idempotency:generate:{project_id}:{idempotency_key}" if idempotency_key else None
+    if stored_key:
+        stored = await idempotency_store.get(stored_key)
+        if stored:
+            return stored
+
+    if (
+        not force
+        and project["status"] == ProjectStatus.COMPLETED
+        and project["generated_script_version"] == project["script_version"]
+    ):
+        return _generation_handle(project, "Video already generated")
+
+    job_id, acquired = await _acquire_generation(project_id)
+    if not acquired:
+        # 더블 클릭/재시도: 과부하 중에도 429 대신 실행 중인 작업 반환
+        response = _generation_handle(project, "Video generation already in progress")
+        response["job_id"] = job_id
+        return response
+
+    # 입장 제어는 새 작업에만 - 거절되면 방금 얻은 lease 반환
+    try:
+        ticket = _admit(generation_admission, lane_for(x_api_key), _generation_seconds(project, mode.value))
+    except HTTPException:
+        await lease_service.release(_generation_lease_key(project_id), job_id)
+        raise
+
+    # 상태 업데이트 (슬롯이 없으면 대기열 순서 기록)
+    project["render_request"] = {"mode": mode.value, "deadline_seconds": deadline_seconds, "upgrade": upgrade}
+    queued = {} if ticket.granted else {
+        "stage": "queued",
+        "stage_started_at": time.time(),
+        "queue_position": ticket.position,
+        "queue_wait_seconds": round(ticket.wait_seconds(), 1),
+    }
+    await _set_status(project_id, ProjectStatus.GENERATING, generation_job_id=job_id, upgrading=False, **queued)
 
     # 백그라운드에서 영상 생성
-    background_tasks.add_task(_generate_video_task, project_id)
+    background_tasks.add_task(_generate_video_task, project_id, job_id, ticket)
 
-    return {"message": "Video generation started", "project_id": project_id}
+    response = _generation_handle(project, "Video generation started" if ticket.granted else "Video generation queued")
+    if stored_key:
+        await idempotency_store.put(stored_key, response)
+    return response
 
 
 @router.get("/{project_id}/status", response_model=GenerationStatusResponse)
-async def get_generation_status(project_id: str):
-    """영상 생성 상태 조회"""
-    if project_id not in projects_db:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    project = projects_db[project_id]
-
-    # 진행률 계산 (간단한 예시)
-    progress_map = {
-        ProjectStatus.DRAFT: 0,
-        ProjectStatus.ANALYZING: 25,
-        ProjectStatus.GENERATING: 50,
-        ProjectStatus.COMPLETED: 100,
-        ProjectStatus.FAILED: 0,
-    }
+async def get_generation_status(project_id: str, request: Request):
+    """영상 생성 상태 조회 (폴링용 - 상태 캐시 + ETag)"""
+    entry = await status_cache.get(project_id)
+    if entry is None:
+        if project_id not in projects_db:
+            raise HTTPException(status_code=404, detail="Project not found")
+        entry = await status_cache.set(
+            project_id, _status_payload(project_id, projects_db[project_id]), only_if_missing=True
+        )
 
-    status_messages = {
-        ProjectStatus.DRAFT: "Ready to generate",
-        ProjectStatus.ANALYZING: "Analyzing photos...",
-        ProjectStatus.GENERATING: "Generating video...",
-        ProjectStatus.COMPLETED: "Video ready!",
-        ProjectStatus.FAILED: f"Failed: {project.get('error', 'Unknown error')}",
+    # 변경 없는 폴링은 본문 없이 304
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(_fresh_payload(entry), headers=headers)
+
+
+def _fresh_payload(entry: dict) -> dict:
+    """캐시된 상태의 남은 시간을 조회 시점 기준으로 다시 계산 (estimated_completion_at은 절대 시각이라 그대로)"""
+    payload = entry["payload"]
+    if payload.get("eta_seconds") is None or not entry.get("written_at"):
+        return payload
+    elapsed = max(time.time() - entry["written_at"], 0.0)
+    eta_seconds = round(max(payload["eta_seconds"] - elapsed, 0.0), 1)
+    return {
+        **payload,
+        "eta_seconds": eta_seconds,
+        "eta_p90_seconds": round(max(payload["eta_p90_seconds"] - elapsed, 0.0), 1),
+        "poll_interval_seconds": eta_service.poll_interval(eta_seconds),
     }
 
-    return GenerationStatusResponse(
-        project_id=project_id,
-        status=project["status"],
-        progress=progress_map.get(project["status"], 0),
-        message=status_messages.get(project["status"], "Unknown status"),
-        video_url=project.get("video_url"),
-    )
-
 
 @router.delete("/{project_id}")
 async def delete_project(project_id: str):
@@ -252,10 +853,7 @@ async def delete_project(project_id: str):
     if project_id not in projects_db:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # 파일 삭제
-    await storage_service.delete_project_files(project_id)
-
-    # DB에서 삭제
-    del projects_db[project_id]
+    # 파일 + DB + 상태 캐시 삭제
+    await _remove_project(project_id)
 
     return {"message": "Project deleted"}
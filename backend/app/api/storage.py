@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse
+
+from ..services import storage_service
+from ..services.video_service import HLS_CONTENT_TYPES, VIDEO_CACHE_CONTROL, range_file_response
+
+router = APIRouter(prefix="/storage", tags=["storage"])
+
+
+@router.get("/videos/{project_id}/{video_id}")
+async def get_video(project_id: str, video_id: str, request: Request):
+    """완성 영상 전송 (로컬: Range 지원 스트리밍, S3: CDN/Pre-signed 리다이렉트)"""
+    if not storage_service.is_local:
+        return RedirectResponse(storage_service.get_video_url(project_id, video_id), status_code=307)
+
+    file_path = storage_service.get_video_path(project_id, video_id)
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    # video_id마다 내용이 고정이므로 강한 ETag로 사용
+    return range_file_response(request, file_path, "video/mp4", etag=f'"{video_id}"')
+
+
+@router.get("/videos/{project_id}/{video_id}/hls/{name}")
+async def get_video_hls(project_id: str, video_id: str, name: str, request: Request):
+    """HLS 플레이리스트/세그먼트 전송"""
+    content_type = HLS_CONTENT_TYPES.get("." + name.rsplit(".", 1)[-1])
+    if not content_type:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    if not storage_service.is_local:
+        return RedirectResponse(
+            storage_service.get_video_asset_url(project_id, video_id, name), status_code=307
+        )
+
+    file_path = storage_service.get_video_asset_path(project_id, video_id, name)
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return range_file_response(request, file_path, content_type, etag=f'"{video_id}-{name}"')
+
+
+@router.get("/previews/{project_id}/{name}")
+async def get_preview(project_id: str, name: str):
+    """미리보기 파일 전송 (파일명이 내용 해시이므로 불변 캐시)"""
+    if not storage_service.is_local:
+        return RedirectResponse(storage_service.get_preview_url(project_id, name), status_code=307)
+
+    file_path = storage_service.get_preview_path(project_id, name)
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return FileResponse(file_path, headers={"Cache-Control": VIDEO_CACHE_CONTROL})
@@ -6,28 +6,161 @@ class Settings(BaseSettings):
     # Google Vision API (이미지 분석)
     # https://console.cloud.google.com/apis/credentials
     google_vision_api_key: str = ""
+    google_vision_base_url: str = "https://vision.googleapis.com/v1"
 
     # Groq API (스크립트 생성 - 무료)
     # https://console.groq.com/keys
     groq_api_key: str = ""
+    groq_base_url: str = "https://api.groq.com/openai/v1"
 
     # Replicate API (영상 생성 - Minimax video-01)
     # https://replicate.com/account/api-tokens
     # 무료: 카드 없이 제한된 횟수 무료 사용 가능
     replicate_api_key: str = ""
+    replicate_base_url: str = "https://api.replicate.com/v1"
+
+    # 자격 증명 풀 - 쉼표로 구분한 추가 키 (위 단일 키와 합쳐 사용, 가장 한가한 키로 분산)
+    groq_api_keys: str = ""
+    replicate_api_keys: str = ""
+    groq_key_requests_per_minute: int = 30  # 키별 한도 (0이면 무제한, Groq 무료 티어 30 RPM)
+    replicate_key_requests_per_minute: int = 0
+    replicate_key_max_concurrency: int = 0  # 키별 동시 예측 수 (0이면 무제한)
+    credential_cooldown_seconds: float = 30.0  # 429에 Retry-After가 없을 때 (연속 429마다 2배)
 
     # AWS S3
     aws_access_key_id: str = ""
     aws_secret_access_key: str = ""
     aws_s3_bucket: str = ""
     aws_region: str = "ap-northeast-2"
+    # S3 앞단 CDN (예: https://dxxxx.cloudfront.net) - 비어 있으면 Pre-signed URL
+    cdn_base_url: str = ""
+
+    # 영상 전송 (faststart 변환 후 저장, 선택적으로 HLS 패키징)
+    video_ingest_enabled: bool = True
+    video_hls_enabled: bool = False
+    ffmpeg_path: str = "ffmpeg"
+
+    # 렌더 라우팅 - 마감 시간/대기 중 예측 수/관측 지연시간으로 씬별 full 또는 draft 선택
+    render_full_model: str = "minimax/video-01"
+    render_draft_model: str = "minimax/hailuo-02"  # 512p 초안
+    render_default_deadline_seconds: float = 0  # 0이면 마감 없음 (요청별 deadline_seconds로 지정)
+    render_full_latency_seconds: float = 120.0  # 관측 전 초기 추정치
+    render_draft_latency_seconds: float = 40.0
+    render_latency_smoothing: float = 0.2  # EWMA 가중치
+    render_capacity: int = 4  # 이보다 많이 실행 중이면 대기가 길어진다고 가정
+    render_upgrade_enabled: bool = True  # 초안 완료 후 백그라운드에서 full로 교체
+
+    # 로컬 렌더러 - 사진 + 카메라 무빙 씬을 NumPy/ffmpeg로 직접 렌더링 (API 비용 없음, ffmpeg 필요)
+    render_local_enabled: bool = True
+    render_local_movements: str = "static"  # auto 모드에서 로컬로 보낼 camera_movement (쉼표 구분)
+    render_local_width: int = 720
+    render_local_height: int = 1280
+    render_local_fps: int = 25
+    render_local_latency_seconds: float = 10.0  # 관측 전 초기 추정치
+    # 연속 실패가 이만큼이면 제공자 장애로 보고 일정 시간 로컬 렌더링 (이후 백그라운드 교체)
+    render_degraded_failures: int = 2
+    render_degraded_seconds: float = 300.0
+
+    # ETA - 단계별 최근 소요 시간 분위수로 남은 시간/폴링 간격 추정
+    eta_window_size: int = 200  # (단계, 모델)별 보관할 최근 기록 수
+    eta_min_samples: int = 5  # 이보다 적으면 초기 추정치 사용
+    poll_min_seconds: float = 2.0
+    poll_max_seconds: float = 30.0
+
+    # 최종 영상 조립 - 씬 클립을 디코드 -> 컬러 그레이딩(3D LUT) -> 인코드 스트리밍 (ffmpeg 필요)
+    assembly_enabled: bool = True
+    assembly_width: int = 720
+    assembly_height: int = 1280
+    assembly_fps: int = 25
+    color_grading_enabled: bool = True
+    color_grading_chunk_frames: int = 8  # 한 번에 디코드/그레이딩할 프레임 수 (메모리 상한)
+    color_lut_size: int = 33  # 내장 그레이딩 LUT 격자 크기
+    color_lut_dir: str = ""  # .cube 파일 디렉터리 (파일 이름 = color_grading 이름, 내장보다 우선)
+
+    # 배경 음악 - 로컬 라이브러리를 미리 분석한 memory-mapped 인덱스로 곡 선택, 조립 단계에서 믹싱
+    music_enabled: bool = True
+    music_library_dir: str = ""  # 비워두면 배경 음악 없음 (하위 폴더 이름 = 분위기 태그)
+    music_index_dir: str = ""  # 비워두면 music_library_dir/.index
+    music_target_lufs: float = -16.0  # 곡별 라우드니스를 이 값으로 맞춤
+    music_beat_snap_seconds: float = 0.4  # 씬 컷을 가장 가까운 비트로 옮길 최대 거리
+
+    # 자막/타이틀 오버레이 - 글리프 아틀라스로 미리 래스터화해 조립 단계에서 알파 블렌딩
+    overlay_enabled: bool = True
+    overlay_font_path: str = ""  # 한글 글꼴 (.ttf/.otf/.ttc), 비워두면 시스템 글꼴 탐색
+    overlay_title_seconds: float = 3.0  # 첫 씬 위 타이틀 카드 표시 시간 (0이면 타이틀 없음)
+
+    # 미리보기 (썸네일/스토리보드/포스터) - CPU 작업은 프로세스 풀에서 실행
+    preview_enabled: bool = True
+    process_pool_workers: int = 2
+    poster_timeout_seconds: float = 20.0  # 원격 씬 클립에서 포스터 추출 한도 (넘으면 포스터 생략)
 
-    # Redis
+    # Vision 전송 전 긴 변 최대 크기 (색상/밝기 등은 로컬 분석)
+    vision_max_image_size: int = 1024
+
+    # 중복 사진 감지 (pHash 해밍 거리, 64비트 기준)
+    dedup_enabled: bool = True
+    dedup_hamming_threshold: int = 10
+
+    # 배치 생성 (분석/렌더링 동시 실행 수 제한)
+    batch_max_projects: int = 50
+    batch_analysis_concurrency: int = 8
+    batch_generation_concurrency: int = 4
+
+    # 입장 제어 - 분석/생성 요청을 동시 처리 용량만큼 실행하고 나머지는 대기열,
+    # 예상 대기 시간이 한도를 넘으면 429 + Retry-After (워커 프로세스별)
+    admission_enabled: bool = True
+    admission_max_analyses: int = 8
+    admission_max_generations: int = 0  # 0이면 제공자 용량으로 추정 (키별 동시 예측 한도 합 또는 render_capacity)
+    admission_analysis_max_wait_seconds: float = 20.0  # 요청 안에서 기다리므로 짧게
+    admission_generation_max_wait_seconds: float = 300.0
+    # 우선 레인 - X-Api-Key 헤더가 이 목록(쉼표 구분)에 있으면 대기열 앞 + 예약 슬롯 사용
+    admission_priority_keys: str = ""
+    admission_priority_reserved: int = 1
+
+    # 저장소 수명 주기 (TTL 만료, 고아 파일 정리, 할당량) - 점진적 백그라운드 스윕
+    # 고아 판단은 프로젝트 저장소 기준이므로 in-memory 저장소에서는 단일 워커로 실행
+    lifecycle_enabled: bool = True
+    lifecycle_sweep_interval_seconds: int = 300
+    lifecycle_sweep_batch_size: int = 500  # 한 번에 읽을 파일 수 (배치 사이 이벤트 루프 양보)
+    lifecycle_sweep_pause_seconds: float = 0.05
+    lifecycle_max_deletes_per_sweep: int = 200
+    lifecycle_draft_ttl_hours: float = 72
+    lifecycle_failed_ttl_hours: float = 24
+    lifecycle_orphan_grace_hours: float = 6
+    # Redis 레지스트리 없이 고아 파일을 삭제하려면 True - 이 프로세스의 projects_db가 유일한 프로젝트 저장소일 때만
+    lifecycle_single_instance: bool = False
+    storage_user_quota_mb: int = 1024  # owner_id별, 0이면 무제한
+    storage_global_quota_mb: int = 0  # 0이면 무제한
+
+    # 외부 API 연결 (제공자별 공용 연결 풀, 시작 후 선택적 워밍업)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    provider_warmup_enabled: bool = False
+    provider_warmup_timeout_seconds: float = 5.0
+
+    # Redis (워커 간 상태 공유) - 비활성/연결 불가 시 프로세스 내 저장소 사용
+    redis_enabled: bool = False
     redis_url: str = "redis://localhost:6379/0"
+    status_cache_ttl_seconds: int = 3600
+    status_cache_local_ttl_seconds: float = 5.0
+    generation_lease_ttl_seconds: int = 120  # 실행 중에는 TTL/3마다 연장
+    idempotency_ttl_seconds: int = 86400
 
     # Database
     database_url: str = ""
 
+    # 모니터링 (/metrics, OpenTelemetry는 패키지 설치 시에만)
+    otel_enabled: bool = False
+
+    # 프로파일링 (opt-in) - 관리자 API는 X-Admin-Token 헤더로 보호
+    admin_token: str = ""
+    profiling_enabled: bool = False
+    profiling_sample_interval_ms: int = 10
+    profiling_buffer_seconds: int = 120
+    profiling_slow_request_ms: int = 2000  # 이보다 느린 요청은 자동 캡처
+    profiling_loop_block_threshold_ms: int = 200
+    profiling_max_captures: int = 50
+
     # App
     secret_key: str = "dev-secret-key"
     debug: bool = True
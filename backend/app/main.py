@@ -1,11 +1,24 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pathlib import Path
+import asyncio
+import time
 
 from .api import api_router
 from .config import get_settings
+from .services.static_service import StaticManifest
+from .services.process_pool import shutdown_process_pool
+from .services.metrics_service import http_request_duration, registry as metrics_registry
+from .services.profiling_service import profiling_service
+from .services.http_clients import close_http_clients, warm_up_providers
+from .services.redis_client import close_redis
+from .services.status_cache import status_cache
+from .services.lifecycle_service import lifecycle_service
+from .services.music_library import music_library
+from .api.admin import is_admin
+from .api.projects import projects_db, _remove_project, _clear_derived
 
 settings = get_settings()
 
@@ -27,38 +40,111 @@ app.add_middleware(
 # API 라우터 등록
 app.include_router(api_router)
 
-# 로컬 스토리지 정적 파일 서빙
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """X-Profile 헤더(관리자) 요청과 SLO 초과 요청의 샘플링 프로파일 캡처"""
+    if not profiling_service.enabled:
+        return await call_next(request)
+
+    requested = request.headers.get("x-profile") and is_admin(request.headers.get("x-admin-token"))
+    start = time.monotonic()
+    response = await call_next(request)
+    end = time.monotonic()
+
+    slow = (end - start) * 1000 >= settings.profiling_slow_request_ms
+    if requested or slow:
+        capture = profiling_service.capture(
+            "requested" if requested else "slow", request.method, request.url.path, start, end
+        )
+        if capture and requested:
+            response.headers["X-Profile-Id"] = capture["id"]
+    return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # 경로 파라미터별로 라벨이 늘어나지 않도록 라우트 템플릿 사용
+        route = request.scope.get("route")
+        http_request_duration.labels(
+            request.method, getattr(route, "path", "unmatched"), str(status)
+        ).observe(time.perf_counter() - start)
+
+# 로컬 스토리지 정적 파일 서빙 (디렉터리는 LocalStorageService 생성 시 만들어짐)
 storage_path = Path(__file__).parent.parent / "storage"
-storage_path.mkdir(exist_ok=True)
-app.mount("/storage", StaticFiles(directory=str(storage_path)), name="storage")
+app.mount("/storage", StaticFiles(directory=str(storage_path), check_dir=False), name="storage")
 
 # 프론트엔드 정적 파일 경로
 static_path = Path(__file__).parent.parent / "static"
 
 
+@app.on_event("startup")
+async def start_background_services():
+    profiling_service.start()
+    status_cache.start()
+    lifecycle_service.start(projects_db, _remove_project, _clear_derived)
+    # 시작 이벤트를 기다리게 하지 않고 태스크로 실행 -> 포트 바인딩 후 트래픽과 병렬로 워밍업
+    if settings.provider_warmup_enabled:
+        asyncio.create_task(warm_up_providers())
+    # 새로 추가된 곡만 분석 (기존 인덱스는 mmap으로 바로 사용)
+    if music_library.available:
+        asyncio.create_task(music_library.warm_up())
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    profiling_service.stop()
+    status_cache.stop()
+    lifecycle_service.stop()
+    await close_redis()
+    await close_http_clients()
+    shutdown_process_pool()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 메트릭"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # 프론트엔드 정적 파일 서빙 (SPA)
 if static_path.exists():
-    app.mount("/assets", StaticFiles(directory=str(static_path / "assets")), name="assets")
+    static_manifest = StaticManifest(static_path)
+
+    @app.on_event("startup")
+    async def build_static_manifest():
+        # 요청마다 파일시스템을 조회하지 않도록 시작 시 한 번만 스캔
+        static_manifest.build()
 
     @app.get("/{full_path:path}")
     async def serve_spa(request: Request, full_path: str):
         # API 경로는 제외
         if full_path.startswith("api/") or full_path.startswith("storage/"):
-            return {"detail": "Not Found"}
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+
+        # 정적 파일 확인 (매니페스트)
+        asset = static_manifest.get(full_path)
+        if asset:
+            return static_manifest.respond(request, asset)
 
-        # 정적 파일 확인
-        file_path = static_path / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
+        # 해시 에셋이 없으면 index.html 대신 404 (오래된 번들 참조)
+        if full_path.startswith("assets/"):
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
 
-        # SPA fallback - index.html 반환
-        index_path = static_path / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
+        # SPA fallback - index.html 반환 (메모리)
+        if static_manifest.index:
+            return static_manifest.respond(request, static_manifest.index)
 
-        return {"detail": "Not Found"}
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
@@ -20,9 +20,17 @@ class StylePreference(str, Enum):
     CINEMATIC = "cinematic"
 
 
+class RenderMode(str, Enum):
+    AUTO = "auto"  # 마감 시간/부하에 따라 씬별 선택
+    DRAFT = "draft"  # 저해상도 초안 (빠름)
+    FULL = "full"
+    LOCAL = "local"  # 사진 + 카메라 무빙 로컬 렌더링 (사진 없는 씬은 draft)
+
+
 # Request Models
 class ProjectCreate(BaseModel):
     title: Optional[str] = None
+    owner_id: Optional[str] = None  # 사용자별 저장소 할당량 기준
 
 
 class NarrativeInput(BaseModel):
@@ -30,6 +38,19 @@ class NarrativeInput(BaseModel):
     style: StylePreference = StylePreference.EMOTIONAL
 
 
+class BatchProjectSpec(BaseModel):
+    title: Optional[str] = None
+    narrative: str
+    style: StylePreference = StylePreference.EMOTIONAL
+    photos: list[str]  # 함께 업로드한 파일명 (프로젝트 간 공유 가능)
+
+
+class BatchCreate(BaseModel):
+    projects: list[BatchProjectSpec]
+    owner_id: Optional[str] = None
+    generate: bool = True  # False면 분석까지만 수행
+
+
 # Response Models
 class PhotoAnalysis(BaseModel):
     photo_id: str
@@ -38,6 +59,8 @@ class PhotoAnalysis(BaseModel):
     mood: str
     colors: list[str]
     key_elements: list[str]
+    duplicate_of: Optional[str] = None  # 거의 같은 사진이면 대표 photo_id
+    properties: Optional[dict] = None  # 밝기/대비/색온도/선명도 (로컬 분석)
 
 
 class SceneScript(BaseModel):
@@ -49,14 +72,18 @@ class SceneScript(BaseModel):
     camera_movement: str
     emotion: str
     video_prompt: str
+    music_intensity: str = "medium"  # 배경 음악 강도 (low/medium/high)
+    text_overlay: Optional[str] = None  # 화면 자막
 
 
 class VideoScript(BaseModel):
     title: str
+    subtitle: str = ""  # 타이틀 카드 태그라인
     total_duration: int
     scenes: list[SceneScript]
     overall_mood: str
     color_grading: str
+    music_style: str = ""  # 배경 음악 선택용 분위기 키워드
 
 
 class ProjectResponse(BaseModel):
@@ -66,6 +93,10 @@ class ProjectResponse(BaseModel):
     photo_count: int
     narrative: Optional[str]
     video_url: Optional[str]
+    hls_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    storyboard_url: Optional[str] = None
+    poster_urls: list[str] = []
     created_at: datetime
     completed_at: Optional[datetime]
 
@@ -76,6 +107,8 @@ class AnalysisResponse(BaseModel):
     overall_theme: str
     suggested_narrative_arc: str
     emotional_journey: list[str]
+    duplicate_groups: list[list[str]] = []
+    color_profile: Optional[dict] = None
 
 
 class GenerationStatusResponse(BaseModel):
@@ -84,3 +117,34 @@ class GenerationStatusResponse(BaseModel):
     progress: int  # 0-100
     message: str
     video_url: Optional[str] = None
+    hls_url: Optional[str] = None
+    quality: Optional[str] = None  # full / draft
+    upgrading: bool = False  # 초안을 full로 교체하는 중
+    queue_position: Optional[int] = None  # 입장 제어 대기열 순서 (1이면 다음 차례)
+    # 상태가 갱신된 시점 기준 남은 시간 (p50 / p90) - 경과는 estimated_completion_at으로 판단
+    eta_seconds: Optional[float] = None
+    eta_p90_seconds: Optional[float] = None
+    eta_confidence: Optional[str] = None  # low / medium / high (기록 수 기준)
+    estimated_completion_at: Optional[datetime] = None
+    poll_interval_seconds: float = 2.0  # 권장 폴링 간격
+
+
+class BatchProjectStatus(BaseModel):
+    id: str
+    title: Optional[str]
+    status: ProjectStatus
+    progress: int
+    video_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    id: str
+    status: ProjectStatus
+    progress: int  # 0-100, 프로젝트 평균
+    project_count: int
+    unique_photo_count: int
+    status_counts: dict[str, int]
+    projects: list[BatchProjectStatus]
+    created_at: datetime
+    completed_at: Optional[datetime] = None
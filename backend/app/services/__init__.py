@@ -2,3 +2,5 @@ from .gemini_service import gemini_service, GeminiService
 from .groq_service import groq_service, GroqService
 from .replicate_service import replicate_service, get_replicate_service, ReplicateService
 from .storage_service import storage_service, get_storage_service
+from .video_service import video_delivery_service, VideoDeliveryService
+from .preview_service import preview_service, PreviewService
@@ -0,0 +1,231 @@
+import asyncio
+import heapq
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from ..config import get_settings
+from .credential_pool import replicate_pool
+from .metrics_service import Counter, Gauge, registry
+
+settings = get_settings()
+
+PRIORITY = "priority"
+STANDARD = "standard"
+LANES = (PRIORITY, STANDARD)  # 슬롯 배정 순서
+
+admission_decisions = registry.register(Counter(
+    "admission_decisions_total", "Admission decisions for analyze/generate requests", ("kind", "lane", "outcome"),
+))
+admission_queue_depth = registry.register(Gauge(
+    "admission_queue_depth", "Admitted requests waiting for a slot", ("kind", "lane"),
+))
+admission_running = registry.register(Gauge(
+    "admission_running", "Requests holding an admission slot", ("kind",),
+))
+
+
+class Overloaded(Exception):
+    """예상 대기 시간이 한도 초과 - 429로 응답"""
+
+    def __init__(self, kind: str, retry_after: int, wait_seconds: float):
+        super().__init__(f"Too many {kind} requests in progress, retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.wait_seconds = wait_seconds
+
+
+def lane_for(api_key: Optional[str]) -> str:
+    """X-Api-Key -> 레인 (admission_priority_keys에 있으면 우선 레인)"""
+    keys = {key.strip() for key in settings.admission_priority_keys.split(",") if key.strip()}
+    return PRIORITY if api_key and api_key in keys else STANDARD
+
+
+class Ticket:
+    """입장한 요청 하나 - 대기열에 있다가 슬롯을 받으면 실행 (async with 또는 wait/release)"""
+
+    def __init__(self, controller: "AdmissionController", lane: str, expected_seconds: float):
+        self.controller = controller
+        self.lane = lane
+        self.expected = max(expected_seconds, 0.1)
+        self.started_at: Optional[float] = None  # 슬롯 획득 시각 (monotonic)
+        self.released = False
+        self.moved = asyncio.Event()  # 슬롯 획득 또는 대기 순서 변경
+
+    @property
+    def granted(self) -> bool:
+        return self.started_at is not None
+
+    @property
+    def position(self) -> int:
+        """앞에서 기다리는 요청 수 + 1 (슬롯을 받았으면 0)"""
+        return 0 if self.granted else len(self.controller.ahead_of(self)) + 1
+
+    def wait_seconds(self) -> float:
+        """슬롯을 받을 때까지 예상 대기 시간"""
+        return 0.0 if self.granted else self.controller.estimate_wait(self.lane, self.controller.ahead_of(self))
+
+    async def wait(self, on_update: Optional[Callable[["Ticket"], Awaitable]] = None):
+        """슬롯을 받을 때까지 대기 (순서가 바뀔 때마다 on_update 호출)"""
+        while not self.granted:
+            self.moved.clear()
+            if on_update:
+                await on_update(self)
+            if self.granted:
+                break
+            await self.moved.wait()
+
+    def release(self):
+        self.controller.release(self)
+
+    async def __aenter__(self) -> "Ticket":
+        try:
+            await self.wait()
+        except BaseException:
+            self.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class AdmissionController:
+    """종류(분석/생성)별 입장 제어
+
+    - 동시 실행은 capacity개 (standard 레인은 priority 예약분 제외)
+    - 나머지는 레인별 FIFO 대기열, priority 대기열이 항상 먼저
+    - 새 요청의 예상 대기 시간 = 실행 중 작업의 남은 시간 + 앞선 대기 작업의 예상 시간으로
+      슬롯이 비는 순서를 계산 -> 한도를 넘으면 Overloaded (Retry-After = 초과분)
+    """
+
+    def __init__(self, kind: str, capacity: Callable[[], int], max_wait: Callable[[], float]):
+        self.kind = kind
+        self._capacity = capacity
+        self._max_wait = max_wait
+        self.running: set[Ticket] = set()
+        self.waiting: dict[str, deque] = {lane: deque() for lane in LANES}
+
+    def capacity(self) -> int:
+        if not settings.admission_enabled:
+            return 1_000_000
+        return max(self._capacity(), 1)
+
+    def slots(self, lane: str) -> int:
+        """레인이 쓸 수 있는 동시 실행 수 (priority 예약분은 최소 1개의 standard 슬롯을 남김)"""
+        capacity = self.capacity()
+        if lane == PRIORITY:
+            return capacity
+        return capacity - min(max(settings.admission_priority_reserved, 0), capacity - 1)
+
+    def ahead_of(self, ticket: Optional[Ticket] = None, lane: str = STANDARD) -> list[Ticket]:
+        """먼저 슬롯을 받을 대기 요청 (ticket이 없으면 lane에 새로 들어올 요청 기준)"""
+        lane = ticket.lane if ticket else lane
+        ahead = list(self.waiting[PRIORITY])
+        if lane == STANDARD:
+            ahead += self.waiting[STANDARD]
+        if ticket is not None:
+            ahead = ahead[:ahead.index(ticket)] if ticket in ahead else []
+        return ahead
+
+    def estimate_wait(self, lane: str, ahead: list[Ticket]) -> float:
+        """ahead가 모두 슬롯을 받은 뒤 lane 요청이 슬롯을 받기까지 예상 시간 (초)"""
+        now = time.monotonic()
+        # 예상보다 오래 걸리는 작업도 최소한 예상 시간의 10%는 남은 것으로
+        finish = [
+            max(ticket.started_at + ticket.expected - now, ticket.expected * 0.1) for ticket in self.running
+        ]
+        heapq.heapify(finish)
+        start = 0.0
+        for ticket in [*ahead, None]:
+            slots = self.slots(ticket.lane if ticket else lane)
+            while len(finish) >= slots:
+                start = max(start, heapq.heappop(finish))
+            if ticket is not None:
+                heapq.heappush(finish, start + ticket.expected)
+        return start
+
+    def admit(self, lane: str, expected_seconds: float, limit: bool = True) -> Ticket:
+        """대기열에 등록 (실행 가능하면 바로 슬롯 배정)
+
+        Args:
+            expected_seconds: 이 작업의 예상 실행 시간 (뒤 요청의 대기 시간 추정용)
+            limit: False면 한도와 관계없이 대기열에 등록 (배치 생성)
+
+        Raises:
+            Overloaded: 예상 대기 시간이 한도 초과
+        """
+        if limit and settings.admission_enabled:
+            wait = self.estimate_wait(lane, self.ahead_of(lane=lane))
+            max_wait = self._max_wait()
+            if wait > max_wait:
+                admission_decisions.labels(self.kind, lane, "rejected").inc()
+                # 앞선 작업이 예상대로 끝나면 그만큼 뒤에는 한도 안으로 들어옴
+                raise Overloaded(self.kind, max(math.ceil(wait - max_wait), 1), wait)
+
+        ticket = Ticket(self, lane, expected_seconds)
+        self.waiting[lane].append(ticket)
+        self._dispatch()
+        admission_decisions.labels(self.kind, lane, "admitted" if ticket.granted else "queued").inc()
+        return ticket
+
+    def release(self, ticket: Ticket):
+        """실행 완료 또는 대기 취소"""
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket in self.running:
+            self.running.discard(ticket)
+        elif ticket in self.waiting[ticket.lane]:
+            self.waiting[ticket.lane].remove(ticket)
+        self._dispatch()
+
+    def _dispatch(self):
+        """빈 슬롯을 priority -> standard 순서로 배정하고 대기 중인 요청에 순서 변경 알림"""
+        for lane in LANES:
+            queue = self.waiting[lane]
+            while queue and len(self.running) < self.slots(lane):
+                ticket = queue.popleft()
+                ticket.started_at = time.monotonic()
+                self.running.add(ticket)
+                ticket.moved.set()
+            admission_queue_depth.labels(self.kind, lane).set(len(queue))
+        admission_running.labels(self.kind).set(len(self.running))
+        for lane in LANES:
+            for ticket in self.waiting[lane]:
+                ticket.moved.set()
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.capacity(),
+            "running": len(self.running),
+            "waiting": {lane: len(self.waiting[lane]) for lane in LANES},
+            "wait_seconds": {
+                lane: round(self.estimate_wait(lane, self.ahead_of(lane=lane)), 1) for lane in LANES
+            },
+            "max_wait_seconds": self._max_wait(),
+        }
+
+
+def _generation_capacity() -> int:
+    """동시 생성 수 - 설정값이 없으면 제공자 용량으로 추정
+
+    생성 작업은 씬을 순서대로 렌더링하므로 작업 하나가 예측 하나를 차지.
+    """
+    if settings.admission_max_generations:
+        return settings.admission_max_generations
+    if settings.replicate_key_max_concurrency and len(replicate_pool):
+        return settings.replicate_key_max_concurrency * len(replicate_pool)
+    return settings.render_capacity
+
+
+analysis_admission = AdmissionController(
+    "analysis",
+    lambda: settings.admission_max_analyses,
+    lambda: settings.admission_analysis_max_wait_seconds,
+)
+generation_admission = AdmissionController(
+    "generation",
+    _generation_capacity,
+    lambda: settings.admission_generation_max_wait_seconds,
+)
@@ -0,0 +1,287 @@
+import shutil
+import subprocess
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..config import get_settings
+from .color_grading import apply_lut, get_lut, resolve_grading
+from .metrics_service import Counter, instrumented, registry
+from .process_pool import run_in_process
+from .storage_service import storage_service
+from .text_overlay import OverlayTrack
+from .video_service import video_delivery_service
+
+settings = get_settings()
+
+graded_frames = registry.register(Counter(
+    "color_graded_frames_total", "Frames written by final video assembly", ("grading",),
+))
+
+MUSIC_FADE_IN_SECONDS = 0.5
+MUSIC_FADE_OUT_SECONDS = 1.5
+MUSIC_RAMP_SECONDS = 0.5  # 씬 경계 볼륨 변화 구간
+
+
+def _decode(ffmpeg_path: str, source: str, size: tuple[int, int], fps: int) -> subprocess.Popen:
+    """씬 클립 -> 출력 크기/fps로 맞춘 RGB24 raw 프레임 (stdout)"""
+    out_w, out_h = size
+    return subprocess.Popen(
+        [
+            ffmpeg_path, "-loglevel", "error",
+            "-i", source,
+            "-an",
+            "-vf", f"scale={out_w}:{out_h}:force_original_aspect_ratio=increase,crop={out_w}:{out_h},fps={fps}",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "pipe:1",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def _snap_cut(end: int, trimmable: int, snap: int, beats: np.ndarray) -> int:
+    """클립 끝 프레임 -> 가까운 비트 프레임
+
+    당기기는 보류 중인 프레임 수까지, 늘리기는 마지막 프레임을 유지해야 하므로 거리를 2배로 계산.
+    """
+    if not snap or not len(beats):
+        return end
+    near = beats[(beats >= end - min(trimmable, snap)) & (beats <= end + snap)]
+    if not len(near):
+        return end
+    cost = np.where(near < end, end - near, 2 * (near - end))
+    return int(near[np.argmin(cost)])
+
+
+def _volume_expression(cuts: list[float], gains_db: list[float]) -> str:
+    """씬별 볼륨 (dB) -> ffmpeg volume 표현식 (경계에서 MUSIC_RAMP_SECONDS 동안 선형 변화)"""
+    gains = [10 ** (gain / 20) for gain in gains_db]
+    expression = f"{gains[-1]:.4f}"
+    for cut, before, after in reversed(list(zip(cuts, gains, gains[1:]))):
+        start = max(cut - MUSIC_RAMP_SECONDS / 2, 0)
+        expression = (
+            f"if(lt(t,{start:.3f}),{before:.4f},"
+            f"if(lt(t,{start + MUSIC_RAMP_SECONDS:.3f}),"
+            f"{before:.4f}+({after - before:.4f})*(t-{start:.3f})/{MUSIC_RAMP_SECONDS},{expression}))"
+        )
+    return expression
+
+
+def _mix_music(ffmpeg_path: str, video: Path, output: Path, music: dict, cuts: list[float], duration: float):
+    """인코딩된 영상에 배경 음악 추가 (영상은 복사, 곡은 시작 위치부터 반복 재생)
+
+    라우드니스 정규화는 인덱스의 측정값으로 계산한 고정 gain이라 요청마다 오디오를 분석하지 않음.
+    """
+    filters = [
+        f"volume={music['gain_db']:.2f}dB",
+        f"volume='{_volume_expression(cuts, music['gains'])}':eval=frame",
+        f"afade=t=in:d={MUSIC_FADE_IN_SECONDS}",
+        f"afade=t=out:st={max(duration - MUSIC_FADE_OUT_SECONDS, 0):.3f}:d={MUSIC_FADE_OUT_SECONDS}",
+    ]
+    result = subprocess.run(
+        [
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-i", str(video),
+            "-stream_loop", "-1", "-ss", f"{music['start']:.3f}", "-i", music["path"],
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy",
+            "-af", ",".join(filters),
+            "-c:a", "aac", "-b:a", "160k",
+            "-t", f"{duration:.3f}",
+            "-movflags", "+faststart",
+            str(output),
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg music mix error: {result.stderr.decode(errors='ignore')}")
+
+
+def assemble_clips(
+    sources: list[str],
+    grading: Optional[str],
+    size: tuple[int, int],
+    fps: int,
+    chunk_frames: int,
+    ffmpeg_path: str,
+    music: Optional[dict] = None,
+    overlays: Optional[dict] = None,
+) -> tuple[bytes, int]:
+    """씬 클립을 순서대로 이어 붙이며 컬러 그레이딩 - 프로세스 풀에서 실행
+
+    디코더 출력에서 chunk_frames씩만 읽어 그레이딩 후 바로 인코더로 넘기므로
+    클립 길이와 관계없이 메모리 사용량이 일정.
+    music이 있으면 각 클립 끝의 snap 구간 프레임만 보류했다가 컷을 가까운 비트로 옮기고
+    (당기기: 보류 프레임 버림, 늘리기: 마지막 프레임 유지) 인코딩 후 음악을 믹싱.
+    overlays가 있으면 인코더에 쓰기 직전 타이틀 카드/자막을 합성 (자막 페이드 아웃 구간만큼 더 보류).
+
+    Returns:
+        (MP4 바이트, 프레임 수)
+    """
+    out_w, out_h = size
+    frame_size = out_w * out_h * 3
+    lut = get_lut(grading) if grading else None
+    frame_count = 0
+    beats = np.round(np.asarray(music["beats"]) * fps).astype(np.int64) if music else np.zeros(0, np.int64)
+    snap = int(round(music["snap_seconds"] * fps)) if music else 0
+    track = OverlayTrack(overlays, size, fps) if overlays else None
+    hold = max(snap, track.fade if track else 0)
+    cuts: list[int] = []
+    last_frame = None
+
+    def write(frame: np.ndarray, clip: int, local: int, length: Optional[int] = None):
+        nonlocal frame_count
+        if track is not None:
+            frame = track.apply(frame, frame_count, clip, local, length)
+        encoder.stdin.write(frame.tobytes())
+        frame_count += 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "final.mp4"
+        encoder = subprocess.Popen(
+            [
+                ffmpeg_path, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{out_w}x{out_h}", "-r", str(fps),
+                "-i", "pipe:0",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+                "-pix_fmt", "yuv420p",
+                "-movflags", "+faststart",
+                str(output),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            for clip, source in enumerate(sources):
+                decoder = _decode(ffmpeg_path, source, size, fps)
+                pending: deque = deque()  # 컷을 당길 수 있도록 마지막 hold개 프레임은 보류
+                clip_start = frame_count
+                clip_frames = 0
+                try:
+                    while True:
+                        data = decoder.stdout.read(frame_size * chunk_frames)
+                        usable = len(data) - len(data) % frame_size
+                        if not usable:
+                            break
+                        frames = np.frombuffer(data, dtype=np.uint8, count=usable).reshape(-1, out_h, out_w, 3)
+                        for frame in frames:
+                            # 프레임 단위로 적용하는 편이 캐시 효율이 좋음
+                            pending.append(apply_lut(frame, lut) if lut is not None else frame)
+                            if len(pending) > hold:
+                                write(pending.popleft(), clip, frame_count - clip_start)
+                        clip_frames += len(frames)
+                finally:
+                    decoder.stdout.close()
+                    stderr = decoder.stderr.read()
+                    decoder.wait()
+                if decoder.returncode != 0:
+                    raise Exception(f"ffmpeg decode error ({source}): {stderr.decode(errors='ignore')}")
+
+                # 씬이 너무 짧아지지 않도록 클립의 절반까지만 당김
+                end = frame_count + len(pending)
+                target = _snap_cut(end, min(len(pending), clip_frames // 2), snap, beats)
+                while frame_count + len(pending) > target:
+                    pending.pop()
+                last_frame = pending[-1] if pending else last_frame
+                length = target - clip_start
+                while pending:
+                    write(pending.popleft(), clip, frame_count - clip_start, length)
+                while frame_count < target and last_frame is not None:
+                    write(last_frame, clip, frame_count - clip_start, length)
+                cuts.append(frame_count)
+            encoder.stdin.close()
+        except BrokenPipeError:
+            pass  # 인코더가 먼저 종료 - 아래에서 stderr로 보고
+        except BaseException:
+            encoder.kill()
+            encoder.wait()
+            raise
+
+        stderr = encoder.stderr.read()
+        if encoder.wait() != 0:
+            raise Exception(f"ffmpeg encode error: {stderr.decode(errors='ignore')}")
+        if music and frame_count:
+            mixed = Path(tmp) / "final_music.mp4"
+            _mix_music(ffmpeg_path, output, mixed, music, [cut / fps for cut in cuts[:-1]], frame_count / fps)
+            output = mixed
+        return output.read_bytes(), frame_count
+
+
+class AssemblyService:
+    """씬 클립 -> 최종 숏츠 (디코드 -> 스크립트 color_grading의 3D LUT 적용 -> 인코드)
+
+    프레임 처리는 CPU 작업이라 공용 프로세스 풀에서 실행하고, 결과는 faststart로 저장.
+    """
+
+    def __init__(self):
+        self.ffmpeg_path = settings.ffmpeg_path
+        self.size = (settings.assembly_width, settings.assembly_height)
+        self.fps = settings.assembly_fps
+
+    @property
+    def available(self) -> bool:
+        return settings.assembly_enabled and shutil.which(self.ffmpeg_path) is not None
+
+    def _source(self, project_id: str, scene_video: dict) -> str:
+        """ffmpeg 입력 (저장소에 있는 클립은 로컬 경로 또는 S3 URL)"""
+        video_id = scene_video.get("video_id")
+        if video_id:
+            if storage_service.is_local:
+                path = storage_service.get_video_path(project_id, video_id)
+                if path:
+                    return str(path)
+            else:
+                return storage_service.get_video_url(project_id, video_id)
+        return scene_video["video_url"]
+
+    @instrumented("ffmpeg", "assemble")
+    async def assemble(
+        self,
+        project_id: str,
+        scene_videos: list[dict],
+        color_grading: Optional[str] = None,
+        music: Optional[dict] = None,
+        overlays: Optional[dict] = None,
+    ) -> dict:
+        """씬 클립 조립 + 컬러 그레이딩 (+ 배경 음악, 타이틀/자막) 후 저장
+
+        Args:
+            music: music_library.plan() 결과 (없으면 무음)
+            overlays: text_overlay.plan() 결과 (없으면 텍스트 없음)
+
+        Returns:
+            video_id, video_url, hls_url
+        """
+        videos = [video for video in scene_videos if video.get("video_url")]
+        sources = [self._source(project_id, video) for video in videos]
+        if not sources:
+            raise Exception("No scene clips to assemble")
+        if music:
+            scene_gains = music["scene_gains"]
+            music = {**music, "gains": [scene_gains.get(video.get("scene_id"), 0.0) for video in videos]}
+        if overlays:
+            captions = overlays["captions"]
+            overlays = {**overlays, "captions": [captions.get(video.get("scene_id")) for video in videos]}
+
+        grading = resolve_grading(color_grading) if settings.color_grading_enabled else None
+        data, frame_count = await run_in_process(
+            assemble_clips,
+            sources,
+            grading,
+            self.size,
+            self.fps,
+            max(settings.color_grading_chunk_frames, 1),
+            self.ffmpeg_path,
+            music,
+            overlays,
+        )
+        graded_frames.labels(grading or "none").inc(frame_count)
+        return await video_delivery_service.store_video(project_id, data)
+
+
+assembly_service = AssemblyService()
@@ -0,0 +1,268 @@
+import subprocess
+
+import numpy as np
+
+SAMPLE_RATE = 22050
+N_FFT = 2048
+HOP = 512
+FRAME_RATE = SAMPLE_RATE / HOP  # onset envelope 프레임/초
+# onset 프레임 -> 시각 보정 (초): 창이 뒤로 이동하며 onset이 hann 창의 가파른 구간(3/4 지점)을
+# 지날 때 flux가 가장 크게 증가
+FRAME_OFFSET = 0.75 * N_FFT / SAMPLE_RATE
+ONSET_BANDS = 48
+ENERGY_RATE = 2  # 에너지 곡선 값/초
+
+# 분위기 태그 (인덱스의 moods 비트 순서)
+MOODS = ("calm", "romantic", "nostalgic", "happy", "uplifting", "melancholic", "cinematic", "energetic")
+MOOD_BITS = {mood: 1 << index for index, mood in enumerate(MOODS)}
+
+# Krumhansl-Schmuckler 조성 프로파일 (C 기준)
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+
+def decode_audio(path: str, ffmpeg_path: str = "ffmpeg") -> np.ndarray:
+    """오디오 파일 -> mono float32 (SAMPLE_RATE)"""
+    result = subprocess.run(
+        [
+            ffmpeg_path, "-loglevel", "error",
+            "-i", path,
+            "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "-f", "f32le", "pipe:1",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg audio decode error ({path}): {result.stderr.decode(errors='ignore')}")
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+
+def _biquad_response(b: tuple, a: tuple, freqs: np.ndarray, sample_rate: int) -> np.ndarray:
+    """biquad 필터의 주파수별 크기 응답"""
+    z = np.exp(-1j * 2 * np.pi * freqs / sample_rate)
+    numerator = b[0] + b[1] * z + b[2] * z * z
+    denominator = a[0] + a[1] * z + a[2] * z * z
+    return np.abs(numerator / denominator)
+
+
+def _k_weighting(freqs: np.ndarray, sample_rate: int) -> np.ndarray:
+    """ITU-R BS.1770 K-weighting (high shelf + RLB high-pass) 크기 응답"""
+    # high shelf: +4dB, 1681Hz
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    gain = 10 ** (3.999843853973347 / 20)
+    q = 0.7071752369554196
+    vb = gain ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = _biquad_response(
+        ((gain + vb * k / q + k * k) / a0, 2 * (k * k - gain) / a0, (gain - vb * k / q + k * k) / a0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+        freqs, sample_rate,
+    )
+    # high-pass: 38Hz
+    k = np.tan(np.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    highpass = _biquad_response(
+        (1.0, -2.0, 1.0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+        freqs, sample_rate,
+    )
+    return shelf * highpass
+
+
+def integrated_loudness(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> float:
+    """통합 라우드니스 (LUFS, BS.1770 게이팅) - K-weighting은 주파수 영역에서 적용"""
+    block, step = int(0.4 * sample_rate), int(0.1 * sample_rate)
+    if len(samples) < block:
+        return -70.0
+    spectrum = np.fft.rfft(samples)
+    spectrum *= _k_weighting(np.fft.rfftfreq(len(samples), 1 / sample_rate), sample_rate)
+    weighted = np.fft.irfft(spectrum, n=len(samples))
+
+    # 400ms 블록 (75% 겹침) 평균 제곱
+    energy = np.concatenate(([0.0], np.cumsum(weighted.astype(np.float64) ** 2)))
+    starts = np.arange(0, len(samples) - block + 1, step)
+    power = (energy[starts + block] - energy[starts]) / block
+    loudness = -0.691 + 10 * np.log10(np.maximum(power, 1e-12))
+
+    # 절대 게이트 -70 LUFS, 상대 게이트 -10 LU
+    gated = power[loudness > -70]
+    if not len(gated):
+        return -70.0
+    relative = -0.691 + 10 * np.log10(gated.mean()) - 10
+    gated = power[(loudness > -70) & (loudness > relative)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def _spectrogram(samples: np.ndarray) -> np.ndarray:
+    """STFT 크기 (frames, N_FFT // 2 + 1)"""
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP]
+    return np.abs(np.fft.rfft(frames * np.hanning(N_FFT).astype(np.float32), axis=1)).astype(np.float32)
+
+
+def _band_matrix() -> np.ndarray:
+    """STFT bin -> 로그 간격 대역 평균 (30Hz-8kHz) - 고음 노이즈(하이햇)가 bin 수만큼 과대 반영되지 않도록"""
+    freqs = np.fft.rfftfreq(N_FFT, 1 / SAMPLE_RATE)
+    edges = np.geomspace(30, 8000, ONSET_BANDS + 1)
+    band = np.searchsorted(edges, freqs) - 1
+    matrix = np.zeros((len(freqs), ONSET_BANDS), dtype=np.float32)
+    inside = (band >= 0) & (band < ONSET_BANDS)
+    matrix[np.flatnonzero(inside), band[inside]] = 1
+    counts = matrix.sum(axis=0)
+    # 저음 대역은 bin이 없을 수 있음 -> 가장 가까운 bin 사용
+    for index in np.flatnonzero(counts == 0):
+        center = np.sqrt(edges[index] * edges[index + 1])
+        matrix[int(np.argmin(np.abs(freqs - center))), index] = 1
+    return matrix / matrix.sum(axis=0)
+
+
+def onset_envelope(magnitude: np.ndarray) -> np.ndarray:
+    """대역별 spectral flux (로그 압축 크기의 증가분 합) - 이동 평균을 빼서 비트 위치만 남김"""
+    compressed = np.log1p(100 * (magnitude @ _band_matrix()))
+    flux = np.maximum(np.diff(compressed, axis=0), 0).sum(axis=1)
+    flux = np.concatenate(([0.0], flux))
+    window = max(int(FRAME_RATE), 1)
+    local = np.convolve(flux, np.ones(window) / window, mode="same")
+    onset = np.maximum(flux - local, 0)
+    peak = onset.max()
+    return onset / peak if peak > 0 else onset
+
+
+def estimate_tempo(onset: np.ndarray, min_bpm: float = 60, max_bpm: float = 200, prior_bpm: float = 120) -> float:
+    """onset 자기상관 + 템포 prior (log2 거리 가우시안) -> BPM"""
+    size = 1 << (2 * len(onset) - 1).bit_length()
+    spectrum = np.fft.rfft(onset - onset.mean(), size)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), size)[:len(onset)]
+    # 정수가 아닌 lag은 두 칸에 나뉘므로 이웃과 합쳐서 비교
+    autocorr = np.convolve(autocorr, [0.5, 1.0, 0.5], mode="same")
+    lags = np.arange(len(autocorr), dtype=np.float64)
+    valid = (lags >= 60 * FRAME_RATE / max_bpm) & (lags <= 60 * FRAME_RATE / min_bpm)
+    if not valid.any():
+        return prior_bpm
+    bpm = 60 * FRAME_RATE / np.maximum(lags, 1)
+    score = np.where(valid, autocorr * np.exp(-0.5 * np.log2(bpm / prior_bpm) ** 2), -np.inf)
+    lag = int(np.argmax(score))
+    # 포물선 보간으로 프레임 사이 lag 추정
+    if 0 < lag < len(score) - 1 and np.isfinite(score[lag - 1]) and np.isfinite(score[lag + 1]):
+        left, center, right = score[lag - 1], score[lag], score[lag + 1]
+        denominator = left - 2 * center + right
+        if denominator:
+            lag += 0.5 * (left - right) / denominator
+    return float(60 * FRAME_RATE / lag)
+
+
+def track_beats(onset: np.ndarray, bpm: float, tightness: float = 100.0) -> np.ndarray:
+    """동적 계획법 비트 추적 (Ellis 2007) -> 비트 시각 (초)
+
+    각 프레임 점수 = onset + 이전 비트 점수 - 템포에서 벗어난 간격의 페널티.
+    """
+    period = 60 * FRAME_RATE / bpm
+    if len(onset) < 2 * period:
+        return np.zeros(0, dtype=np.float32)
+    offsets = np.arange(-int(round(2 * period)), -int(round(period / 2)) + 1)
+    penalty = -tightness * np.log(-offsets / period) ** 2
+
+    score = onset.astype(np.float64).copy()
+    backlink = np.full(len(onset), -1, dtype=np.int64)
+    for t in range(-offsets[0], len(onset)):
+        candidates = score[t + offsets] + penalty
+        best = int(np.argmax(candidates))
+        if candidates[best] > 0:
+            score[t] += candidates[best]
+            backlink[t] = t + offsets[best]
+
+    # 끝부분 국소 최대 중 충분히 큰 마지막 점에서 역추적
+    tail = score[-int(round(2 * period)):]
+    last = len(onset) - len(tail) + int(np.argmax(tail))
+    beats = [last]
+    while backlink[beats[-1]] >= 0:
+        beats.append(int(backlink[beats[-1]]))
+    return (np.array(beats[::-1], dtype=np.float32) / FRAME_RATE + FRAME_OFFSET).astype(np.float32)
+
+
+def energy_curve(samples: np.ndarray) -> np.ndarray:
+    """ENERGY_RATE 간격 RMS (dB) -> 0-1 (-40dB 이하 0, 곡 최대 1)"""
+    step = SAMPLE_RATE // ENERGY_RATE
+    count = len(samples) // step
+    if not count:
+        return np.zeros(0, dtype=np.float16)
+    blocks = samples[:count * step].reshape(count, step).astype(np.float64)
+    db = 10 * np.log10(np.maximum((blocks ** 2).mean(axis=1), 1e-10))
+    top = db.max()
+    return np.clip((db - (top - 40)) / 40, 0, 1).astype(np.float16)
+
+
+def _chroma(magnitude: np.ndarray) -> np.ndarray:
+    """65Hz-2kHz 구간 크기를 음이름 12개로 합산"""
+    freqs = np.fft.rfftfreq(N_FFT, 1 / SAMPLE_RATE)
+    band = (freqs >= 65) & (freqs <= 2000)
+    pitch_class = np.round(12 * np.log2(freqs[band] / 440.0) + 9).astype(int) % 12
+    chroma = np.bincount(pitch_class, weights=magnitude[:, band].sum(axis=0), minlength=12)
+    return chroma / chroma.sum() if chroma.sum() else chroma
+
+
+def major_score(magnitude: np.ndarray) -> float:
+    """장조 프로파일 최대 상관 - 단조 프로파일 최대 상관 (양수면 장조)"""
+    chroma = _chroma(magnitude)
+    if not chroma.any():
+        return 0.0
+
+    def best(profile: np.ndarray) -> float:
+        return max(np.corrcoef(chroma, np.roll(profile, shift))[0, 1] for shift in range(12))
+
+    return float(best(MAJOR_PROFILE) - best(MINOR_PROFILE))
+
+
+def derive_moods(bpm: float, loudness: float, centroid: float, major: float, energy: np.ndarray) -> int:
+    """특성값 -> 분위기 태그 비트 (태그가 지정되지 않은 곡용)"""
+    dynamic = float(np.percentile(energy, 90) - np.percentile(energy, 10)) if len(energy) else 0.0
+    bright = centroid > 2000
+    tags = set()
+    if bpm < 90 and loudness < -16:
+        tags.add("calm")
+    if bpm >= 118 and loudness > -14:
+        tags.add("energetic")
+    if major > 0:
+        tags.add("happy" if bpm >= 100 else "romantic")
+        if bpm >= 85:
+            tags.add("uplifting")
+    else:
+        tags.add("melancholic" if bpm < 100 else "cinematic")
+    if bpm < 105 and (major <= 0 or not bright):
+        tags.add("nostalgic")
+    if dynamic > 0.45:
+        tags.add("cinematic")
+    return sum(MOOD_BITS[tag] for tag in tags)
+
+
+def analyze_track(path: str, ffmpeg_path: str = "ffmpeg") -> dict:
+    """곡 하나 분석 - 프로세스 풀에서 실행
+
+    Returns:
+        duration, bpm, loudness (LUFS), centroid (Hz), major, moods (비트), beats (초), energy (0-1)
+    """
+    samples = decode_audio(path, ffmpeg_path)
+    if len(samples) < SAMPLE_RATE:
+        raise Exception(f"Track too short: {path}")
+
+    magnitude = _spectrogram(samples)
+    onset = onset_envelope(magnitude)
+    bpm = estimate_tempo(onset)
+    freqs = np.fft.rfftfreq(N_FFT, 1 / SAMPLE_RATE).astype(np.float32)
+    frame_power = magnitude.sum(axis=1)
+    centroid = float((magnitude @ freqs).sum() / max(frame_power.sum(), 1e-9))
+    loudness = integrated_loudness(samples)
+    major = major_score(magnitude)
+    energy = energy_curve(samples)
+    return {
+        "duration": len(samples) / SAMPLE_RATE,
+        "bpm": bpm,
+        "loudness": loudness,
+        "centroid": centroid,
+        "major": major,
+        "moods": derive_moods(bpm, loudness, centroid, major, energy),
+        "beats": track_beats(onset, bpm),
+        "energy": energy,
+    }
@@ -0,0 +1,158 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..config import get_settings
+
+settings = get_settings()
+
+# 이름별 그레이딩 설정 (suggest_color_grading / 스크립트 color_grading 값)
+# exposure: 밝기 배수, contrast: S-curve 강도, saturation: 채도 배수,
+# temperature: +따뜻함/-차가움, lift: 검은색 들어올림, shadows/highlights: 어두운/밝은 영역 색조 (RGB 더하기)
+GRADINGS = {
+    "natural": {},
+    "bright_natural": {"exposure": 1.08, "contrast": 0.1, "saturation": 1.05},
+    "warm_vintage": {
+        "temperature": 0.06, "lift": 0.06, "saturation": 0.85, "contrast": 0.15,
+        "shadows": (0.02, 0.0, -0.03), "highlights": (0.03, 0.015, -0.02),
+    },
+    "cool_cinematic": {
+        "temperature": -0.05, "contrast": 0.25, "saturation": 0.95,
+        "shadows": (-0.02, 0.01, 0.04), "highlights": (0.03, 0.01, -0.01),
+    },
+    "soft_pastel": {"lift": 0.08, "contrast": -0.15, "saturation": 0.8, "exposure": 1.04},
+    "moody_dark": {
+        "exposure": 0.88, "contrast": 0.3, "saturation": 0.75,
+        "shadows": (-0.01, 0.0, 0.03),
+    },
+}
+# LLM이 만든 이름 -> 가까운 그레이딩 (앞에서부터 먼저 일치하는 키워드)
+GRADING_KEYWORDS = (
+    ("vintage", "warm_vintage"),
+    ("warm", "warm_vintage"),
+    ("cool", "cool_cinematic"),
+    ("cinematic", "cool_cinematic"),
+    ("moody", "moody_dark"),
+    ("dark", "moody_dark"),
+    ("pastel", "soft_pastel"),
+    ("soft", "soft_pastel"),
+    ("bright", "bright_natural"),
+)
+LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def _cube_files() -> dict[str, Path]:
+    """color_lut_dir의 .cube 파일 (파일 이름 = 그레이딩 이름)"""
+    if not settings.color_lut_dir:
+        return {}
+    directory = Path(settings.color_lut_dir)
+    if not directory.is_dir():
+        return {}
+    return {path.stem.lower(): path for path in directory.glob("*.cube")}
+
+
+def resolve_grading(name: Optional[str]) -> Optional[str]:
+    """스크립트의 color_grading -> 적용할 LUT 이름 (원본 그대로면 None)"""
+    key = (name or "").strip().lower().replace(" ", "_").replace("-", "_")
+    if key in _cube_files() or (key in GRADINGS and key != "natural"):
+        return key
+    if key in GRADINGS:
+        return None
+    return next((grading for keyword, grading in GRADING_KEYWORDS if keyword in key), None)
+
+
+def _build_lut(size: int, exposure: float = 1.0, contrast: float = 0.0, saturation: float = 1.0,
+               temperature: float = 0.0, lift: float = 0.0, shadows=(0.0, 0.0, 0.0), highlights=(0.0, 0.0, 0.0)):
+    """설정값으로 (size, size, size, 3) LUT 생성 - [r, g, b] 인덱스 -> 출력 RGB (0-1)"""
+    axis = np.linspace(0.0, 1.0, size, dtype=np.float32)
+    rgb = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+
+    rgb = rgb * exposure
+    rgb = rgb + np.array([temperature, 0.0, -temperature], dtype=np.float32)
+    # S-curve: 0.5 기준으로 대비 조절 (contrast < 0이면 대비 감소)
+    rgb = np.clip(rgb, 0.0, 1.0)
+    curve = rgb - contrast * 4 * rgb * (rgb - 0.5) * (rgb - 1.0)
+    rgb = np.clip(curve, 0.0, 1.0)
+
+    luma = (rgb @ LUMA)[..., None]
+    rgb = luma + (rgb - luma) * saturation
+    # split toning - 어두운 영역/밝은 영역에 각각 색조
+    rgb = rgb + (1 - luma) * np.array(shadows, dtype=np.float32) + luma * np.array(highlights, dtype=np.float32)
+    rgb = lift + rgb * (1 - lift)
+    return np.clip(rgb, 0.0, 1.0).astype(np.float32)
+
+
+def _read_cube(path: Path) -> np.ndarray:
+    """Adobe .cube 3D LUT (빨강이 가장 빠르게 변하는 순서) -> [r, g, b] 인덱스"""
+    size = None
+    values = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.upper().startswith("LUT_3D_SIZE"):
+            size = int(line.split()[1])
+        elif line[0].isdigit() or line[0] in "-.":
+            values.append([float(v) for v in line.split()[:3]])
+    if not size or len(values) != size ** 3:
+        raise ValueError(f"Invalid 3D LUT: {path.name}")
+    # 파일 순서는 [b][g][r] -> [r][g][b]로 전치
+    table = np.asarray(values, dtype=np.float32).reshape(size, size, size, 3)
+    return np.ascontiguousarray(table.transpose(2, 1, 0, 3))
+
+
+@lru_cache(maxsize=16)
+def get_lut(name: str) -> np.ndarray:
+    """이름별 LUT (프로세스 내 캐시) - 0-255 스케일로 저장해 적용 시 곱셈 생략"""
+    cube = _cube_files().get(name)
+    table = _read_cube(cube) if cube else _build_lut(settings.color_lut_size, **GRADINGS[name])
+    return table * 255.0
+
+
+@lru_cache(maxsize=8)
+def _axis_tables(size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """0-255 입력값 -> 격자 위치 (r/g/b별 평탄화 오프셋, 보간 가중치)
+
+    픽셀마다 나눗셈/곱셈하지 않도록 256개 값으로 미리 계산.
+    """
+    position = np.arange(256, dtype=np.float32) * (size - 1) / 255
+    index = np.minimum(position.astype(np.int32), size - 2)
+    weight = (position - index).astype(np.float32)
+    return index * size * size, index * size, index, weight
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """a + (b - a) * t (b를 임시 버퍼로 재사용)"""
+    b -= a
+    b *= t
+    a += b
+    return a
+
+
+def apply_lut(frames: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """uint8 RGB 프레임 (..., 3)에 3D LUT 적용 (trilinear 보간, 전체 픽셀 한 번에)
+
+    조회는 fancy indexing보다 빠른 np.take 사용.
+    """
+    size = lut.shape[0]
+    offset_r, offset_g, offset_b, weight = _axis_tables(size)
+    flat = lut.reshape(-1, 3)
+    r, g, b = frames[..., 0], frames[..., 1], frames[..., 2]
+
+    # 8개 격자점 중 [r0, g0, b0]의 평탄화 인덱스, 나머지는 오프셋
+    base = np.take(offset_r, r)
+    base += np.take(offset_g, g)
+    base += np.take(offset_b, b)
+    wr, wg, wb = (np.take(weight, channel)[..., None] for channel in (r, g, b))
+    dg, dr = size, size * size
+
+    def corner(offset: int) -> np.ndarray:
+        return np.take(flat, base + offset, axis=0)
+
+    c0 = _lerp(_lerp(corner(0), corner(1), wb), _lerp(corner(dg), corner(dg + 1), wb), wg)
+    c1 = _lerp(_lerp(corner(dr), corner(dr + 1), wb), _lerp(corner(dr + dg), corner(dr + dg + 1), wb), wg)
+    out = _lerp(c0, c1, wr)
+    out += 0.5  # 반올림
+    return out.astype(np.uint8)
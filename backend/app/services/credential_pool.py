@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from ..config import get_settings
+from .metrics_service import Counter, Gauge, registry
+
+settings = get_settings()
+
+credential_requests = registry.register(Counter(
+    "credential_requests_total", "Provider requests per credential", ("provider", "credential", "outcome"),
+))
+credential_in_flight = registry.register(Gauge(
+    "credential_in_flight", "Requests/predictions in flight per credential", ("provider", "credential"),
+))
+
+
+class RateLimited(Exception):
+    """429 응답 - 해당 키는 쿨다운, 다른 키로 재시도"""
+
+
+def _parse_keys(*values: str) -> list[str]:
+    """단일 키 + 쉼표 구분 키 목록 (중복 제거, 순서 유지)"""
+    keys = [key.strip() for value in values for key in value.split(",")]
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+class Credential:
+    def __init__(self, provider: str, index: int, key: str):
+        self.provider = provider
+        self.key = key
+        # 로그/메트릭용 이름 (키 전체는 노출하지 않음)
+        self.name = f"{index}:{key[-4:]}" if len(key) > 8 else str(index)
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.cooldown_until = 0.0
+        self.consecutive_429 = 0
+        self.recent: deque = deque()  # 최근 1분 요청 시각
+
+    def window_count(self, now: float) -> int:
+        while self.recent and self.recent[0] <= now - 60:
+            self.recent.popleft()
+        return len(self.recent)
+
+    def usage(self, now: float) -> dict:
+        return {
+            "credential": self.name,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "requests_last_minute": self.window_count(now),
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "cooldown_seconds": round(max(self.cooldown_until - now, 0), 1),
+        }
+
+
+class CredentialPool:
+    """제공자 API 키 풀
+
+    키마다 분당 요청 수/동시 실행 수를 따로 추적하고, 사용 가능한 키 중 가장 한가한 키를 선택.
+    429를 받은 키는 Retry-After (없으면 credential_cooldown_seconds, 연속 429마다 2배) 동안 제외.
+    """
+
+    def __init__(self, provider: str, keys: list[str], requests_per_minute: int = 0, max_concurrency: int = 0):
+        self.provider = provider
+        self.credentials = [Credential(provider, index, key) for index, key in enumerate(keys)]
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max_concurrency
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def _wait_time(self, credential: Credential, now: float) -> float:
+        """키를 사용할 수 있을 때까지 남은 시간 (0이면 바로 사용 가능)"""
+        wait = max(credential.cooldown_until - now, 0)
+        if self.requests_per_minute and credential.window_count(now) >= self.requests_per_minute:
+            wait = max(wait, credential.recent[0] + 60 - now)
+        if self.max_concurrency and credential.in_flight >= self.max_concurrency:
+            wait = max(wait, 0.1)  # 실행 중인 요청이 끝날 때까지
+        return wait
+
+    def _pick(self) -> tuple[Optional[Credential], float]:
+        now = time.monotonic()
+        ready = [c for c in self.credentials if self._wait_time(c, now) == 0]
+        if ready:
+            return min(ready, key=lambda c: (c.in_flight, c.window_count(now), c.requests)), 0.0
+        return None, min(self._wait_time(c, now) for c in self.credentials)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """가장 한가한 키를 빌려 사용 (모든 키가 한도/쿨다운이면 가장 빨리 풀리는 시점까지 대기)"""
+        if not self.credentials:
+            raise Exception(f"No {self.provider} API key configured")
+
+        while True:
+            credential, wait = self._pick()
+            if credential:
+                break
+            await asyncio.sleep(min(max(wait, 0.05), 5.0))
+
+        credential.in_flight += 1
+        credential.requests += 1
+        credential.recent.append(time.monotonic())
+        credential_in_flight.labels(self.provider, credential.name).inc()
+        try:
+            yield credential
+        finally:
+            credential.in_flight -= 1
+            credential_in_flight.labels(self.provider, credential.name).dec()
+
+    def record(self, credential: Credential, status_code: int, retry_after: Optional[str] = None):
+        """응답 결과 반영 - 429면 쿨다운 후 RateLimited"""
+        if status_code == 429:
+            credential.rate_limited += 1
+            credential.consecutive_429 += 1
+            try:
+                cooldown = float(retry_after)
+            except (TypeError, ValueError):
+                cooldown = settings.credential_cooldown_seconds * 2 ** (credential.consecutive_429 - 1)
+            credential.cooldown_until = time.monotonic() + cooldown
+            credential_requests.labels(self.provider, credential.name, "rate_limited").inc()
+            raise RateLimited(f"{self.provider} credential {credential.name} rate limited for {cooldown:.0f}s")
+
+        credential.consecutive_429 = 0
+        outcome = "success" if status_code < 400 else "error"
+        if outcome == "error":
+            credential.errors += 1
+        credential_requests.labels(self.provider, credential.name, outcome).inc()
+
+    def healthy(self) -> bool:
+        """쿨다운 중이 아닌 키가 하나라도 있는지"""
+        now = time.monotonic()
+        return any(credential.cooldown_until <= now for credential in self.credentials)
+
+    def usage(self) -> list[dict]:
+        now = time.monotonic()
+        return [credential.usage(now) for credential in self.credentials]
+
+
+replicate_pool = CredentialPool(
+    "replicate",
+    _parse_keys(settings.replicate_api_key, settings.replicate_api_keys),
+    settings.replicate_key_requests_per_minute,
+    settings.replicate_key_max_concurrency,
+)
+groq_pool = CredentialPool(
+    "groq",
+    _parse_keys(settings.groq_api_key, settings.groq_api_keys),
+    settings.groq_key_requests_per_minute,
+)
@@ -0,0 +1,122 @@
+import io
+import logging
+from typing import Optional
+
+import numpy as np
+
+from ..config import get_settings
+from .process_pool import run_in_process
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# pHash: 32x32 grayscale -> 2D DCT -> 저주파 8x8 (DC 제외) 중앙값 기준 64비트
+HASH_IMAGE_SIZE = 32
+HASH_LOW_FREQ = 8
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """DCT-II 변환 행렬 (orthonormal)"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(HASH_IMAGE_SIZE)
+_BIT_WEIGHTS = (1 << np.arange(63, -1, -1, dtype=np.uint64)).astype(np.uint64)
+# 바이트별 popcount 테이블 (XOR 결과의 해밍 거리 계산용)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def perceptual_hash(image_data: bytes) -> int:
+    """64비트 pHash"""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(image_data)) as img:
+        # JPEG은 축소 디코딩으로 큰 원본도 빠르게 처리
+        img.draft("L", (HASH_IMAGE_SIZE * 4, HASH_IMAGE_SIZE * 4))
+        img = ImageOps.exif_transpose(img).convert("L")
+        img = img.resize((HASH_IMAGE_SIZE, HASH_IMAGE_SIZE), Image.Resampling.LANCZOS)
+
+    pixels = np.asarray(img, dtype=np.float64)
+    dct = _DCT @ pixels @ _DCT.T
+    low = dct[:HASH_LOW_FREQ, :HASH_LOW_FREQ].flatten()
+    bits = low > np.median(low[1:])
+    bits[0] = False  # DC 성분은 밝기만 반영
+    return int((bits.astype(np.uint64) * _BIT_WEIGHTS).sum())
+
+
+def hash_images(images: list[bytes]) -> list[Optional[int]]:
+    """여러 이미지 pHash - 프로세스 풀에서 실행 (디코딩 실패는 None)"""
+    hashes = []
+    for data in images:
+        try:
+            hashes.append(perceptual_hash(data))
+        except Exception:
+            hashes.append(None)
+    return hashes
+
+
+def hamming_matrix(hashes: list[int]) -> np.ndarray:
+    """모든 쌍의 해밍 거리 (n x n)"""
+    values = np.array(hashes, dtype=np.uint64)
+    xor = values[:, None] ^ values[None, :]
+    return _POPCOUNT[xor.view(np.uint8)].reshape(len(values), len(values), 8).sum(axis=2)
+
+
+def group_duplicates(hashes: list[int], threshold: int) -> list[list[int]]:
+    """해밍 거리 threshold 이하를 같은 그룹으로 묶음 (인덱스, 먼저 나온 사진이 대표)
+
+    Returns:
+        2장 이상인 그룹만
+    """
+    if len(hashes) < 2:
+        return []
+
+    near = hamming_matrix(hashes) <= threshold
+    assigned = np.zeros(len(hashes), dtype=bool)
+    groups = []
+    for i in range(len(hashes)):
+        if assigned[i]:
+            continue
+        members = np.flatnonzero(near[i] & ~assigned)
+        assigned[members] = True
+        if len(members) > 1:
+            groups.append(members.tolist())
+    return groups
+
+
+class DedupService:
+    """연속 촬영/거의 같은 사진 감지 (Vision 분석, 렌더링 전)"""
+
+    def __init__(self):
+        self.enabled = settings.dedup_enabled
+        self.threshold = settings.dedup_hamming_threshold
+
+    async def find_duplicate_groups(self, images: list[tuple[str, bytes]]) -> list[list[str]]:
+        """중복 그룹 (photo_id 목록, 첫 항목이 대표)"""
+        if not self.enabled or len(images) < 2:
+            return []
+
+        try:
+            hashes = await run_in_process(hash_images, [data for _, data in images])
+        except Exception as e:
+            logger.warning("Perceptual hashing failed: %s", e)
+            return []
+
+        # 디코딩 실패한 사진은 중복 판단에서 제외
+        hashed = [(photo_id, h) for (photo_id, _), h in zip(images, hashes) if h is not None]
+        return [
+            [hashed[i][0] for i in group]
+            for group in group_duplicates([h for _, h in hashed], self.threshold)
+        ]
+
+
+def duplicate_map(groups: list[list[str]]) -> dict[str, str]:
+    """photo_id -> 대표 photo_id (대표 자신은 제외)"""
+    return {photo_id: group[0] for group in groups for photo_id in group[1:]}
+
+
+dedup_service = DedupService()
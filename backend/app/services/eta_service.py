@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from ..config import get_settings
+from .metrics_service import Gauge, registry
+
+settings = get_settings()
+
+# 기록이 부족할 때 쓰는 단위당 초기 추정치 (analysis/script: 사진 1장, render_scene/assemble: 씬 1개)
+STAGE_PRIORS = {
+    "analysis": 1.5,
+    "script": 1.5,
+    "render_scene": {
+        "full": settings.render_full_latency_seconds,
+        "draft": settings.render_draft_latency_seconds,
+        "local": settings.render_local_latency_seconds,
+    },
+    "ingest": 10.0,
+    "assemble": 4.0,  # 씬 1개
+}
+# 관측값이 없을 때 p50 대비 p90 배수
+PRIOR_SPREAD = 1.8
+
+stage_estimate = registry.register(Gauge(
+    "stage_duration_estimate_seconds", "Rolling per-unit stage duration quantiles", ("stage", "model", "quantile"),
+))
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    """정렬된 값의 분위수 (선형 보간)"""
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class EtaService:
+    """단계별 소요 시간 기록 -> 남은 시간(ETA) / 폴링 간격 추정
+
+    (단계, 모델)마다 단위(사진/씬)당 소요 시간을 최근 eta_window_size개 보관하고
+    p50/p90으로 추정. 프로세스 내 기록이라 재시작 직후에는 STAGE_PRIORS 사용.
+    """
+
+    def __init__(self):
+        self.samples: dict[tuple[str, str], deque] = {}
+
+    def record(self, stage: str, seconds: float, units: int = 1, model: str = "default"):
+        key = (stage, model)
+        if key not in self.samples:
+            self.samples[key] = deque(maxlen=settings.eta_window_size)
+        self.samples[key].append(seconds / max(units, 1))
+
+        p50, p90, _ = self.quantiles(stage, model)
+        stage_estimate.labels(stage, model, "0.5").set(p50)
+        stage_estimate.labels(stage, model, "0.9").set(p90)
+
+    @asynccontextmanager
+    async def timed(self, stage: str, units: int = 1, model: str = "default"):
+        """성공한 경우만 기록 (실패/타임아웃은 분포를 왜곡)"""
+        start = time.monotonic()
+        yield
+        self.record(stage, time.monotonic() - start, units, model)
+
+    def quantiles(self, stage: str, model: str = "default") -> tuple[float, float, int]:
+        """단위당 (p50, p90, 표본 수)"""
+        samples = self.samples.get((stage, model))
+        if samples and len(samples) >= settings.eta_min_samples:
+            ordered = sorted(samples)
+            return _quantile(ordered, 0.5), _quantile(ordered, 0.9), len(ordered)
+
+        prior = STAGE_PRIORS.get(stage, 5.0)
+        if isinstance(prior, dict):
+            prior = prior.get(model, max(prior.values()))
+        return prior, prior * PRIOR_SPREAD, len(samples or ())
+
+    def estimate(self, steps: list[tuple[str, int, str]], elapsed: float = 0.0) -> Optional[dict]:
+        """남은 단계들의 ETA
+
+        Args:
+            steps: [(stage, units, model)] - 첫 항목이 현재 진행 중인 단계
+            elapsed: 현재 단계 경과 시간 (초)
+
+        Returns:
+            {"eta_seconds", "eta_p90_seconds", "confidence"} - confidence: 가장 표본이 적은 단계 기준
+        """
+        if not steps:
+            return None
+
+        p50_total = p90_total = 0.0
+        min_samples = None
+        for index, (stage, units, model) in enumerate(steps):
+            p50, p90, count = self.quantiles(stage, model)
+            p50, p90 = p50 * units, p90 * units
+            if index == 0:
+                # 예상보다 오래 걸리는 중이면 최소한 p50의 10%는 남은 것으로
+                p50 = max(p50 - elapsed, p50 * 0.1)
+                p90 = max(p90 - elapsed, p50)
+            p50_total += p50
+            p90_total += p90
+            min_samples = count if min_samples is None else min(min_samples, count)
+
+        if min_samples >= settings.eta_min_samples * 4:
+            confidence = "high"
+        elif min_samples >= settings.eta_min_samples:
+            confidence = "medium"
+        else:
+            confidence = "low"
+        return {
+            "eta_seconds": round(p50_total, 1),
+            "eta_p90_seconds": round(p90_total, 1),
+            "confidence": confidence,
+        }
+
+    def poll_interval(self, eta_seconds: Optional[float]) -> float:
+        """클라이언트 상태 폴링 간격 - 남은 시간의 1/10 (최소/최대 제한)"""
+        if eta_seconds is None:
+            return settings.poll_min_seconds
+        return round(min(max(eta_seconds / 10, settings.poll_min_seconds), settings.poll_max_seconds), 1)
+
+    def poll_delay(self, stage: str, model: str, elapsed: float) -> float:
+        """외부 작업 상태 조회 간격
+
+        예상 완료(p50) 전에는 드물게, p50 이후에는 p50~p90 구간을 잘게 나눠 자주 조회.
+        """
+        p50, p90, _ = self.quantiles(stage, model)
+        if elapsed < p50:
+            delay = (p50 - elapsed) / 2
+        else:
+            delay = (p90 - p50) / 5
+        return min(max(delay, settings.poll_min_seconds), settings.poll_max_seconds)
+
+
+eta_service = EtaService()
@@ -1,9 +1,33 @@
-import httpx
 import base64
 import json
+import logging
+from typing import Optional
 from ..config import get_settings
+from .dedup_service import dedup_service, duplicate_map
+from .groq_service import groq_service
+from .http_clients import get_http_client
+from .lazy import LazyService
+from .image_properties import analyze_image_properties, suggest_color_grading
+from .llm_json import LLMJSONError, parse_llm_json, repair_summary
+from .metrics_service import external_call_failures, instrumented
+from .process_pool import run_in_process
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+VISION_FEATURES = [
+    {"type": "LABEL_DETECTION", "maxResults": 10},
+    {"type": "FACE_DETECTION", "maxResults": 10},
+    {"type": "LANDMARK_DETECTION", "maxResults": 5},
+    {"type": "OBJECT_LOCALIZATION", "maxResults": 10},
+]
+
+# Groq 요약 실패 시 기본값
+DEFAULT_SUMMARY = {
+    "overall_theme": "개인 스토리",
+    "suggested_narrative_arc": "시작 → 전개 → 결말",
+    "emotional_journey": ["기대", "경험", "회상"],
+}
 
 
 class VisionService:
@@ -11,47 +35,55 @@ class VisionService:
 
     def __init__(self):
         self.api_key = settings.google_vision_api_key
-        self.base_url = "https://vision.googleapis.com/v1"
+        self.base_url = settings.google_vision_base_url
 
     async def analyze_image(self, image_data: bytes, photo_id: str) -> dict:
-        """단일 이미지 분석 - Vision API로 라벨, 얼굴, 색상 등 추출"""
-        base64_image = base64.b64encode(image_data).decode("utf-8")
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self.base_url}/images:annotate",
-                params={"key": self.api_key},
-                headers={"Content-Type": "application/json"},
-                json={
-                    "requests": [
-                        {
-                            "image": {"content": base64_image},
-                            "features": [
-                                {"type": "LABEL_DETECTION", "maxResults": 10},
-                                {"type": "FACE_DETECTION", "maxResults": 10},
-                                {"type": "IMAGE_PROPERTIES"},
-                                {"type": "LANDMARK_DETECTION", "maxResults": 5},
-                                {"type": "OBJECT_LOCALIZATION", "maxResults": 10},
-                            ],
-                        }
-                    ]
-                },
+        """단일 이미지 분석 - 색상/밝기 등은 로컬, 라벨/얼굴 등은 Vision API"""
+        try:
+            properties, vision_image = await run_in_process(
+                analyze_image_properties, image_data, settings.vision_max_image_size
             )
+        except Exception as e:
+            # 로컬 디코딩 실패 시 Vision의 IMAGE_PROPERTIES로 대체
+            logger.warning("Local image analysis failed for %s: %s", photo_id, e)
+            properties, vision_image = None, None
+
+        features = VISION_FEATURES if properties else VISION_FEATURES + [{"type": "IMAGE_PROPERTIES"}]
+        response_data = await self._annotate(vision_image or image_data, features)
+
+        # Vision API 결과를 우리 형식으로 변환
+        analysis = self._parse_vision_response(response_data, properties)
+        analysis["photo_id"] = photo_id
+
+        return analysis
 
-            if response.status_code != 200:
-                raise Exception(f"Vision API error: {response.text}")
+    @instrumented("vision", "annotate")
+    async def _annotate(self, image_data: bytes, features: list[dict]) -> dict:
+        base64_image = base64.b64encode(image_data).decode("utf-8")
 
-            result = response.json()
-            response_data = result.get("responses", [{}])[0]
+        client = get_http_client("vision")
+        response = await client.post(
+            f"{self.base_url}/images:annotate",
+            params={"key": self.api_key},
+            headers={"Content-Type": "application/json"},
+            json={
+                "requests": [
+                    {
+                        "image": {"content": base64_image},
+                        "features": features,
+                    }
+                ]
+            },
+        )
 
-            # Vision API 결과를 우리 형식으로 변환
-            analysis = self._parse_vision_response(response_data)
-            analysis["photo_id"] = photo_id
+        if response.status_code != 200:
+            raise Exception(f"Vision API error: {response.text}")
 
-            return analysis
+        result = response.json()
+        return result.get("responses", [{}])[0]
 
-    def _parse_vision_response(self, response: dict) -> dict:
-        """Vision API 응답을 분석 형식으로 변환"""
+    def _parse_vision_response(self, response: dict, properties: Optional[dict] = None) -> dict:
+        """Vision API 응답 + 로컬 이미지 속성을 분석 형식으로 변환"""
         # 라벨 추출
         labels = [label.get("description", "") for label in response.get("labelAnnotations", [])]
 
@@ -67,14 +99,17 @@ class VisionService:
             if face.get("surpriseLikelihood") in ["LIKELY", "VERY_LIKELY"]:
                 emotions.append("surprised")
 
-        # 색상 추출
-        colors = []
-        image_props = response.get("imagePropertiesAnnotation", {})
-        dominant_colors = image_props.get("dominantColors", {}).get("colors", [])
-        for color_info in dominant_colors[:5]:
-            color = color_info.get("color", {})
-            r, g, b = color.get("red", 0), color.get("green", 0), color.get("blue", 0)
-            colors.append(f"rgb({int(r)},{int(g)},{int(b)})")
+        # 색상 추출 (로컬 분석 실패 시에만 Vision 결과 사용)
+        if properties:
+            colors = properties["colors"]
+        else:
+            colors = []
+            image_props = response.get("imagePropertiesAnnotation", {})
+            dominant_colors = image_props.get("dominantColors", {}).get("colors", [])
+            for color_info in dominant_colors[:5]:
+                color = color_info.get("color", {})
+                r, g, b = color.get("red", 0), color.get("green", 0), color.get("blue", 0)
+                colors.append(f"rgb({int(r)},{int(g)},{int(b)})")
 
         # 랜드마크 추출
         landmarks = [lm.get("description", "") for lm in response.get("landmarkAnnotations", [])]
@@ -97,8 +132,17 @@ class VisionService:
                 mood = "melancholy"
         elif any(kw in " ".join(labels).lower() for kw in ["sunset", "beach", "nature"]):
             mood = "peaceful"
+        elif properties and properties["brightness"] < 0.3:
+            mood = "moody"
+        elif properties and properties["warmth"] > 0.1 and properties["brightness"] > 0.5:
+            mood = "warm"
 
-        return {
+        # 시간대 추정 (어두운 사진은 밤)
+        time_of_day = "unknown"
+        if properties and properties["brightness"] < 0.2:
+            time_of_day = "night"
+
+        analysis = {
             "people": {
                 "count": face_count,
                 "relationship": "unknown",
@@ -107,28 +151,50 @@ class VisionService:
             "setting": {
                 "type": landmarks[0] if landmarks else (objects[0] if objects else "unknown"),
                 "indoor": indoor and not outdoor,
-                "time": "unknown",
+                "time": time_of_day,
                 "season": "unknown",
             },
             "mood": mood,
             "colors": colors,
             "key_elements": labels[:5] + objects[:3],
         }
+        if properties:
+            analysis["properties"] = {k: v for k, v in properties.items() if k != "colors"}
+        return analysis
 
     async def analyze_all_images(self, images: list[tuple[str, bytes]]) -> dict:
-        """여러 이미지 분석 및 전체 테마 추출"""
-        analyses = []
+        """여러 이미지 분석 및 전체 테마 추출
 
-        for photo_id, image_data in images:
-            analysis = await self.analyze_image(image_data, photo_id)
-            analyses.append(analysis)
+        거의 같은 사진은 대표 사진만 Vision으로 분석하고 결과를 공유.
+        """
+        duplicate_groups = await dedup_service.find_duplicate_groups(images)
+        duplicate_of = duplicate_map(duplicate_groups)
 
-        # 전체 분석 요약 (Groq 사용)
-        overall_analysis = await self._summarize_with_groq(analyses)
+        analyses = {}
+        for photo_id, image_data in images:
+            if photo_id not in duplicate_of:
+                analyses[photo_id] = await self.analyze_image(image_data, photo_id)
+
+        return await self.summarize_analyses(
+            with_duplicates([photo_id for photo_id, _ in images], analyses, duplicate_groups),
+            duplicate_groups,
+        )
+
+    async def summarize_analyses(self, analyses: list[dict], duplicate_groups: list[list[str]] = None) -> dict:
+        """사진별 분석 결과에 전체 테마 요약 추가 (Groq 사용, 중복 사진 제외)"""
+        overall_analysis = await self._summarize_with_groq(
+            [analysis for analysis in analyses if not analysis.get("duplicate_of")]
+        )
         overall_analysis["photos"] = analyses
+        overall_analysis["duplicate_groups"] = duplicate_groups or []
+        # 스크립트의 color_grading 선택에 참고
+        overall_analysis["color_profile"] = suggest_color_grading(
+            [analysis["properties"] for analysis in analyses if analysis.get("properties")]
+        )
 
         return overall_analysis
 
+    @instrumented("groq", "summarize")
     async def _summarize_with_groq(self, analyses: list[dict]) -> dict:
         """Groq를 사용하여 분석 결과 요약"""
         summary_prompt = f"""다음 사진 분석 결과들을 종합하여 전체 스토리 테마를 추출해주세요.
@@ -142,48 +208,34 @@ class VisionService:
   "emotional_journey": ["감정1", "감정2", "감정3"]
 }}"""
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.groq_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "llama-3.3-70b-versatile",
-                    "messages": [{"role": "user", "content": summary_prompt}],
-                    "temperature": 0.1,
-                    "max_tokens": 512,
-                },
-            )
-
-            if response.status_code != 200:
-                # Groq 실패시 기본값 반환
-                return {
-                    "overall_theme": "개인 스토리",
-                    "suggested_narrative_arc": "시작 → 전개 → 결말",
-                    "emotional_journey": ["기대", "경험", "회상"],
-                }
-
-            result = response.json()
-            text_content = result["choices"][0]["message"]["content"]
-
-            # JSON 파싱
-            if "```json" in text_content:
-                text_content = text_content.split("```json")[1].split("```")[0]
-            elif "```" in text_content:
-                text_content = text_content.split("```")[1].split("```")[0]
-
-            try:
-                return json.loads(text_content.strip())
-            except json.JSONDecodeError:
-                return {
-                    "overall_theme": "개인 스토리",
-                    "suggested_narrative_arc": "시작 → 전개 → 결말",
-                    "emotional_journey": ["기대", "경험", "회상"],
-                }
+        # 키 풀/429 재시도는 Groq 서비스와 공유
+        try:
+            text_content = await groq_service.chat(summary_prompt, temperature=0.1, max_tokens=512, timeout=60.0)
+        except Exception:
+            # Groq 실패시 기본값 반환
+            external_call_failures.labels("groq", "summarize").inc()
+            return dict(DEFAULT_SUMMARY)
+
+        # JSON 파싱 (코드 블록/설명 문장/잘린 JSON 복구, 빠진 필드는 기본값)
+        try:
+            return repair_summary(parse_llm_json(text_content, "summary"), DEFAULT_SUMMARY)
+        except LLMJSONError:
+            return dict(DEFAULT_SUMMARY)
+
+
+def with_duplicates(photo_ids: list[str], analyses: dict[str, dict], duplicate_groups: list[list[str]]) -> list[dict]:
+    """대표 사진 분석 결과를 중복 사진에 복사 (duplicate_of 표시)"""
+    duplicate_of = duplicate_map(duplicate_groups)
+    results = []
+    for photo_id in photo_ids:
+        if photo_id in duplicate_of:
+            representative = duplicate_of[photo_id]
+            results.append({**analyses[representative], "photo_id": photo_id, "duplicate_of": representative})
+        else:
+            results.append(analyses[photo_id])
+    return results
 
 
 # 기존 코드 호환성을 위해 이름 유지
-gemini_service = VisionService()
+gemini_service = LazyService(VisionService)
 GeminiService = VisionService
@@ -1,6 +1,11 @@
-import httpx
 import json
+from typing import Optional
 from ..config import get_settings
+from .credential_pool import RateLimited, groq_pool
+from .http_clients import get_http_client
+from .lazy import LazyService
+from .llm_json import LLMJSONError, llm_json_repairs, parse_llm_json, repair_script
+from .metrics_service import instrumented, retries
 
 settings = get_settings()
 
@@ -21,6 +26,7 @@ SCRIPT_GENERATION_PROMPT = """당신은 감성적인 숏폼 영상 스크립트
 ## 출력 형식 (반드시 이 JSON 형식으로만 응답, 다른 텍스트 없이)
 {{
   "title": "영상 제목",
+  "subtitle": "부제목/태그라인",
   "total_duration": 60,
   "scenes": [
     {{
@@ -31,11 +37,14 @@ SCRIPT_GENERATION_PROMPT = """당신은 감성적인 숏폼 영상 스크립트
       "transition": "fade_in",
       "camera_movement": "slow_zoom_in",
       "emotion": "nostalgic",
+      "text_overlay": "처음 너를 만난 그 카페",
+      "music_intensity": "low",
       "video_prompt": "Cinematic slow zoom, soft lighting, emotional atmosphere"
     }}
   ],
   "overall_mood": "감성적, 따뜻한",
-  "color_grading": "warm_vintage"
+  "color_grading": "warm_vintage",
+  "music_style": "nostalgic acoustic"
 }}
 
 ## 작성 원칙
@@ -44,55 +53,145 @@ SCRIPT_GENERATION_PROMPT = """당신은 감성적인 숏폼 영상 스크립트
 3. 각 사진의 특성을 최대한 활용
 4. video_prompt는 영어로 작성 (Pika AI용)
 5. 각 씬은 5-15초 사이로 구성
-6. 사진 수에 맞춰 씬 개수 조정"""
+6. 사진 수에 맞춰 씬 개수 조정
+7. 가능하면 씬마다 서로 다른 photo_id 사용
+8. color_grading은 사진 분석의 color_profile.suggested_color_grading을 우선 참고
+9. music_style은 배경 음악 분위기 (영어 키워드, 예: calm, romantic, nostalgic, happy, uplifting, melancholic, cinematic, energetic)
+10. music_intensity는 씬별 음악 강도 (low, medium, high) - 클라이맥스에서 가장 높게
+11. text_overlay는 화면 자막 (한국어 한 문장, 20자 이내) - 필요 없는 씬은 null"""
+
+# 로컬 복구가 안 될 때만 사용 - 원래 프롬프트(사진 분석 포함) 대신 깨진 응답만 보내 수정 요청
+SCRIPT_FIX_PROMPT = """아래 영상 스크립트 JSON이 잘못되었습니다: {error}
+
+사용 가능한 photo_id: {photo_ids}
+
+다음 형식의 올바른 JSON으로만 응답하세요 (다른 텍스트 없이). 잘린 부분은 앞 내용에 맞게 완성하세요.
+{{"title": str, "subtitle": str, "total_duration": int, "scenes": [{{"scene_id": int, "start_time": number,
+"end_time": number, "photo_id": str, "transition": str, "camera_movement": str, "emotion": str,
+"text_overlay": str | null, "music_intensity": str, "video_prompt": str}}], "overall_mood": str,
+"color_grading": str, "music_style": str}}
+
+잘못된 응답:
+{content}"""
+
+
+def assign_distinct_photos(scenes: list[dict], photo_ids: list[str], duplicate_groups: list[list[str]]) -> list[dict]:
+    """같은 사진(또는 중복 그룹)이 여러 씬에 반복되면 어느 씬에도 안 쓴 사진으로 교체
+
+    남은 사진이 없으면 같은 그룹의 다른 사진을 사용해 완전히 같은 장면은 피함.
+    """
+    group_of = {photo_id: tuple(group) for group in duplicate_groups for photo_id in group}
+
+    def group(photo_id: str) -> tuple:
+        return group_of.get(photo_id, (photo_id,))
+
+    valid = [scene for scene in scenes if scene.get("photo_id") in photo_ids]
+    chosen_groups = {group(scene["photo_id"]) for scene in valid}
+    unused = [pid for pid in photo_ids if group(pid)[0] == pid and group(pid) not in chosen_groups]
+    used_groups: set[tuple] = set()
+    used_photos: set[str] = set()
+
+    for scene in valid:
+        photo_id = scene["photo_id"]
+        if group(photo_id) in used_groups:
+            if unused:
+                photo_id = unused.pop(0)
+            else:
+                photo_id = next((pid for pid in group(photo_id) if pid not in used_photos), photo_id)
+        scene["photo_id"] = photo_id
+        used_groups.add(group(photo_id))
+        used_photos.add(photo_id)
+    return scenes
 
 
 class GroqService:
     """Groq API 서비스 (스크립트 생성용) - 무료"""
 
     def __init__(self):
-        self.api_key = settings.groq_api_key
-        self.base_url = "https://api.groq.com/openai/v1"
+        self.base_url = settings.groq_base_url
         self.model = "llama-3.3-70b-versatile"  # 무료 LLaMA 모델
 
+    @instrumented("groq", "script")
     async def generate_script(
         self, image_analysis: dict, narrative: str, style: str
     ) -> dict:
         """영상 스크립트 생성"""
+        # 중복 사진은 프롬프트에서 제외 (토큰 절약, 씬마다 다른 사진 선택 유도)
+        photos = image_analysis.get("photos", [])
+        duplicate_groups = image_analysis.get("duplicate_groups", [])
+        prompt_analysis = {
+            **{k: v for k, v in image_analysis.items() if k != "duplicate_groups"},
+            "photos": [photo for photo in photos if not photo.get("duplicate_of")],
+        }
         prompt = SCRIPT_GENERATION_PROMPT.format(
-            image_analysis=json.dumps(image_analysis, ensure_ascii=False),
+            image_analysis=json.dumps(prompt_analysis, ensure_ascii=False),
             user_narrative=narrative,
             style_preference=style,
         )
 
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7,
-                    "max_tokens": 2048,
-                },
-            )
-
-            if response.status_code != 200:
-                raise Exception(f"Groq API error: {response.text}")
-
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-
-            # JSON 파싱 (마크다운 코드 블록 제거)
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-
-            return json.loads(content.strip())
-
-
-groq_service = GroqService()
+        photo_ids = [p["photo_id"] for p in photos]
+        color_grading = (image_analysis.get("color_profile") or {}).get("suggested_color_grading")
+        content = await self.chat(prompt, temperature=0.7)
+
+        # 코드 블록/설명 문장/끝 쉼표/잘린 JSON은 로컬에서 복구, 안 되면 한 번만 재요청
+        try:
+            script = repair_script(parse_llm_json(content, "script"), photo_ids, color_grading=color_grading)
+        except LLMJSONError as e:
+            if "{" in content:
+                llm_json_repairs.labels("script", "regenerate_fix").inc()
+                content = await self.chat(
+                    SCRIPT_FIX_PROMPT.format(error=e, photo_ids=json.dumps(photo_ids), content=content),
+                    temperature=0.0,
+                )
+            else:
+                llm_json_repairs.labels("script", "regenerate_full").inc()
+                content = await self.chat(prompt, temperature=0.3)
+            try:
+                script = repair_script(parse_llm_json(content, "script"), photo_ids, color_grading=color_grading)
+            except LLMJSONError as retry_error:
+                raise Exception(f"Invalid script from Groq: {retry_error}")
+
+        if photos:
+            assign_distinct_photos(script["scenes"], photo_ids, duplicate_groups)
+        return script
+
+    async def chat(
+        self, prompt: str, temperature: float, max_tokens: int = 2048, timeout: Optional[float] = None
+    ) -> str:
+        """chat completion 응답 텍스트
+
+        키 풀에서 가장 한가한 키 사용, 429면 해당 키는 쿨다운하고 다른 키로 재시도.
+        """
+        client = get_http_client("groq")
+        for attempt in range(len(groq_pool) + 1):
+            async with groq_pool.acquire() as credential:
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {credential.key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "model": self.model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "temperature": temperature,
+                        "max_tokens": max_tokens,
+                    },
+                    **({"timeout": timeout} if timeout else {}),
+                )
+            try:
+                groq_pool.record(credential, response.status_code, response.headers.get("retry-after"))
+                break
+            except RateLimited:
+                if attempt == len(groq_pool):
+                    raise
+                retries.labels("groq", "rate_limited").inc()
+
+        if response.status_code != 200:
+            raise Exception(f"Groq API error: {response.text}")
+
+        result = response.json()
+        return result["choices"][0]["message"]["content"]
+
+
+groq_service = LazyService(GroqService)
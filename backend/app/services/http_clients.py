@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 제공자별 클라이언트 설정 (요청마다 다른 timeout은 요청 시 지정)
+CLIENT_OPTIONS = {
+    "vision": {"timeout": 60.0},
+    "groq": {"timeout": 90.0},
+    "replicate": {"timeout": 300.0},
+    "download": {"timeout": 300.0, "follow_redirects": True},
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """제공자별 공용 AsyncClient (요청마다 새 연결/TLS 핸드셰이크 대신 연결 풀 재사용)"""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+            ),
+            **CLIENT_OPTIONS[name],
+        )
+    return client
+
+
+async def close_http_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+async def _warm_up_client(name: str, url: str):
+    """DNS 조회 + TLS 연결을 미리 맺어 연결 풀에 유지 (응답 코드는 무시)"""
+    start = time.perf_counter()
+    try:
+        await get_http_client(name).head(url, timeout=settings.provider_warmup_timeout_seconds)
+        logger.info("Warmed up %s in %.0fms", name, (time.perf_counter() - start) * 1000)
+    except Exception as e:
+        logger.warning("Warm-up failed for %s: %s", name, e)
+
+
+async def warm_up_providers():
+    """서비스 생성 + 외부 API 연결 준비
+
+    시작 이벤트에서 태스크로만 띄우므로 포트 바인딩 후 트래픽과 병렬로 실행됨.
+    """
+    from .credential_pool import replicate_pool
+    from .lazy import initialize_all
+
+    # boto3 import / S3 클라이언트 생성 등 동기 초기화는 스레드에서
+    await asyncio.to_thread(initialize_all)
+
+    targets = {"vision": settings.google_vision_base_url, "groq": settings.groq_base_url}
+    if len(replicate_pool):
+        targets["replicate"] = settings.replicate_base_url
+    await asyncio.gather(*(_warm_up_client(name, url) for name, url in targets.items()))
@@ -0,0 +1,137 @@
+import io
+from typing import Optional
+
+import numpy as np
+
+# 대표 색상 추출용 축소 크기 / 클러스터 수
+COLOR_SAMPLE_SIZE = 64
+COLOR_CLUSTERS = 5
+KMEANS_ITERATIONS = 10
+# 선명도(라플라시안 분산) 계산용 최대 크기
+SHARPNESS_SIZE = 512
+# 가로/세로 비율이 이 범위 안이면 정사각형 (1080x1080, 크롭 오차 허용)
+SQUARE_TOLERANCE = 0.05
+
+
+def dominant_colors(pixels: np.ndarray, k: int = COLOR_CLUSTERS) -> list[tuple[tuple[int, int, int], float]]:
+    """k-means 색상 양자화 (벡터화)
+
+    Returns:
+        [(rgb, 비율)] 비율 내림차순
+    """
+    pixels = pixels.reshape(-1, 3).astype(np.float32)
+    k = min(k, len(pixels))
+    # 밝기 분위수 위치의 픽셀로 초기화 (결과가 항상 같도록)
+    order = np.argsort(pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32))
+    centers = pixels[order[np.linspace(0, len(pixels) - 1, k).astype(int)]]
+
+    for _ in range(KMEANS_ITERATIONS):
+        distances = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=pixels[:, c], minlength=k) for c in range(3)], axis=1)
+        filled = counts > 0
+        new_centers = centers.copy()
+        new_centers[filled] = sums[filled] / counts[filled, None]
+        if np.allclose(new_centers, centers, atol=0.5):
+            centers = new_centers
+            break
+        centers = new_centers
+
+    counts = np.bincount(labels, minlength=k)
+    result = [
+        (tuple(int(v) for v in np.clip(centers[i].round(), 0, 255)), float(counts[i] / len(pixels)))
+        for i in np.argsort(-counts)
+        if counts[i] > 0
+    ]
+    return result
+
+
+def _sharpness(gray: np.ndarray) -> float:
+    """라플라시안 분산 (512px 기준, 클수록 선명)"""
+    if min(gray.shape) < 3:
+        return 0.0
+    laplacian = (
+        4 * gray[1:-1, 1:-1]
+        - gray[:-2, 1:-1] - gray[2:, 1:-1]
+        - gray[1:-1, :-2] - gray[1:-1, 2:]
+    )
+    return float(laplacian.var())
+
+
+def _orientation(width: int, height: int) -> str:
+    if abs(width - height) <= SQUARE_TOLERANCE * max(width, height):
+        return "square"
+    return "portrait" if height > width else "landscape"
+
+
+def analyze_image_properties(image_data: bytes, vision_max_size: int) -> tuple[dict, Optional[bytes]]:
+    """로컬 이미지 속성 분석 - 프로세스 풀에서 실행
+
+    Returns:
+        (속성, Vision 전송용 축소 JPEG - 원본이 충분히 작으면 None)
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(image_data)) as img:
+        # JPEG은 Vision 전송 크기 이상으로만 축소 디코딩
+        img.draft("RGB", (vision_max_size, vision_max_size))
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        width, height = img.size
+
+        vision_image = None
+        if max(width, height) > vision_max_size:
+            resized = img.copy()
+            resized.thumbnail((vision_max_size, vision_max_size), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            resized.save(output, format="JPEG", quality=85)
+            vision_image = output.getvalue()
+
+        img.thumbnail((SHARPNESS_SIZE, SHARPNESS_SIZE), Image.Resampling.BILINEAR)
+        rgb = np.asarray(img, dtype=np.float32)
+        small = np.asarray(
+            img.resize((COLOR_SAMPLE_SIZE, COLOR_SAMPLE_SIZE), Image.Resampling.BILINEAR), dtype=np.float32
+        )
+
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    colors = dominant_colors(small)
+
+    properties = {
+        "colors": [f"rgb({r},{g},{b})" for (r, g, b), _ in colors],
+        "color_ratios": [round(ratio, 3) for _, ratio in colors],
+        "brightness": round(float(luma.mean() / 255), 3),  # 0-1
+        "contrast": round(float(luma.std() / 128), 3),  # 0-1 근사
+        "warmth": round(float((rgb[..., 0] - rgb[..., 2]).mean() / 255), 3),  # -1(차가움) ~ 1(따뜻함)
+        "saturation": round(float((rgb.max(axis=2) - rgb.min(axis=2)).mean() / 255), 3),
+        "sharpness": round(_sharpness(luma), 1),
+        "orientation": _orientation(width, height),
+    }
+    return properties, vision_image
+
+
+def suggest_color_grading(properties: list[dict]) -> dict:
+    """사진 전체의 평균 속성으로 컬러 그레이딩 추천"""
+    if not properties:
+        return {"suggested_color_grading": "natural"}
+
+    brightness = float(np.mean([p["brightness"] for p in properties]))
+    warmth = float(np.mean([p["warmth"] for p in properties]))
+    saturation = float(np.mean([p["saturation"] for p in properties]))
+
+    if brightness < 0.3:
+        grading = "moody_dark"
+    elif warmth > 0.08:
+        grading = "warm_vintage"
+    elif warmth < -0.05:
+        grading = "cool_cinematic"
+    elif saturation < 0.15:
+        grading = "soft_pastel"
+    else:
+        grading = "bright_natural" if brightness > 0.55 else "natural"
+
+    return {
+        "brightness": round(brightness, 3),
+        "warmth": round(warmth, 3),
+        "saturation": round(saturation, 3),
+        "suggested_color_grading": grading,
+    }
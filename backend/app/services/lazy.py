@@ -0,0 +1,37 @@
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 생성된 서비스 목록 (종료 시 정리, 워밍업 대상)
+_lazy_services: list["LazyService"] = []
+
+
+class LazyService(Generic[T]):
+    """첫 사용 시 생성되는 서비스 싱글톤
+
+    기존 모듈 수준 싱글톤을 그대로 대체 (속성 접근 시 factory 호출).
+    import 시점에 boto3 로드, 클라이언트 생성 등의 비용이 들지 않음.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        _lazy_services.append(self)
+
+    def get(self) -> T:
+        if self._instance is None:
+            self._instance = self._factory()
+        return self._instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+
+def initialize_all():
+    """모든 lazy 서비스 생성 (워밍업용)"""
+    for service in _lazy_services:
+        service.get()
@@ -0,0 +1,120 @@
+import json
+import time
+from typing import Optional
+
+from ..config import get_settings
+from .redis_client import get_redis, mark_unavailable
+
+settings = get_settings()
+
+# 보유자가 일치할 때만 해제/연장 (다른 작업이 이어받은 lease를 건드리지 않도록)
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end
+"""
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end
+"""
+
+
+class LeaseService:
+    """만료 시간이 있는 배타 lease (Redis, 비활성 시 프로세스 내)
+
+    작업이 비정상 종료되어도 TTL 후 자동 해제되므로 실행 중에는 주기적으로 renew.
+    """
+
+    def __init__(self):
+        self.local: dict[str, tuple[str, float]] = {}
+
+    def _local_holder(self, key: str) -> Optional[str]:
+        held = self.local.get(key)
+        if held and held[1] > time.monotonic():
+            return held[0]
+        self.local.pop(key, None)
+        return None
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> str:
+        """lease 획득 시도
+
+        Returns:
+            현재 보유자 (획득했으면 owner, 이미 다른 작업이 보유 중이면 그 작업)
+        """
+        client = await get_redis()
+        if client is not None:
+            try:
+                while True:
+                    if await client.set(key, owner, nx=True, px=int(ttl * 1000)):
+                        return owner
+                    holder = await client.get(key)
+                    if holder is not None:
+                        return holder
+                    # set과 get 사이에 만료된 경우 다시 시도
+            except Exception as e:
+                mark_unavailable(e)
+
+        holder = self._local_holder(key)
+        if holder is not None:
+            return holder
+        self.local[key] = (owner, time.monotonic() + ttl)
+        return owner
+
+    async def renew(self, key: str, owner: str, ttl: float) -> bool:
+        client = await get_redis()
+        if client is not None:
+            try:
+                return bool(await client.eval(_RENEW_SCRIPT, 1, key, owner, int(ttl * 1000)))
+            except Exception as e:
+                mark_unavailable(e)
+
+        if self._local_holder(key) not in (owner, None):
+            return False
+        self.local[key] = (owner, time.monotonic() + ttl)
+        return True
+
+    async def release(self, key: str, owner: str):
+        client = await get_redis()
+        if client is not None:
+            try:
+                await client.eval(_RELEASE_SCRIPT, 1, key, owner)
+            except Exception as e:
+                mark_unavailable(e)
+
+        if self._local_holder(key) == owner:
+            del self.local[key]
+
+
+class IdempotencyStore:
+    """Idempotency-Key별 첫 응답 보관 (같은 키의 재요청에는 같은 응답)"""
+
+    def __init__(self):
+        self.local: dict[str, tuple[float, dict]] = {}
+
+    async def get(self, key: str) -> Optional[dict]:
+        client = await get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                mark_unavailable(e)
+
+        stored = self.local.get(key)
+        if stored and stored[0] > time.monotonic():
+            return stored[1]
+        self.local.pop(key, None)
+        return None
+
+    async def put(self, key: str, response: dict):
+        ttl = settings.idempotency_ttl_seconds
+        client = await get_redis()
+        if client is not None:
+            try:
+                await client.set(key, json.dumps(response), ex=ttl)
+                return
+            except Exception as e:
+                mark_unavailable(e)
+
+        self.local[key] = (time.monotonic() + ttl, response)
+
+
+lease_service = LeaseService()
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Awaitable, Callable, Optional
+
+from ..config import get_settings
+from ..models.schemas import ProjectStatus
+from .lease_service import lease_service
+from .metrics_service import Counter, Gauge, registry
+from .redis_client import get_redis, mark_unavailable
+from .storage_service import DERIVED_KINDS, storage_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SWEEP_LEASE_KEY = "lifecycle:sweep"
+# 모든 워커의 살아 있는 프로젝트 {project_id: owner_id} - 고아 판정/할당량 계산 기준
+REGISTRY_KEY = "lifecycle:projects"
+MB = 1024 * 1024
+
+lifecycle_deletions = registry.register(Counter(
+    "storage_lifecycle_deletions_total", "Files/projects removed by the lifecycle manager", ("reason",),
+))
+quota_rejections = registry.register(Counter(
+    "storage_quota_rejections_total", "Uploads rejected by storage quota", ("scope",),
+))
+storage_bytes = registry.register(Gauge(
+    "storage_bytes", "Stored bytes at the last lifecycle sweep", ("kind",),
+))
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, scope: str, message: str):
+        super().__init__(message)
+        self.scope = scope
+
+
+class LifecycleService:
+    """저장소 수명 주기 관리 (백그라운드 스윕)
+
+    1. TTL: 오래 방치된 DRAFT / FAILED 프로젝트 삭제 (워커마다 자기 프로젝트만)
+    2. 고아 파일: 어느 워커에도 없는 프로젝트의 파일 삭제 (유예 시간 이후)
+    3. 할당량: 사용자별/전체 사용량 초과 시 파생 파일(미리보기, HLS, 씬 클립)을
+       가장 오래 사용하지 않은 프로젝트부터 삭제 - 원본 사진/최종 영상은 삭제하지 않고
+       대신 업로드를 거부
+
+    파일 목록은 batch_size 단위로 스레드에서 읽고 사이사이 양보하며,
+    스윕당 삭제 수를 제한. 여러 워커 중 lease를 가진 하나만 파일을 스윕.
+    projects_db는 워커별 메모리라 다른 워커의 프로젝트는 Redis 레지스트리로 확인하고,
+    레지스트리를 읽을 수 없으면 lifecycle_single_instance일 때만 고아 파일을 삭제.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.enabled = settings.lifecycle_enabled
+        self.projects: dict = {}
+        self._remove_project: Optional[Callable[[str], Awaitable[None]]] = None
+        self._clear_derived: Optional[Callable[[str], Awaitable[None]]] = None
+        # 마지막 스윕 기준 프로젝트별 사용량 {"total", "derived"} + 이후 업로드분
+        self.usage: dict[str, dict[str, int]] = {}
+        # 마지막 스윕 때 읽은 다른 워커 프로젝트의 owner_id
+        self.owners: dict[str, Optional[str]] = {}
+        self.last_report: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(
+        self,
+        projects: dict,
+        remove_project: Callable[[str], Awaitable[None]],
+        clear_derived: Callable[[str], Awaitable[None]],
+    ):
+        """projects: 프로젝트 저장소, remove_project: 프로젝트 전체 삭제, clear_derived: 파생 파일 URL 정리"""
+        self.projects = projects
+        self._remove_project = remove_project
+        self._clear_derived = clear_derived
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    # 공유 레지스트리
+
+    async def register(self, project_id: str, owner_id: Optional[str]):
+        """새 프로젝트를 워커 공유 레지스트리에 등록 (Redis가 없으면 생략)"""
+        client = await get_redis()
+        if client is not None:
+            try:
+                await client.hset(REGISTRY_KEY, project_id, owner_id or "")
+            except Exception as e:
+                mark_unavailable(e)
+
+    async def unregister(self, project_id: str):
+        client = await get_redis()
+        if client is not None:
+            try:
+                await client.hdel(REGISTRY_KEY, project_id)
+            except Exception as e:
+                mark_unavailable(e)
+
+    async def _live_projects(self) -> Optional[dict[str, Optional[str]]]:
+        """모든 워커의 프로젝트 {project_id: owner_id}
+
+        Returns:
+            레지스트리를 읽을 수 없으면 None (단일 인스턴스 설정이면 이 워커의 프로젝트)
+        """
+        local = {project_id: project.get("owner_id") for project_id, project in list(self.projects.items())}
+        client = await get_redis()
+        if client is not None:
+            try:
+                shared = {
+                    project_id: owner_id or None
+                    async for project_id, owner_id in client.hscan_iter(REGISTRY_KEY, count=1000)
+                }
+                return {**shared, **local}
+            except Exception as e:
+                mark_unavailable(e)
+        return local if settings.lifecycle_single_instance else None
+
+    # 할당량
+
+    def note_write(self, project_id: str, size: int):
+        """업로드 직후 사용량 반영 (다음 스윕에서 실제 값으로 교체)"""
+        usage = self.usage.setdefault(project_id, {"total": 0, "derived": 0})
+        usage["total"] += size
+
+    def _owner_of(self, project_id: str) -> Optional[str]:
+        project = self.projects.get(project_id)
+        return project.get("owner_id") if project else self.owners.get(project_id)
+
+    def _retained_bytes(self, owner_id: Optional[str] = None) -> int:
+        """파생 파일을 제외한 사용량 (owner_id가 있으면 해당 사용자만)"""
+        return sum(
+            usage["total"] - usage["derived"]
+            for project_id, usage in self.usage.items()
+            if owner_id is None or self._owner_of(project_id) == owner_id
+        )
+
+    def check_quota(self, owner_id: Optional[str], incoming: int):
+        """업로드 전 할당량 확인 - 파생 파일은 스윕에서 정리되므로 제외하고 계산
+
+        Raises:
+            QuotaExceeded
+        """
+        user_quota = settings.storage_user_quota_mb * MB
+        if owner_id and user_quota and self._retained_bytes(owner_id) + incoming > user_quota:
+            quota_rejections.labels("user").inc()
+            raise QuotaExceeded("user", f"Storage quota exceeded ({settings.storage_user_quota_mb}MB per user)")
+
+        global_quota = settings.storage_global_quota_mb * MB
+        if global_quota and self._retained_bytes() + incoming > global_quota:
+            quota_rejections.labels("global").inc()
+            raise QuotaExceeded("global", "Storage is full")
+
+    def usage_report(self) -> dict:
+        owners: dict[str, int] = {}
+        for project_id, usage in self.usage.items():
+            owner_id = self._owner_of(project_id) or "-"
+            owners[owner_id] = owners.get(owner_id, 0) + usage["total"]
+        return {
+            "total_bytes": sum(usage["total"] for usage in self.usage.values()),
+            "derived_bytes": sum(usage["derived"] for usage in self.usage.values()),
+            "owners": dict(sorted(owners.items(), key=lambda item: -item[1])),
+            "last_sweep": self.last_report,
+        }
+
+    # 스윕
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.lifecycle_sweep_interval_seconds)
+            try:
+                # TTL 만료는 각 워커가 자기 프로젝트에 대해 실행
+                async with self._lock:
+                    await self._expire_projects({"expired": 0}, [settings.lifecycle_max_deletes_per_sweep])
+                holder = await lease_service.acquire(
+                    SWEEP_LEASE_KEY, self.worker_id, settings.lifecycle_sweep_interval_seconds * 2
+                )
+                if holder != self.worker_id:
+                    continue  # 다른 워커가 스윕 중
+                await lease_service.renew(
+                    SWEEP_LEASE_KEY, self.worker_id, settings.lifecycle_sweep_interval_seconds * 2
+                )
+                await self.sweep(expire=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Lifecycle sweep failed: %s", e)
+
+    async def sweep(self, expire: bool = True) -> dict:
+        """한 번의 전체 스윕 (TTL -> 파일 순회/고아 정리 -> 할당량)
+
+        Args:
+            expire: False면 TTL 만료 생략 (주기 스윕에서는 워커마다 따로 실행)
+        """
+        if self._remove_project is None:
+            # 프로젝트 저장소 없이 스윕하면 모든 파일이 고아로 판단됨
+            raise Exception("Lifecycle service not started")
+        async with self._lock:
+            start = time.monotonic()
+            report = {"expired": 0, "orphans": 0, "evicted": 0, "evicted_bytes": 0, "files": 0}
+            budget = [settings.lifecycle_max_deletes_per_sweep]
+
+            if expire:
+                await self._expire_projects(report, budget)
+            live = await self._live_projects()
+            # 다른 워커의 프로젝트를 확인할 수 없으면 고아 파일은 판정하지 않음
+            report["orphan_check"] = live is not None
+            files = await self._scan(live, report, budget)
+            await self._enforce_quotas(files, report, budget)
+
+            report["duration_seconds"] = round(time.monotonic() - start, 3)
+            report["finished_at"] = datetime.now().isoformat()
+            report["delete_budget_exhausted"] = budget[0] <= 0
+            self.last_report = report
+            logger.info("Lifecycle sweep: %s", report)
+            return report
+
+    async def _expire_projects(self, report: dict, budget: list[int]):
+        now = datetime.now()
+        ttls = {
+            ProjectStatus.DRAFT: timedelta(hours=settings.lifecycle_draft_ttl_hours),
+            ProjectStatus.FAILED: timedelta(hours=settings.lifecycle_failed_ttl_hours),
+        }
+        expired = [
+            project_id
+            for project_id, project in list(self.projects.items())
+            if project["status"] in ttls
+            and now - project.get("last_accessed_at", project["created_at"]) > ttls[project["status"]]
+        ]
+        for project_id in expired[: max(budget[0], 0)]:
+            if project_id not in self.projects:
+                continue  # 그 사이 삭제됨
+            await self._remove_project(project_id)
+            self.usage.pop(project_id, None)
+            budget[0] -= 1
+            report["expired"] += 1
+            lifecycle_deletions.labels("expired").inc()
+
+    async def _scan(self, live: Optional[dict], report: dict, budget: list[int]) -> list[dict]:
+        """파일 순회 (batch_size 단위) - 고아 파일 삭제 후 남은 목록과 사용량 반환
+
+        Args:
+            live: 모든 워커의 프로젝트 {project_id: owner_id} (None이면 고아 삭제 안 함)
+        """
+        grace = settings.lifecycle_orphan_grace_hours * 3600
+        iterator = storage_service.list_files()
+        files = []
+        usage: dict[str, dict[str, int]] = {}
+
+        while True:
+            chunk = await asyncio.to_thread(lambda: list(islice(iterator, settings.lifecycle_sweep_batch_size)))
+            if not chunk:
+                break
+            for entry in chunk:
+                report["files"] += 1
+                project_id = entry["project_id"]
+                if project_id is None:
+                    continue
+                if live is not None and project_id not in live:
+                    if time.time() - entry["modified"] > grace and budget[0] > 0:
+                        await asyncio.to_thread(storage_service.delete_file, entry["key"])
+                        budget[0] -= 1
+                        report["orphans"] += 1
+                        lifecycle_deletions.labels("orphan").inc()
+                    continue
+
+                files.append(entry)
+                project_usage = usage.setdefault(project_id, {"total": 0, "derived": 0})
+                project_usage["total"] += entry["size"]
+                if entry["kind"] in DERIVED_KINDS:
+                    project_usage["derived"] += entry["size"]
+            # 순회 중 이벤트 루프 양보
+            await asyncio.sleep(settings.lifecycle_sweep_pause_seconds)
+
+        self.usage = usage
+        if live is not None:
+            self.owners = {project_id: live[project_id] for project_id in usage if project_id in live}
+        storage_bytes.labels("total").set(sum(u["total"] for u in usage.values()))
+        storage_bytes.labels("derived").set(sum(u["derived"] for u in usage.values()))
+        return files
+
+    def _over_quota(self) -> tuple[int, dict[str, int]]:
+        """(전체 초과 바이트, 사용자별 초과 바이트)"""
+        global_excess = 0
+        if settings.storage_global_quota_mb:
+            total = sum(usage["total"] for usage in self.usage.values())
+            global_excess = max(total - settings.storage_global_quota_mb * MB, 0)
+
+        user_excess: dict[str, int] = {}
+        if settings.storage_user_quota_mb:
+            owners: dict[str, int] = {}
+            for project_id, usage in self.usage.items():
+                owner_id = self._owner_of(project_id)
+                if owner_id:
+                    owners[owner_id] = owners.get(owner_id, 0) + usage["total"]
+            user_excess = {
+                owner_id: used - settings.storage_user_quota_mb * MB
+                for owner_id, used in owners.items()
+                if used > settings.storage_user_quota_mb * MB
+            }
+        return global_excess, user_excess
+
+    async def _enforce_quotas(self, files: list[dict], report: dict, budget: list[int]):
+        """할당량 초과분만큼 파생 파일 LRU 삭제 (프로젝트 단위, 오래 사용하지 않은 순)"""
+        global_excess, user_excess = self._over_quota()
+        if not global_excess and not user_excess:
+            return
+
+        derived: dict[str, list[dict]] = {}
+        for entry in files:
+            if entry["kind"] in DERIVED_KINDS:
+                derived.setdefault(entry["project_id"], []).append(entry)
+
+        def last_access(project_id: str) -> datetime:
+            project = self.projects.get(project_id) or {}
+            return project.get("last_accessed_at") or project.get("created_at") or datetime.min
+
+        for project_id in sorted(derived, key=last_access):
+            owner_id = self._owner_of(project_id)
+            if global_excess <= 0 and user_excess.get(owner_id, 0) <= 0:
+                continue
+            project = self.projects.get(project_id)
+            # 다른 워커의 프로젝트는 레코드의 URL을 정리할 수 없어 건너뜀 (사용량 계산에만 포함)
+            if project is None or project["status"] in (ProjectStatus.ANALYZING, ProjectStatus.GENERATING):
+                continue  # 생성 중인 프로젝트의 미리보기/씬 클립은 유지
+            if project.get("upgrading"):
+                continue  # 업그레이드 후 다시 조립할 씬 클립 유지
+            if budget[0] < len(derived[project_id]):
+                break
+
+            freed = 0
+            for entry in derived[project_id]:
+                await asyncio.to_thread(storage_service.delete_file, entry["key"])
+                freed += entry["size"]
+            budget[0] -= len(derived[project_id])
+            await self._clear_derived(project_id)
+
+            usage = self.usage[project_id]
+            usage["total"] -= freed
+            usage["derived"] -= freed
+            global_excess -= freed
+            if owner_id in user_excess:
+                user_excess[owner_id] -= freed
+            report["evicted"] += len(derived[project_id])
+            report["evicted_bytes"] += freed
+            lifecycle_deletions.labels("evicted").inc(len(derived[project_id]))
+
+        if global_excess > 0 or any(excess > 0 for excess in user_excess.values()):
+            logger.warning("Storage still over quota after evicting derived files")
+
+
+lifecycle_service = LifecycleService()
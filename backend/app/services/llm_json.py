@@ -0,0 +1,336 @@
+import json
+import re
+from typing import Optional
+
+from pydantic import ValidationError
+
+from ..models.schemas import VideoScript
+from .metrics_service import Counter, registry
+
+llm_json_repairs = registry.register(Counter(
+    "llm_json_repairs_total", "Repairs applied to LLM JSON responses", ("call", "repair"),
+))
+
+# 스크립트 작성 원칙 5: 씬 길이 5-15초
+SCENE_MIN_SECONDS = 5.0
+SCENE_MAX_SECONDS = 15.0
+DEFAULT_SCRIPT_SECONDS = 60.0
+MUSIC_INTENSITIES = ("low", "medium", "high")
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+class LLMJSONError(Exception):
+    """복구할 수 없는 LLM 응답"""
+
+
+def _extract_object(text: str) -> Optional[str]:
+    """앞뒤 설명 문장을 제외한 첫 JSON 값 (닫히지 않았으면 끝까지)"""
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def _clean(text: str, repairs: list[str]) -> str:
+    """문자열 밖의 주석 / 끝 쉼표 / Python 리터럴(True, None) 정리"""
+    out = []
+    i = 0
+    in_string = escaped = False
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = len(text) if end < 0 else end
+            repairs.append("comments")
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = len(text) if end < 0 else end + 2
+            repairs.append("comments")
+            continue
+        elif char == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                repairs.append("trailing_comma")
+                i += 1
+                continue
+        elif char.isalpha():
+            # 따옴표 없는 한글/악센트 단어도 그대로 통과 (이후 json.loads가 LLMJSONError로 판정)
+            word = re.match(r"\w+", text[i:]).group(0)
+            if word in _PYTHON_LITERALS:
+                out.append(_PYTHON_LITERALS[word])
+                repairs.append("python_literals")
+            else:
+                out.append(word)
+            i += len(word)
+            continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _closers(text: str) -> tuple[str, list[int]]:
+    """잘린 JSON을 닫는 접미사 + 잘라낼 수 있는 위치(문자열 밖 쉼표/여는 괄호 뒤)"""
+    stack = []
+    cut_points = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            cut_points.append(i + 1)
+        elif char in "}]":
+            if stack:
+                stack.pop()
+        elif char == ",":
+            cut_points.append(i)
+    return ('"' if in_string else "") + "".join(reversed(stack)), cut_points
+
+
+def _close_truncated(text: str):
+    """max_tokens로 잘린 응답: 괄호를 닫고, 안 되면 마지막 완성된 항목까지 잘라서 재시도"""
+    suffix, cut_points = _closers(text)
+    candidates = [text + suffix]
+    for pos in reversed(cut_points):
+        head = text[:pos].rstrip()
+        candidates.append(head + _closers(head)[0])
+
+    for candidate in candidates[:50]:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise LLMJSONError("Unrecoverable truncated JSON")
+
+
+def parse_llm_json(content: str, call: str) -> dict:
+    """LLM 응답에서 JSON 객체 추출 + 복구
+
+    마크다운 코드 블록, 앞뒤 설명 문장, 끝 쉼표, 주석, 잘린 배열/객체를 처리.
+    적용한 복구는 llm_json_repairs_total{call, repair}로 집계.
+
+    Raises:
+        LLMJSONError: 복구 불가
+    """
+    repairs: list[str] = []
+    text = content.strip()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        fenced = _FENCE.search(text)
+        if fenced and fenced.group(1).strip():
+            text = fenced.group(1).strip()
+            repairs.append("fence")
+
+        extracted = _extract_object(text)
+        if extracted is None:
+            llm_json_repairs.labels(call, "failed").inc()
+            raise LLMJSONError("No JSON object in response")
+        if extracted != text:
+            repairs.append("extracted")
+
+        try:
+            cleaned = _clean(extracted, repairs)
+            try:
+                data = json.loads(cleaned)
+            except json.JSONDecodeError:
+                data = _close_truncated(cleaned)
+                repairs.append("truncated")
+        except LLMJSONError:
+            llm_json_repairs.labels(call, "failed").inc()
+            raise
+        except (ValueError, RecursionError) as e:
+            # 호출부는 LLMJSONError만 처리 - 다른 예외가 새어 나가면 재생성 대체 경로를 건너뜀
+            llm_json_repairs.labels(call, "failed").inc()
+            raise LLMJSONError(f"Unrecoverable JSON: {e}") from e
+
+    if not isinstance(data, dict):
+        llm_json_repairs.labels(call, "failed").inc()
+        raise LLMJSONError("Response is not a JSON object")
+
+    for repair in dict.fromkeys(repairs):
+        llm_json_repairs.labels(call, repair).inc()
+    return data
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None  # NaN 제외
+
+
+def repair_script(
+    data: dict,
+    photo_ids: list[str],
+    target_duration: float = DEFAULT_SCRIPT_SECONDS,
+    color_grading: Optional[str] = None,
+) -> dict:
+    """VideoScript 스키마에 맞게 로컬 보정
+
+    - 빠진 필드는 기본값, scene_id는 순서대로, 없는 photo_id는 사진 목록에서 채움
+    - 씬 길이는 5-15초로 제한하고 빈 구간/겹침 없이 0초부터 이어서 재배치
+
+    Raises:
+        LLMJSONError: 씬이 하나도 없음 (재생성 필요)
+    """
+    repairs: list[str] = []
+    scenes = [scene for scene in data.get("scenes") or [] if isinstance(scene, dict)]
+    if not scenes:
+        llm_json_repairs.labels("script", "failed").inc()
+        raise LLMJSONError("Script has no scenes")
+
+    overall_mood = data.get("overall_mood") if isinstance(data.get("overall_mood"), str) else ""
+    overall_mood = overall_mood or "emotional"
+    durations = []
+    for index, scene in enumerate(scenes):
+        start, end = _number(scene.get("start_time")), _number(scene.get("end_time"))
+        durations.append(end - start if start is not None and end is not None and end > start else None)
+
+        if scene.get("scene_id") != index + 1:
+            scene["scene_id"] = index + 1
+        if photo_ids and scene.get("photo_id") not in photo_ids:
+            scene["photo_id"] = photo_ids[index % len(photo_ids)]
+            repairs.append("photo_id")
+        defaults = {
+            "photo_id": "",
+            "transition": "fade_in" if index == 0 else "crossfade",
+            "camera_movement": "slow_zoom_in",
+            "emotion": overall_mood,
+        }
+        for field, default in defaults.items():
+            if not isinstance(scene.get(field), str) or not scene[field]:
+                scene[field] = default
+                repairs.append("field_default")
+        if not isinstance(scene.get("video_prompt"), str) or not scene["video_prompt"].strip():
+            scene["video_prompt"] = (
+                f"Cinematic {scene['camera_movement'].replace('_', ' ')}, soft lighting, {scene['emotion']} atmosphere"
+            )
+            repairs.append("field_default")
+        if scene.get("music_intensity") not in MUSIC_INTENSITIES:
+            if "music_intensity" in scene:
+                repairs.append("field_default")
+            scene["music_intensity"] = "medium"
+        text_overlay = scene.get("text_overlay")
+        if text_overlay is not None and (not isinstance(text_overlay, str) or not text_overlay.strip()):
+            scene["text_overlay"] = None
+
+    # 길이 없는 씬은 남은 시간을 균등 분배, 이후 5-15초로 제한
+    known = [d for d in durations if d is not None]
+    if len(known) < len(durations):
+        remaining = max(target_duration - sum(known), 0)
+        fill = remaining / (len(durations) - len(known))
+        durations = [fill if d is None else d for d in durations]
+        repairs.append("timing_filled")
+    clamped = [min(max(d, SCENE_MIN_SECONDS), SCENE_MAX_SECONDS) for d in durations]
+    if clamped != durations:
+        repairs.append("duration_clamped")
+
+    current = 0.0
+    shifted = False
+    for scene, duration in zip(scenes, clamped):
+        start, end = round(current, 2), round(current + duration, 2)
+        if (_number(scene.get("start_time")), _number(scene.get("end_time"))) != (start, end):
+            shifted = True
+        scene["start_time"], scene["end_time"] = start, end
+        current += duration
+    if shifted and "timing_filled" not in repairs and "duration_clamped" not in repairs:
+        repairs.append("timing_gap")
+
+    script = {
+        **data,
+        "scenes": scenes,
+        "total_duration": int(round(current)),
+    }
+    for field, default in (
+        ("title", "My Story"),
+        ("overall_mood", overall_mood),
+        ("color_grading", color_grading or "natural"),
+        ("music_style", overall_mood),
+    ):
+        if not isinstance(script.get(field), str) or not script[field]:
+            script[field] = default
+            repairs.append("field_default")
+    if not isinstance(script.get("subtitle"), str):
+        script["subtitle"] = ""  # 선택 필드 - 없어도 보정으로 세지 않음
+
+    try:
+        validated = VideoScript.model_validate(script)
+    except ValidationError as e:
+        llm_json_repairs.labels("script", "failed").inc()
+        raise LLMJSONError(f"Script does not match schema: {e}")
+
+    for repair in dict.fromkeys(repairs):
+        llm_json_repairs.labels("script", repair).inc()
+    # 모델에 없는 추가 필드도 유지
+    dumped = validated.model_dump()
+    dumped["scenes"] = [{**raw, **scene} for raw, scene in zip(scenes, dumped["scenes"])]
+    return {**script, **dumped}
+
+
+def repair_summary(data: dict, defaults: dict) -> dict:
+    """사진 분석 요약 보정 (빠지거나 타입이 틀린 필드는 기본값)"""
+    summary = dict(defaults)
+    repaired = False
+    for field, default in defaults.items():
+        value = data.get(field)
+        if isinstance(default, list) and isinstance(value, str) and value.strip():
+            # "기대, 설렘" / "기대 → 설렘" 형태의 문자열
+            value = [part.strip() for part in re.split(r"[,→]", value) if part.strip()]
+        if isinstance(default, list):
+            value = [str(item) for item in value] if isinstance(value, list) and value else None
+        elif not isinstance(value, str) or not value.strip():
+            value = None
+        if value is None:
+            repaired = True
+        else:
+            summary[field] = value
+
+    if repaired:
+        llm_json_repairs.labels("summary", "field_default").inc()
+    return summary
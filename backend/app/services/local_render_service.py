@@ -0,0 +1,205 @@
+import io
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ..config import get_settings
+from .metrics_service import instrumented
+from .preview_service import CAMERA_PATHS, _cover_box
+from .process_pool import run_in_process
+from .video_service import video_delivery_service
+
+settings = get_settings()
+
+DEFAULT_SCENE_SECONDS = 6.0
+MAX_SCENE_SECONDS = 15.0
+FADE_SECONDS = 0.5
+# 씬 단위 렌더링이라 이전 클립과 겹칠 수 없음 -> 짧게 검은 화면에서 시작
+DIP_SECONDS = 0.25
+
+
+def _ease(t: np.ndarray) -> np.ndarray:
+    """smoothstep - 시작/끝에서 카메라가 부드럽게 가감속"""
+    return t * t * (3 - 2 * t)
+
+
+def _camera_boxes(
+    camera_movement: str, frames: int, src_w: int, src_h: int, out_ratio: float
+) -> np.ndarray:
+    """프레임별 crop 영역 (left, top, width, height) - (frames, 4)"""
+    (x0, y0, s0), (x1, y1, s1) = CAMERA_PATHS.get(camera_movement, CAMERA_PATHS["static"])
+    base_w, base_h = _cover_box(src_w, src_h, out_ratio)
+
+    t = _ease(np.linspace(0.0, 1.0, frames))
+    cx, cy, scale = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, s0 + (s1 - s0) * t
+    crop_w, crop_h = base_w * scale, base_h * scale
+    left = np.clip(cx * src_w - crop_w / 2, 0, src_w - crop_w)
+    top = np.clip(cy * src_h - crop_h / 2, 0, src_h - crop_h)
+    return np.stack([left, top, crop_w, crop_h], axis=1)
+
+
+def _fade_curve(transition: str, frames: int, fps: int) -> np.ndarray:
+    """프레임별 밝기 배수 (0: 검은 화면, 1: 원본)"""
+    alpha = np.ones(frames, dtype=np.float32)
+    ramp = {"fade_in": FADE_SECONDS, "crossfade": DIP_SECONDS, "dissolve": DIP_SECONDS}.get(transition)
+    if ramp:
+        n = min(max(int(ramp * fps), 1), frames)
+        alpha[:n] = np.linspace(0.0, 1.0, n + 1, dtype=np.float32)[1:]
+    if transition == "fade_out":
+        n = min(max(int(FADE_SECONDS * fps), 1), frames)
+        alpha[-n:] = np.linspace(1.0, 0.0, n + 1, dtype=np.float32)[:-1]
+    return alpha
+
+
+def _affine_frame(src: np.ndarray, box: np.ndarray, out_w: int, out_h: int) -> np.ndarray:
+    """crop 영역을 출력 크기로 매핑 (배율 + 이동 affine, bilinear 보간) -> float32 (h, w, 3)
+
+    카메라 경로에는 회전이 없어 보간을 가로/세로로 분리:
+    crop에 걸친 원본 행만 가로 보간한 뒤 출력 행마다 세로 보간 (임시 배열은 제자리 연산).
+    """
+    left, top, crop_w, crop_h = box
+    src_h, src_w = src.shape[:2]
+    # 출력 픽셀 중심 -> 원본 좌표
+    xs = left + (np.arange(out_w, dtype=np.float32) + 0.5) * np.float32(crop_w / out_w) - 0.5
+    ys = top + (np.arange(out_h, dtype=np.float32) + 0.5) * np.float32(crop_h / out_h) - 0.5
+    xs = np.clip(xs, 0, src_w - 1)
+    ys = np.clip(ys, 0, src_h - 1)
+    x0 = np.minimum(xs.astype(np.int32), src_w - 2)
+    y0 = np.minimum(ys.astype(np.int32), src_h - 2)
+
+    band = src[y0[0]:y0[-1] + 2]
+    rows = band[:, x0].astype(np.float32)
+    right = band[:, x0 + 1].astype(np.float32)
+    right -= rows
+    right *= (xs - x0)[None, :, None]
+    rows += right
+
+    index = y0 - y0[0]
+    frame = rows[index]
+    below = rows[index + 1]
+    below -= frame
+    below *= (ys - y0)[:, None, None]
+    frame += below
+    return frame
+
+
+def render_frames(
+    image_data: bytes, camera_movement: str, duration: float, transition: str, size: tuple[int, int], fps: int
+):
+    """사진 한 장 -> RGB24 프레임 (uint8, (h, w, 3)) 순회"""
+    from PIL import Image, ImageOps
+
+    out_w, out_h = size
+    with Image.open(io.BytesIO(image_data)) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        # 최대 확대(crop 0.7배)에서도 출력 해상도를 유지할 만큼만 남기고 축소
+        img.thumbnail((int(out_w * 1.5), int(out_h * 1.5)), Image.Resampling.LANCZOS)
+        src = np.asarray(img)
+
+    frames = max(int(round(duration * fps)), 2)
+    boxes = _camera_boxes(camera_movement, frames, src.shape[1], src.shape[0], out_w / out_h)
+    alpha = _fade_curve(transition, frames, fps)
+    for box, brightness in zip(boxes, alpha):
+        frame = _affine_frame(src, box, out_w, out_h)
+        if brightness < 1:
+            frame *= brightness
+        frame += 0.5  # 반올림
+        yield frame.astype(np.uint8)
+
+
+def render_clip(
+    image_data: bytes,
+    camera_movement: str,
+    duration: float,
+    transition: str,
+    size: tuple[int, int],
+    fps: int,
+    ffmpeg_path: str,
+) -> bytes:
+    """프레임을 ffmpeg stdin으로 넘겨 H.264 MP4로 인코딩 - 프로세스 풀에서 실행"""
+    out_w, out_h = size
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "scene.mp4"
+        process = subprocess.Popen(
+            [
+                ffmpeg_path, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{out_w}x{out_h}", "-r", str(fps),
+                "-i", "pipe:0",
+                "-an",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+                "-pix_fmt", "yuv420p",
+                "-movflags", "+faststart",
+                str(output),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            for frame in render_frames(image_data, camera_movement, duration, transition, size, fps):
+                process.stdin.write(frame.tobytes())
+            process.stdin.close()
+        except BrokenPipeError:
+            pass  # 인코더가 먼저 종료 - 아래에서 stderr로 보고
+        except BaseException:
+            process.kill()
+            raise
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise Exception(f"ffmpeg error: {stderr.decode(errors='ignore')}")
+        return output.read_bytes()
+
+
+class LocalRenderService:
+    """사진 + camera_movement로 씬 클립 로컬 렌더링 (외부 API/GPU 없이)
+
+    - 프레임: NumPy로 카메라 경로(줌/팬/틸트)의 crop 영역을 출력 크기로 매핑
+    - 인코딩: ffmpeg에 raw 프레임을 파이프로 전달
+    - CPU 작업이라 공용 프로세스 풀에서 실행, 결과는 최종 영상과 같은 경로로 저장
+    """
+
+    def __init__(self):
+        self.ffmpeg_path = settings.ffmpeg_path
+        self.size = (settings.render_local_width, settings.render_local_height)
+        self.fps = settings.render_local_fps
+
+    @property
+    def available(self) -> bool:
+        return settings.render_local_enabled and shutil.which(self.ffmpeg_path) is not None
+
+    def is_simple(self, scene: dict) -> bool:
+        """생성 모델 없이도 충분한 씬 (render_local_movements의 카메라 무빙)"""
+        movements = {m.strip() for m in settings.render_local_movements.split(",") if m.strip()}
+        return scene.get("camera_movement") in movements
+
+    @instrumented("ffmpeg", "local_render")
+    async def render_scene(self, project_id: str, scene: dict, image_data: bytes) -> dict:
+        """씬 하나 렌더링 후 저장
+
+        Returns:
+            {"status", "video_url", "video_id", "hls_url"} - video_url은 저장소 전송 경로
+        """
+        try:
+            duration = float(scene["end_time"]) - float(scene["start_time"])
+        except (KeyError, TypeError, ValueError):
+            duration = DEFAULT_SCENE_SECONDS
+        duration = min(max(duration, 1.0), MAX_SCENE_SECONDS) if duration > 0 else DEFAULT_SCENE_SECONDS
+
+        data = await run_in_process(
+            render_clip,
+            image_data,
+            scene.get("camera_movement", "static"),
+            duration,
+            scene.get("transition", ""),
+            self.size,
+            self.fps,
+            self.ffmpeg_path,
+        )
+        delivery = await video_delivery_service.store_video(project_id, data, clip=True)
+        return {"status": "completed", **delivery}
+
+
+local_render_service = LocalRenderService()
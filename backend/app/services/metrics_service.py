@@ -0,0 +1,273 @@
+import functools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+from ..config import get_settings
+
+settings = get_settings()
+
+# 외부 API / 파이프라인 단계는 수 ms ~ 수 분까지 분포
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: tuple[str, ...], child) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + ((math.inf,) if buckets[-1] != math.inf else ())
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, key: tuple[str, ...], child: _HistogramValue) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(child.buckets, child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Prometheus 텍스트 포맷으로 노출되는 프로세스 내 메트릭 (/metrics)"""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status"),
+))
+external_call_duration = registry.register(Histogram(
+    "external_call_duration_seconds", "External call latency (Vision, Groq, Replicate, storage)",
+    ("provider", "operation", "outcome"),
+))
+external_call_failures = registry.register(Counter(
+    "external_call_failures_total", "Failed external calls", ("provider", "operation"),
+))
+retries = registry.register(Counter(
+    "retries_total", "Retried external calls", ("provider", "operation"),
+))
+replicate_polls = registry.register(Counter(
+    "replicate_polls_total", "Replicate prediction status polls (normal waiting, not retries)",
+))
+pipeline_stage_duration = registry.register(Histogram(
+    "pipeline_stage_duration_seconds", "Generation pipeline stage latency", ("stage", "outcome"),
+))
+pipeline_stage_failures = registry.register(Counter(
+    "pipeline_stage_failures_total", "Failed pipeline stages", ("stage",),
+))
+projects_in_flight = registry.register(Gauge(
+    "projects_in_flight", "Projects currently analyzing or generating", ("stage",),
+))
+predictions_in_flight = registry.register(Gauge(
+    "predictions_in_flight", "Replicate predictions currently running",
+))
+
+
+# OpenTelemetry (선택) - 설치되어 있고 otel_enabled일 때만 span 생성
+try:
+    from opentelemetry import trace as _otel_trace
+    from opentelemetry.trace import Link as _OtelLink
+except ImportError:  # pragma: no cover - 선택 의존성
+    _otel_trace = None
+    _OtelLink = None
+
+# 프로젝트별 최초 span context (이후 모든 단계 span이 link로 연결)
+_project_span_contexts: dict[str, object] = {}
+
+
+def _tracer():
+    if _otel_trace is None or not settings.otel_enabled:
+        return None
+    return _otel_trace.get_tracer("personal-shorts")
+
+
+@contextmanager
+def span(name: str, project_id: Optional[str] = None, **attributes):
+    """OpenTelemetry span (미설치/비활성 시 no-op)
+
+    project_id가 있으면 해당 프로젝트의 최초 span에 link하여 한 프로젝트의 전체 흐름을 연결.
+    """
+    tracer = _tracer()
+    if tracer is None:
+        yield None
+        return
+
+    links = []
+    if project_id:
+        attributes["project.id"] = project_id
+        context = _project_span_contexts.get(project_id)
+        if context is not None:
+            links.append(_OtelLink(context))
+
+    with tracer.start_as_current_span(name, links=links, attributes=attributes) as current:
+        if project_id and project_id not in _project_span_contexts:
+            _project_span_contexts[project_id] = current.get_span_context()
+        yield current
+
+
+def forget_project(project_id: str):
+    _project_span_contexts.pop(project_id, None)
+
+
+@asynccontextmanager
+async def track_call(provider: str, operation: str, project_id: Optional[str] = None):
+    """외부 호출 시간/실패 기록 + span"""
+    start = time.perf_counter()
+    outcome = "success"
+    with span(f"{provider}.{operation}", project_id=project_id, provider=provider):
+        try:
+            yield
+        except BaseException:
+            outcome = "failure"
+            external_call_failures.labels(provider, operation).inc()
+            raise
+        finally:
+            external_call_duration.labels(provider, operation, outcome).observe(time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def track_stage(stage: str, project_id: Optional[str] = None):
+    """파이프라인 단계 시간/실패 기록 + span"""
+    start = time.perf_counter()
+    outcome = "success"
+    with span(f"pipeline.{stage}", project_id=project_id):
+        try:
+            yield
+        except BaseException:
+            outcome = "failure"
+            pipeline_stage_failures.labels(stage).inc()
+            raise
+        finally:
+            pipeline_stage_duration.labels(stage, outcome).observe(time.perf_counter() - start)
+
+
+def instrumented(provider: str, operation: str):
+    """async 메서드용 track_call 데코레이터"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with track_call(provider, operation):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..config import get_settings
+from .audio_features import ENERGY_RATE, MOOD_BITS, MOODS, analyze_track
+from .metrics_service import Counter, registry
+from .process_pool import run_in_process
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg"}
+TRACK_DTYPE = np.dtype([
+    ("duration", "f4"),
+    ("bpm", "f4"),
+    ("loudness", "f4"),  # LUFS
+    ("centroid", "f4"),  # Hz
+    ("major", "f4"),  # 양수면 장조
+    ("moods", "u2"),  # MOODS 비트
+    ("beat_start", "u4"),  # beats.npy 구간
+    ("beat_count", "u4"),
+    ("energy_start", "u4"),  # energy.npy 구간
+    ("energy_count", "u4"),
+])
+# 스크립트 단어 -> 분위기 (music_style / style / overall_mood / 씬 emotion, 부분 일치)
+MOOD_KEYWORDS = {
+    "calm": ("calm", "peace", "quiet", "gentle", "soft", "잔잔", "평온", "차분", "고요"),
+    "romantic": ("romantic", "love", "warm", "acoustic", "emotional", "로맨", "사랑", "설렘", "따뜻", "감성"),
+    "nostalgic": ("nostalg", "memory", "vintage", "retro", "emotional", "추억", "그리", "향수", "회상", "감성"),
+    "happy": ("happy", "joy", "fun", "cheer", "bright", "행복", "기쁨", "즐거", "밝"),
+    "uplifting": ("uplift", "hope", "inspir", "희망", "벅찬", "감동"),
+    "melancholic": ("melanch", "sad", "bittersweet", "longing", "lonely", "슬픔", "애틋", "쓸쓸", "아련"),
+    "cinematic": ("cinematic", "epic", "dramatic", "grand", "시네마", "웅장", "극적"),
+    "energetic": ("energetic", "upbeat", "dance", "exciting", "party", "신나", "활기", "경쾌"),
+}
+# 씬 music_intensity -> 에너지 목표 (곡 구간 선택) / 볼륨 (dB)
+INTENSITY_LEVELS = {"low": 0.2, "medium": 0.55, "high": 1.0}
+INTENSITY_GAIN_DB = {"low": -6.0, "medium": -3.0, "high": 0.0}
+BEATS_PER_BAR = 4
+
+music_selections = registry.register(Counter(
+    "music_selections_total", "Background music tracks chosen for assembled videos", ("mood",),
+))
+
+
+def mood_weights(texts: list[tuple[Optional[str], float]]) -> np.ndarray:
+    """(텍스트, 가중치) 목록 -> 분위기별 가중치 (MOODS 순서)"""
+    weights = np.zeros(len(MOODS), dtype=np.float32)
+    for text, weight in texts:
+        text = (text or "").lower()
+        if not text:
+            continue
+        for index, mood in enumerate(MOODS):
+            if any(keyword in text for keyword in MOOD_KEYWORDS[mood]):
+                weights[index] += weight
+    return weights
+
+
+def _folder_moods(name: str) -> int:
+    """하위 폴더 이름의 분위기 태그 비트 (예: romantic/track.mp3)"""
+    folders = Path(name).parts[:-1]
+    weights = mood_weights([(folder, 1.0) for folder in folders])
+    return sum(MOOD_BITS[mood] for mood, weight in zip(MOODS, weights) if weight)
+
+
+class MusicIndex:
+    """memory-mapped 인덱스 한 버전
+
+    tracks.npy: 곡별 특성 (TRACK_DTYPE), beats.npy / energy.npy: 곡별 구간을 이어 붙인 배열,
+    tracks.json: 곡 경로와 분석 당시 파일 상태 (mtime, size)
+    """
+
+    def __init__(self, directory: Path):
+        meta = json.loads((directory / "tracks.json").read_text())
+        self.directory = directory
+        self.names: list[str] = [track["name"] for track in meta["tracks"]]
+        self.stats = {track["name"]: (track["mtime"], track["size"]) for track in meta["tracks"]}
+        self.positions = {name: index for index, name in enumerate(self.names)}
+        self.tracks = np.load(directory / "tracks.npy", mmap_mode="r")
+        self.beats = np.load(directory / "beats.npy", mmap_mode="r")
+        self.energy = np.load(directory / "energy.npy", mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def beats_of(self, index: int) -> np.ndarray:
+        row = self.tracks[index]
+        return np.asarray(self.beats[row["beat_start"]:row["beat_start"] + row["beat_count"]])
+
+    def energy_of(self, index: int) -> np.ndarray:
+        row = self.tracks[index]
+        return np.asarray(self.energy[row["energy_start"]:row["energy_start"] + row["energy_count"]])
+
+    def features(self, index: int) -> dict:
+        """재색인 시 변경 없는 곡의 특성 재사용"""
+        row = self.tracks[index]
+        return {
+            **{field: row[field].item() for field in ("duration", "bpm", "loudness", "centroid", "major", "moods")},
+            "beats": self.beats_of(index),
+            "energy": self.energy_of(index),
+        }
+
+
+class MusicLibrary:
+    """로컬 배경 음악 라이브러리
+
+    - 색인: 곡마다 라우드니스/BPM/비트/에너지 곡선/분위기 태그를 한 번만 분석해 memory-mapped 인덱스로 저장
+      (변경된 파일만 다시 분석, 새 버전 디렉터리에 쓴 뒤 current 포인터 교체)
+    - 선택: 스크립트 분위기/강도로 인덱스 전체를 벡터 연산 한 번에 점수화
+    - 조립 단계에는 곡 경로, 시작 위치, 비트 시각, 볼륨만 전달 (요청마다 오디오 분석 없음)
+    """
+
+    def __init__(self):
+        self.index: Optional[MusicIndex] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def root(self) -> Optional[Path]:
+        return Path(settings.music_library_dir) if settings.music_library_dir else None
+
+    @property
+    def index_dir(self) -> Optional[Path]:
+        if settings.music_index_dir:
+            return Path(settings.music_index_dir)
+        return self.root / ".index" if self.root else None
+
+    @property
+    def available(self) -> bool:
+        return (
+            settings.music_enabled
+            and self.root is not None
+            and self.root.is_dir()
+            and shutil.which(settings.ffmpeg_path) is not None
+        )
+
+    def _scan(self) -> dict[str, tuple[float, int]]:
+        """라이브러리 파일 -> (mtime, size)"""
+        files = {}
+        for path in sorted(self.root.rglob("*")):
+            if path.suffix.lower() in AUDIO_EXTENSIONS and ".index" not in path.parts and path.is_file():
+                stat = path.stat()
+                files[path.relative_to(self.root).as_posix()] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def _load(self) -> Optional[MusicIndex]:
+        pointer = self.index_dir / "current"
+        if not pointer.exists():
+            return None
+        try:
+            return MusicIndex(self.index_dir / pointer.read_text().strip())
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Music index unreadable, rebuilding: %s", e)
+            return None
+
+    def _write(self, files: dict[str, tuple[float, int]], features: dict[str, dict]) -> None:
+        """새 버전 디렉터리에 인덱스 저장 후 current 교체 (읽는 중인 이전 버전은 그대로 유지)"""
+        names = [name for name in files if name in features]
+        rows = np.zeros(len(names), dtype=TRACK_DTYPE)
+        beats, energy = [], []
+        beat_offset = energy_offset = 0
+        for row, name in zip(rows, names):
+            feature = features[name]
+            for field in ("duration", "bpm", "loudness", "centroid", "major", "moods"):
+                row[field] = feature[field]
+            row["beat_start"], row["beat_count"] = beat_offset, len(feature["beats"])
+            row["energy_start"], row["energy_count"] = energy_offset, len(feature["energy"])
+            beats.append(np.asarray(feature["beats"], dtype=np.float32))
+            energy.append(np.asarray(feature["energy"], dtype=np.float16))
+            beat_offset += len(feature["beats"])
+            energy_offset += len(feature["energy"])
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        version = f"v{int(time.time() * 1000)}-{os.getpid()}"
+        directory = self.index_dir / version
+        directory.mkdir()
+        np.save(directory / "tracks.npy", rows)
+        # 빈 배열은 mmap 불가 -> 최소 1개
+        np.save(directory / "beats.npy", np.concatenate(beats) if beat_offset else np.zeros(1, np.float32))
+        np.save(directory / "energy.npy", np.concatenate(energy) if energy_offset else np.zeros(1, np.float16))
+        (directory / "tracks.json").write_text(json.dumps({
+            "tracks": [{"name": name, "mtime": files[name][0], "size": files[name][1]} for name in names],
+        }, ensure_ascii=False))
+
+        pointer = self.index_dir / "current.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self.index_dir / "current")
+        # 다른 워커가 방금 쓴 버전은 남기도록 오래된 버전만 정리
+        for old in self.index_dir.glob("v*"):
+            if old.name != version and time.time() - old.stat().st_mtime > 600:
+                shutil.rmtree(old, ignore_errors=True)
+
+    async def refresh(self, force: bool = False) -> dict:
+        """인덱스 갱신 - 새로 추가/변경된 곡만 프로세스 풀에서 분석
+
+        Returns:
+            {"tracks", "analyzed", "failed"}
+        """
+        if not self.available:
+            return {"tracks": 0, "analyzed": 0, "failed": []}
+        async with self._lock:
+            files = await asyncio.to_thread(self._scan)
+            index = self.index or await asyncio.to_thread(self._load)
+            if index and not force and index.stats == files:
+                self.index = index
+                return {"tracks": len(index), "analyzed": 0, "failed": []}
+
+            features = {}
+            pending = []
+            for name, stat in files.items():
+                if index and not force and index.stats.get(name) == stat:
+                    features[name] = index.features(index.positions[name])
+                else:
+                    pending.append(name)
+            results = await asyncio.gather(
+                *(run_in_process(analyze_track, str(self.root / name), settings.ffmpeg_path) for name in pending),
+                return_exceptions=True,
+            )
+            failed = []
+            for name, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    logger.warning("Music analysis failed for %s: %s", name, result)
+                    failed.append(name)
+                    continue
+                # 폴더로 지정한 분위기가 있으면 분석으로 추정한 태그 대신 사용
+                result["moods"] = _folder_moods(name) or result["moods"]
+                features[name] = result
+
+            if not features:
+                self.index = None
+                return {"tracks": 0, "analyzed": 0, "failed": failed}
+            await asyncio.to_thread(self._write, files, features)
+            self.index = await asyncio.to_thread(self._load)
+            logger.info("Music index: %d tracks (%d analyzed, %d failed)", len(features), len(pending), len(failed))
+            return {"tracks": len(features), "analyzed": len(pending) - len(failed), "failed": failed}
+
+    async def warm_up(self):
+        """시작 시 인덱스 로드/갱신 (태스크로 실행, 실패해도 음악 없이 동작)"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("Music library indexing failed: %s", e)
+
+    def _select(self, weights: np.ndarray, intensity: float, video_seconds: float, seed: str) -> int:
+        """곡 점수 = 분위기 일치 + 템포(강도 기준) + 길이 - 인덱스 전체를 한 번에 계산"""
+        tracks = self.index.tracks
+        bits = ((tracks["moods"][:, None].astype(np.int64) >> np.arange(len(MOODS))) & 1).astype(np.float32)
+        mood = bits @ weights / weights.sum() if weights.sum() else np.zeros(len(tracks), dtype=np.float32)
+        target_bpm = 70 + 60 * intensity
+        tempo = np.exp(-0.5 * (np.log2(np.maximum(tracks["bpm"], 1) / target_bpm) / 0.35) ** 2)
+        length = np.minimum(tracks["duration"] / max(video_seconds, 1), 1)
+        # 같은 점수면 프로젝트마다 다른 곡 (seed 고정이라 재조립해도 같은 곡)
+        jitter = np.random.default_rng(zlib.crc32(seed.encode())).random(len(tracks)) * 0.02
+        return int(np.argmax(0.6 * mood + 0.3 * tempo + 0.1 * length + jitter))
+
+    def _start_offset(self, track: int, durations: list[float], levels: list[float]) -> float:
+        """곡 에너지 곡선이 씬 강도 흐름과 가장 비슷한 마디 시작 위치 (초)"""
+        beats = self.index.beats_of(track)
+        energy = self.index.energy_of(track).astype(np.float32)
+        profile = np.repeat(levels, [max(int(round(d * ENERGY_RATE)), 1) for d in durations]).astype(np.float32)
+        if not len(beats) or len(energy) <= len(profile):
+            return float(beats[0]) if len(beats) else 0.0
+
+        windows = np.lib.stride_tricks.sliding_window_view(energy, len(profile))
+        correlation = windows @ (profile - profile.mean())
+        starts = beats[::BEATS_PER_BAR]
+        positions = np.round(starts * ENERGY_RATE).astype(np.int64)
+        valid = positions < len(windows)
+        if not valid.any():
+            return float(beats[0])
+        best = int(np.argmax(correlation[positions[valid]]))
+        return float(starts[valid][best])
+
+    def plan(self, script: dict, style: Optional[str] = None, seed: str = "") -> Optional[dict]:
+        """스크립트에 맞는 배경 음악 계획 (assembly_service에 그대로 전달)
+
+        Returns:
+            name, path, start (초), beats (영상 기준 초), gain_db (라우드니스 정규화),
+            scene_gains ({scene_id: dB}), snap_seconds - 라이브러리가 비어 있으면 None
+        """
+        index = self.index
+        if not settings.music_enabled or index is None or not len(index):
+            return None
+
+        scenes = script.get("scenes") or []
+        durations = [max(float(s.get("end_time", 0)) - float(s.get("start_time", 0)), 1.0) for s in scenes] or [60.0]
+        intensities = [s.get("music_intensity") if s.get("music_intensity") in INTENSITY_LEVELS else "medium"
+                       for s in scenes] or ["medium"]
+        levels = [INTENSITY_LEVELS[i] for i in intensities]
+        weights = mood_weights([
+            (script.get("music_style"), 3.0),
+            (style, 2.0),
+            (script.get("overall_mood"), 2.0),
+            *((scene.get("emotion"), 1.0) for scene in scenes),
+        ])
+        video_seconds = sum(durations)
+
+        track = self._select(weights, float(np.mean(levels)), video_seconds, seed)
+        start = self._start_offset(track, durations, levels)
+        row = index.tracks[track]
+        # 실제 클립 길이는 스크립트와 다를 수 있고 짧은 곡은 반복 재생 -> 비트도 반복해 충분히 확보
+        duration = float(row["duration"])
+        beats = index.beats_of(track)
+        loops = int(np.ceil((start + 2 * video_seconds + 30) / duration))
+        beats = np.concatenate([beats + loop * duration for loop in range(max(loops, 1))]) - start
+        beats = beats[beats > 0]
+
+        music_selections.labels(MOODS[int(np.argmax(weights))] if weights.any() else "any").inc()
+        return {
+            "name": index.names[track],
+            "path": str(self.root / index.names[track]),
+            "start": round(start, 3),
+            "bpm": round(float(row["bpm"]), 1),
+            "beats": beats.astype(np.float32),
+            "gain_db": round(settings.music_target_lufs - float(row["loudness"]), 2),
+            "scene_gains": {s.get("scene_id"): INTENSITY_GAIN_DB[i] for s, i in zip(scenes, intensities)},
+            "snap_seconds": settings.music_beat_snap_seconds,
+        }
+
+    def snapshot(self) -> dict:
+        index = self.index
+        if index is None:
+            return {"available": self.available, "tracks": []}
+        return {
+            "available": self.available,
+            "index": index.directory.name,
+            "tracks": [
+                {
+                    "name": name,
+                    "duration": round(float(row["duration"]), 1),
+                    "bpm": round(float(row["bpm"]), 1),
+                    "loudness": round(float(row["loudness"]), 1),
+                    "moods": [mood for mood in MOODS if int(row["moods"]) & MOOD_BITS[mood]],
+                }
+                for name, row in zip(index.names, index.tracks)
+            ],
+        }
+
+
+music_library = MusicLibrary()
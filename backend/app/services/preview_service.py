@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import io
+import logging
+import shutil
+from typing import Optional
+
+from ..config import get_settings
+from .metrics_service import instrumented
+from .process_pool import run_in_process
+from .storage_service import storage_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (320, 320)
+POSTER_WIDTH = 480
+# 9:16 저해상도 스토리보드
+STORYBOARD_SIZE = (270, 480)
+STORYBOARD_FPS = 8
+STORYBOARD_SECONDS_PER_SCENE = 1.5
+
+# camera_movement -> (시작 crop, 끝 crop), crop = (중심 x, 중심 y, 배율)
+CAMERA_PATHS = {
+    "slow_zoom_in": ((0.5, 0.5, 1.0), (0.5, 0.5, 0.8)),
+    "zoom_in": ((0.5, 0.5, 1.0), (0.5, 0.5, 0.7)),
+    "slow_zoom_out": ((0.5, 0.5, 0.8), (0.5, 0.5, 1.0)),
+    "zoom_out": ((0.5, 0.5, 0.7), (0.5, 0.5, 1.0)),
+    "pan_left": ((0.6, 0.5, 0.85), (0.4, 0.5, 0.85)),
+    "pan_right": ((0.4, 0.5, 0.85), (0.6, 0.5, 0.85)),
+    "tilt_up": ((0.5, 0.6, 0.85), (0.5, 0.4, 0.85)),
+    "tilt_down": ((0.5, 0.4, 0.85), (0.5, 0.6, 0.85)),
+    "static": ((0.5, 0.5, 0.95), (0.5, 0.5, 0.95)),
+}
+
+
+def _content_key(*parts: bytes | str) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def render_thumbnail(image_data: bytes) -> bytes:
+    """프로젝트 목록용 정사각 썸네일 (JPEG) - 프로세스 풀에서 실행"""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(image_data)) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        thumb = ImageOps.fit(img, THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    thumb.save(output, format="JPEG", quality=80, optimize=True)
+    return output.getvalue()
+
+
+def _cover_box(width: int, height: int, target_ratio: float) -> tuple[float, float]:
+    """target 비율로 화면을 채우는 최대 crop 크기"""
+    if width / height > target_ratio:
+        return height * target_ratio, height
+    return width, width / target_ratio
+
+
+def render_storyboard(shots: list[tuple[bytes, str]]) -> tuple[bytes, str]:
+    """사진 + camera_movement로 저해상도 애니메이션 스토리보드 생성
+
+    Returns:
+        (이미지 바이트, 확장자) - WebP 애니메이션, 미지원 환경이면 GIF
+    """
+    from PIL import Image, ImageOps
+
+    out_w, out_h = STORYBOARD_SIZE
+    frames_per_shot = max(int(STORYBOARD_FPS * STORYBOARD_SECONDS_PER_SCENE), 2)
+    frames = []
+
+    for image_data, camera_movement in shots:
+        with Image.open(io.BytesIO(image_data)) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            # 큰 원본은 미리 줄여서 프레임당 resize 비용 절감
+            img.thumbnail((out_w * 3, out_h * 3), Image.Resampling.BILINEAR)
+
+        (x0, y0, s0), (x1, y1, s1) = CAMERA_PATHS.get(camera_movement, CAMERA_PATHS["static"])
+        base_w, base_h = _cover_box(img.width, img.height, out_w / out_h)
+
+        for i in range(frames_per_shot):
+            t = i / (frames_per_shot - 1)
+            cx, cy, scale = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, s0 + (s1 - s0) * t
+            crop_w, crop_h = base_w * scale, base_h * scale
+            left = min(max(cx * img.width - crop_w / 2, 0), img.width - crop_w)
+            top = min(max(cy * img.height - crop_h / 2, 0), img.height - crop_h)
+            frames.append(
+                img.resize(
+                    STORYBOARD_SIZE,
+                    Image.Resampling.BILINEAR,
+                    box=(left, top, left + crop_w, top + crop_h),
+                )
+            )
+
+    if not frames:
+        raise ValueError("No frames to render")
+
+    duration_ms = int(1000 / STORYBOARD_FPS)
+    output = io.BytesIO()
+    try:
+        frames[0].save(
+            output, format="WEBP", save_all=True, append_images=frames[1:],
+            duration=duration_ms, loop=0, quality=50, method=4,
+        )
+        return output.getvalue(), "webp"
+    except (OSError, KeyError, ValueError):
+        output = io.BytesIO()
+        frames[0].save(
+            output, format="GIF", save_all=True, append_images=frames[1:],
+            duration=duration_ms, loop=0, optimize=True,
+        )
+        return output.getvalue(), "gif"
+
+
+class PreviewService:
+    """렌더링 중 보여줄 가벼운 미리보기 생성
+
+    - 썸네일: 첫 사진 (프로젝트 목록용)
+    - 스토리보드: 업로드 사진 + 스크립트 camera_movement 기반 저해상도 애니메이션
+    - 포스터: 완료된 씬 클립의 한 프레임 (ffmpeg)
+    입력 내용 해시로 파일명을 만들어 저장소에 캐시.
+    """
+
+    def __init__(self):
+        self.ffmpeg_path = settings.ffmpeg_path
+
+    async def _cached(self, project_id: str, name: str) -> Optional[str]:
+        if await storage_service.preview_exists(project_id, name):
+            return storage_service.get_preview_url(project_id, name)
+        return None
+
+    async def create_thumbnail(self, project_id: str, image_data: bytes) -> str:
+        name = f"thumb_{_content_key(image_data)}.jpg"
+        cached = await self._cached(project_id, name)
+        if cached:
+            return cached
+
+        data = await run_in_process(render_thumbnail, image_data)
+        return await storage_service.save_preview(project_id, name, data, "image/jpeg")
+
+    async def create_storyboard(
+        self, project_id: str, scenes: list[dict], images: dict[str, bytes]
+    ) -> Optional[str]:
+        """스크립트 씬 순서대로 스토리보드 생성 (사진 없는 씬은 건너뜀)"""
+        shots = [
+            (images[scene["photo_id"]], scene.get("camera_movement", "static"))
+            for scene in scenes
+            if scene.get("photo_id") in images
+        ]
+        if not shots:
+            # 스크립트가 업로드 사진을 참조하지 않으면 업로드 순서 사용
+            shots = [(data, "slow_zoom_in") for data in images.values()]
+        if not shots:
+            return None
+
+        key = _content_key(*(part for data, movement in shots for part in (data, movement)))
+        for ext in ("webp", "gif"):
+            cached = await self._cached(project_id, f"storyboard_{key}.{ext}")
+            if cached:
+                return cached
+
+        data, ext = await run_in_process(render_storyboard, shots)
+        return await storage_service.save_preview(
+            project_id, f"storyboard_{key}.{ext}", data, f"image/{ext}"
+        )
+
+    async def create_poster(self, project_id: str, video_url: str) -> Optional[str]:
+        """씬 클립에서 포스터 프레임 추출 (ffmpeg 필요)"""
+        if not shutil.which(self.ffmpeg_path):
+            return None
+
+        name = f"poster_{_content_key(video_url)}.jpg"
+        cached = await self._cached(project_id, name)
+        if cached:
+            return cached
+
+        data = await self._extract_frame(video_url)
+        if data is None:
+            return None
+        return await storage_service.save_preview(project_id, name, data, "image/jpeg")
+
+    @instrumented("ffmpeg", "poster")
+    async def _extract_frame(self, video_url: str) -> Optional[bytes]:
+        """포스터 프레임 JPEG - CDN/S3 읽기가 멈추면 한도 후 ffmpeg를 종료하고 None (완료를 막지 않음)"""
+        process = await asyncio.create_subprocess_exec(
+            self.ffmpeg_path, "-loglevel", "error",
+            "-ss", "1", "-i", video_url,
+            "-frames:v", "1",
+            "-vf", f"scale={POSTER_WIDTH}:-2",
+            "-f", "image2", "-c:v", "mjpeg", "-q:v", "5",
+            "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), settings.poster_timeout_seconds)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.warning("Poster skipped: reading %s timed out after %ss", video_url, settings.poster_timeout_seconds)
+            return None
+        if process.returncode != 0 or not stdout:
+            raise Exception(f"ffmpeg error: {stderr.decode(errors='ignore')}")
+        return stdout
+
+
+preview_service = PreviewService()
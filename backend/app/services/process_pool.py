@@ -0,0 +1,33 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from ..config import get_settings
+
+settings = get_settings()
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """CPU 작업용 공용 프로세스 풀 (최초 사용 시 생성)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.process_pool_workers or None)
+    return _executor
+
+
+async def run_in_process(func: Callable, *args):
+    """이벤트 루프를 막지 않도록 CPU 작업을 프로세스 풀에서 실행
+
+    func와 인자는 pickle 가능해야 함 (모듈 최상위 함수).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_process_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Optional
+
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 이 모듈의 샘플러/워치독 프레임은 프로파일에서 제외
+_OWN_FILE = __file__
+
+
+def _folded_stack(frame) -> str:
+    """flamegraph.pl / speedscope 호환 folded 스택 (root;...;leaf)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename != _OWN_FILE:
+            names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """이벤트 루프 스레드의 스택을 주기적으로 샘플링
+
+    asyncio는 단일 스레드이므로 샘플에는 같은 시간대의 다른 요청 작업도 섞일 수 있음.
+    샘플은 (시각, folded 스택)으로 링 버퍼에 보관하여 느린 요청의 구간을 사후 추출.
+    """
+
+    def __init__(self, target_thread_id: int, interval: float, max_samples: int):
+        super().__init__(daemon=True, name="stack-sampler")
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.samples: deque[tuple[float, str]] = deque(maxlen=max_samples)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is not None:
+                self.samples.append((time.monotonic(), _folded_stack(frame)))
+
+    def stop(self):
+        self._stop_event.set()
+
+    def window(self, start: float, end: float) -> Counter:
+        return Counter(stack for at, stack in list(self.samples) if start <= at <= end and stack)
+
+
+class LoopLagMonitor:
+    """이벤트 루프 블로킹 감지
+
+    루프 안의 heartbeat 태스크가 주기적으로 시각을 갱신하고,
+    별도 워치독 스레드가 갱신이 threshold 이상 멈추면 그 순간의 루프 스레드 스택을 기록.
+    (예: S3StorageService의 동기 boto3 호출)
+    """
+
+    def __init__(self, threshold: float, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self.blocked_events: deque[dict] = deque(maxlen=100)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - expected
+            self.max_lag = max(self.max_lag, lag)
+            self._last_beat = time.monotonic()
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop_event.wait(self.interval):
+            blocked_for = time.monotonic() - self._last_beat
+            if blocked_for < self.threshold or reported_beat == self._last_beat:
+                continue
+            # 한 번의 블로킹은 한 번만 기록
+            reported_beat = self._last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self.blocked_events.append({
+                "at": datetime.now().isoformat(),
+                "blocked_for": round(blocked_for, 3),
+                "stack": _folded_stack(frame) if frame else "",
+            })
+            logger.warning("Event loop blocked for %.3fs:\n%s", blocked_for, stack)
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, daemon=True, name="loop-watchdog")
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+
+
+class ProfilingService:
+    """요청 단위 샘플링 프로파일 / 루프 지연 감시 / 느린 요청 자동 캡처
+
+    캡처 결과는 folded 스택 텍스트로 보관 -> flamegraph.pl, speedscope, inferno에서 바로 열람.
+    """
+
+    def __init__(self):
+        self.enabled = settings.profiling_enabled
+        self.sampler: Optional[StackSampler] = None
+        self.lag_monitor: Optional[LoopLagMonitor] = None
+        self.captures: deque[dict] = deque(maxlen=settings.profiling_max_captures)
+
+    def start(self):
+        """이벤트 루프 스레드에서 호출 (앱 시작 시)"""
+        if not self.enabled:
+            return
+        self.sampler = StackSampler(
+            threading.get_ident(),
+            settings.profiling_sample_interval_ms / 1000,
+            max_samples=int(settings.profiling_buffer_seconds * 1000 / settings.profiling_sample_interval_ms),
+        )
+        self.sampler.start()
+        self.lag_monitor = LoopLagMonitor(settings.profiling_loop_block_threshold_ms / 1000)
+        self.lag_monitor.start()
+
+    def stop(self):
+        if self.sampler:
+            self.sampler.stop()
+        if self.lag_monitor:
+            self.lag_monitor.stop()
+
+    def capture(self, reason: str, method: str, path: str, start: float, end: float) -> Optional[dict]:
+        """start~end 구간 샘플을 캡처로 저장"""
+        if not self.sampler:
+            return None
+        stacks = self.sampler.window(start, end)
+        if not stacks:
+            return None
+        capture = {
+            "id": uuid.uuid4().hex[:12],
+            "reason": reason,
+            "method": method,
+            "path": path,
+            "duration_ms": round((end - start) * 1000, 1),
+            "samples": sum(stacks.values()),
+            "created_at": datetime.now().isoformat(),
+            "folded": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n",
+        }
+        self.captures.append(capture)
+        return capture
+
+    def list_captures(self) -> list[dict]:
+        return [{k: v for k, v in c.items() if k != "folded"} for c in reversed(self.captures)]
+
+    def get_capture(self, capture_id: str) -> Optional[dict]:
+        return next((c for c in self.captures if c["id"] == capture_id), None)
+
+    def loop_stats(self) -> dict:
+        if not self.lag_monitor:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "max_lag_ms": round(self.lag_monitor.max_lag * 1000, 1),
+            "threshold_ms": settings.profiling_loop_block_threshold_ms,
+            "blocked_events": list(self.lag_monitor.blocked_events),
+        }
+
+
+profiling_service = ProfilingService()
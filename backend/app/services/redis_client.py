@@ -0,0 +1,55 @@
+import logging
+import time
+from typing import Optional
+
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 연결 실패 후 재시도까지 대기 (그동안은 프로세스 내 저장소로 동작)
+RETRY_AFTER_SECONDS = 30
+
+_client = None
+_unavailable_until = 0.0
+
+
+async def get_redis():
+    """워커 간 공유 Redis 클라이언트 (redis_enabled=False 또는 연결 불가 시 None)
+
+    None이면 호출 측은 프로세스 내 fallback으로 동작해야 함.
+    """
+    global _client, _unavailable_until
+    if not settings.redis_enabled or time.monotonic() < _unavailable_until:
+        return None
+    if _client is not None:
+        return _client
+
+    import redis.asyncio as redis
+
+    client = redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as e:
+        logger.warning("Redis unavailable (%s), using in-process fallback", e)
+        _unavailable_until = time.monotonic() + RETRY_AFTER_SECONDS
+        await client.aclose()
+        return None
+
+    _client = client
+    return _client
+
+
+def mark_unavailable(error: Exception):
+    """명령 실행 중 연결 오류 -> 일정 시간 fallback 사용"""
+    global _client, _unavailable_until
+    logger.warning("Redis error (%s), using in-process fallback", error)
+    _client = None
+    _unavailable_until = time.monotonic() + RETRY_AFTER_SECONDS
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,144 @@
+import time
+from typing import Optional
+
+from ..config import get_settings
+from .credential_pool import replicate_pool
+from .metrics_service import Counter, Gauge, predictions_in_flight, registry
+
+settings = get_settings()
+
+DRAFT = "draft"
+FULL = "full"
+LOCAL = "local"  # local_render_service (사진 + 카메라 무빙)
+
+# 모드별 Replicate 모델 + 입력 (image: 첫 프레임 이미지 입력 이름)
+RENDER_PROFILES = {
+    FULL: {
+        "model": settings.render_full_model,
+        "image_input": "first_frame_image",
+        "input": {"prompt_optimizer": True},
+    },
+    # 저해상도 + 프롬프트 최적화 생략 -> 빠르게 볼 수 있는 초안
+    DRAFT: {
+        "model": settings.render_draft_model,
+        "image_input": "first_frame_image",
+        "input": {"prompt_optimizer": False, "resolution": "512p", "duration": 6},
+    },
+}
+
+render_routes = registry.register(Counter(
+    "render_routes_total", "Scenes routed per render mode", ("mode", "reason"),
+))
+render_latency_estimate = registry.register(Gauge(
+    "render_latency_estimate_seconds", "Smoothed per-scene render latency", ("mode",),
+))
+
+
+class RenderRouter:
+    """씬별 렌더 모드 선택 기준 (모드별 관측 지연시간 EWMA + 현재 실행 중 예측 수 + 제공자 장애 여부)"""
+
+    def __init__(self):
+        self.latency = {
+            FULL: settings.render_full_latency_seconds,
+            DRAFT: settings.render_draft_latency_seconds,
+            LOCAL: settings.render_local_latency_seconds,
+        }
+        for mode, value in self.latency.items():
+            render_latency_estimate.labels(mode).set(value)
+        self.consecutive_failures = 0
+        self.degraded_until = 0.0
+
+    def observe(self, mode: str, seconds: float):
+        """씬 렌더링 완료 시간 반영"""
+        alpha = settings.render_latency_smoothing
+        self.latency[mode] = (1 - alpha) * self.latency[mode] + alpha * seconds
+        render_latency_estimate.labels(mode).set(self.latency[mode])
+
+    def note_failure(self):
+        """제공자 렌더링 실패 - 연속 render_degraded_failures회면 장애로 판단"""
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.render_degraded_failures:
+            self.degraded_until = time.monotonic() + settings.render_degraded_seconds
+
+    def note_success(self):
+        self.consecutive_failures = 0
+        self.degraded_until = 0.0
+
+    def degraded(self) -> bool:
+        """최근 연속 실패 또는 모든 키가 429 쿨다운 중"""
+        if time.monotonic() < self.degraded_until:
+            return True
+        return bool(len(replicate_pool)) and not replicate_pool.healthy()
+
+    def load_factor(self) -> float:
+        """동시 처리 용량을 넘은 만큼 대기가 길어진다고 가정"""
+        in_flight = predictions_in_flight.labels().value
+        return max(1.0, in_flight / max(settings.render_capacity, 1))
+
+    def estimate(self, mode: str, scenes: int) -> float:
+        """scenes개 씬을 순서대로 렌더링하는 예상 시간 (초) - 로컬은 제공자 대기열과 무관"""
+        if mode == LOCAL:
+            return self.latency[mode] * scenes
+        return self.latency[mode] * scenes * self.load_factor()
+
+    def route(self, mode: str = "auto", deadline_seconds: Optional[float] = None) -> "RenderRoute":
+        return RenderRoute(self, mode, deadline_seconds)
+
+
+class RenderRoute:
+    """한 번의 생성 작업 라우팅 (씬마다 남은 시간으로 다시 판단)
+
+    mode: auto / draft / full / local
+    auto는 마감 시간 안에 남은 씬을 모두 full로 끝낼 수 있으면 full, 아니면 draft,
+    draft로도 안 되면 local. 로컬 렌더링이 가능한 씬(사진 있음)은 단순한 카메라 무빙이거나
+    제공자 장애 중이면 모드와 관계없이 local. reason은 마지막 판단 이유.
+    """
+
+    def __init__(self, router: RenderRouter, mode: str = "auto", deadline_seconds: Optional[float] = None):
+        self.router = router
+        self.mode = mode
+        self.deadline_seconds = deadline_seconds or settings.render_default_deadline_seconds or None
+        self.started = time.monotonic()
+        self.reason = ""
+
+    def _routed(self, mode: str, reason: str) -> str:
+        self.reason = reason
+        render_routes.labels(mode, reason).inc()
+        return mode
+
+    def next_mode(self, remaining_scenes: int, local: bool = False, simple: bool = False) -> str:
+        """
+        Args:
+            remaining_scenes: 이번 씬을 포함해 남은 씬 수
+            local: 이번 씬을 로컬 렌더링할 수 있는지 (사진 + ffmpeg)
+            simple: 생성 모델 없이도 충분한 씬인지
+        """
+        if local and self.router.degraded():
+            return self._routed(LOCAL, "degraded")
+        if self.mode == LOCAL:
+            return self._routed(LOCAL, "requested") if local else self._routed(DRAFT, "local_unavailable")
+        if self.mode in (DRAFT, FULL):
+            return self._routed(self.mode, "requested")
+        if local and simple:
+            return self._routed(LOCAL, "simple")
+
+        if self.deadline_seconds is None:
+            return self._routed(FULL, "no_deadline")
+
+        time_left = self.deadline_seconds - (time.monotonic() - self.started)
+        if self.router.estimate(FULL, remaining_scenes) <= time_left:
+            return self._routed(FULL, "deadline")
+        if local and self.router.estimate(DRAFT, remaining_scenes) > time_left:
+            return self._routed(LOCAL, "deadline")
+        return self._routed(DRAFT, "deadline")
+
+    def fall_back(self) -> str:
+        """제공자 렌더링 실패 후 로컬 렌더링으로 대체"""
+        return self._routed(LOCAL, "provider_error")
+
+    def needs_upgrade(self, mode: str) -> bool:
+        """마지막 판단이 품질을 낮춘 대체 렌더링인지 (백그라운드에서 full로 교체 대상)"""
+        return mode == DRAFT or (mode == LOCAL and self.reason in ("degraded", "deadline", "provider_error"))
+
+
+render_router = RenderRouter()
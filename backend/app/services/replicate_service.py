@@ -1,10 +1,19 @@
-import httpx
 import base64
 import asyncio
-from typing import Optional
+import logging
+import time
+from typing import Awaitable, Callable, Optional
 from ..config import get_settings
+from .credential_pool import Credential, RateLimited, replicate_pool
+from .http_clients import get_http_client
+from .lazy import LazyService
+from .local_render_service import local_render_service
+from .eta_service import eta_service
+from .metrics_service import instrumented, predictions_in_flight, replicate_polls, retries, track_stage
+from .render_router import DRAFT, FULL, LOCAL, RENDER_PROFILES, RenderRoute, render_router
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 class ReplicateService:
@@ -15,23 +24,69 @@ class ReplicateService:
     - FPS: 25
     - 영상 길이: 6초
     - 무료: 카드 없이 제한된 횟수 무료 사용 가능
+    초안(draft) 모드는 RENDER_PROFILES의 저해상도 모델 사용
+    API 키는 replicate_pool에서 씬마다 가장 한가한 키를 빌려 생성~완료 대기까지 사용
     """
 
     def __init__(self):
-        self.api_key = settings.replicate_api_key
-        self.base_url = "https://api.replicate.com/v1"
-        self.model_version = "minimax/video-01"
+        self.base_url = settings.replicate_base_url
+        self.model_version = RENDER_PROFILES[FULL]["model"]
+        # 예측 ID -> 생성에 사용한 키 (상태 조회는 같은 계정으로)
+        self.prediction_credentials: dict[str, Credential] = {}
 
+    async def _create_prediction(
+        self, model: str, payload: dict, credential: Optional[Credential] = None, wait: bool = False
+    ) -> dict:
+        """예측 생성 - credential이 없으면 풀에서 빌려 생성 요청에만 사용
+
+        Raises:
+            RateLimited: 429 (키는 쿨다운 상태가 됨)
+        """
+        if credential is None:
+            async with replicate_pool.acquire() as credential:
+                return await self._create_prediction(model, payload, credential, wait)
+
+        headers = {
+            "Authorization": f"Bearer {credential.key}",
+            "Content-Type": "application/json",
+        }
+        if wait:
+            headers["Prefer"] = "wait"  # 동기 방식으로 결과 대기
+        client = get_http_client("replicate")
+        response = await client.post(
+            f"{self.base_url}/models/{model}/predictions",
+            headers=headers,
+            json={"input": payload},
+        )
+        replicate_pool.record(credential, response.status_code, response.headers.get("retry-after"))
+
+        if response.status_code not in [200, 201, 202]:
+            raise Exception(f"Replicate API error: {response.text}")
+
+        result = response.json()
+        if not result.get("output"):
+            self.prediction_credentials[result.get("id")] = credential
+        return {
+            "prediction_id": result.get("id"),
+            "status": result.get("status"),
+            "video_url": result.get("output"),
+        }
+
+    @instrumented("replicate", "create")
     async def generate_video_from_image(
         self,
         image_data: bytes,
         prompt: str,
+        mode: str = FULL,
+        credential: Optional[Credential] = None,
     ) -> dict:
         """이미지에서 영상 생성 (Image-to-Video)
 
         Args:
             image_data: 원본 이미지 바이트 데이터
             prompt: 영상 생성 프롬프트 (영어)
+            mode: 렌더 모드 (full / draft)
+            credential: 사용할 API 키 (없으면 풀에서 선택)
 
         Returns:
             생성된 영상 정보 (prediction_id 등)
@@ -40,168 +95,224 @@ class ReplicateService:
         base64_image = base64.b64encode(image_data).decode("utf-8")
         image_url = f"data:image/jpeg;base64,{base64_image}"
 
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{self.base_url}/models/{self.model_version}/predictions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "Prefer": "wait",  # 동기 방식으로 결과 대기
-                },
-                json={
-                    "input": {
-                        "prompt": prompt,
-                        "first_frame_image": image_url,
-                        "prompt_optimizer": True,
-                    }
-                },
-            )
-
-            if response.status_code not in [200, 201, 202]:
-                raise Exception(f"Replicate API error: {response.text}")
-
-            result = response.json()
-            return {
-                "prediction_id": result.get("id"),
-                "status": result.get("status"),
-                "video_url": result.get("output"),
-            }
+        profile = RENDER_PROFILES[mode]
+        payload = {"prompt": prompt, profile["image_input"]: image_url, **profile["input"]}
+        return await self._create_prediction(profile["model"], payload, credential, wait=True)
 
+    @instrumented("replicate", "create")
     async def generate_video_from_prompt(
         self,
         prompt: str,
+        mode: str = FULL,
+        credential: Optional[Credential] = None,
     ) -> dict:
         """텍스트 프롬프트로 영상 생성 (Text-to-Video)
 
         Args:
             prompt: 영상 생성 프롬프트 (영어)
+            mode: 렌더 모드 (full / draft)
+            credential: 사용할 API 키 (없으면 풀에서 선택)
 
         Returns:
             생성된 영상 정보
         """
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{self.base_url}/models/{self.model_version}/predictions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "input": {
-                        "prompt": prompt,
-                        "prompt_optimizer": True,
-                    }
-                },
-            )
+        profile = RENDER_PROFILES[mode]
+        payload = {"prompt": prompt, **profile["input"]}
+        return await self._create_prediction(profile["model"], payload, credential)
 
-            if response.status_code not in [200, 201, 202]:
-                raise Exception(f"Replicate API error: {response.text}")
+    @instrumented("replicate", "poll")
+    async def get_prediction_status(self, prediction_id: str) -> dict:
+        """영상 생성 상태 조회 (생성에 사용한 키로)
 
-            result = response.json()
+        Raises:
+            RateLimited: 429 (키는 쿨다운 상태가 됨)
+        """
+        credential = self.prediction_credentials.get(prediction_id)
+        if credential is None:
+            if not len(replicate_pool):
+                raise Exception("No replicate API key configured")
+            credential = replicate_pool.credentials[0]
+
+        client = get_http_client("replicate")
+        response = await client.get(
+            f"{self.base_url}/predictions/{prediction_id}",
+            headers={"Authorization": f"Bearer {credential.key}"},
+            timeout=30.0,
+        )
+        replicate_pool.record(credential, response.status_code, response.headers.get("retry-after"))
+
+        if response.status_code != 200:
+            raise Exception(f"Replicate API error: {response.text}")
+
+        result = response.json()
+        status = result.get("status")
+        if status in ("succeeded", "failed", "canceled"):
+            self.prediction_credentials.pop(prediction_id, None)
+
+        if status == "succeeded":
             return {
-                "prediction_id": result.get("id"),
-                "status": result.get("status"),
+                "status": "completed",
                 "video_url": result.get("output"),
             }
-
-    async def get_prediction_status(self, prediction_id: str) -> dict:
-        """영상 생성 상태 조회"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.base_url}/predictions/{prediction_id}",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-            )
-
-            if response.status_code != 200:
-                raise Exception(f"Replicate API error: {response.text}")
-
-            result = response.json()
-            status = result.get("status")
-
-            if status == "succeeded":
-                return {
-                    "status": "completed",
-                    "video_url": result.get("output"),
-                }
-            elif status == "failed":
-                return {
-                    "status": "failed",
-                    "error": result.get("error"),
-                }
-            else:
-                return {"status": status}
+        elif status == "failed":
+            return {
+                "status": "failed",
+                "error": result.get("error"),
+            }
+        else:
+            return {"status": status}
 
     async def wait_for_completion(
-        self, prediction_id: str, max_wait: int = 600, poll_interval: int = 10
+        self,
+        prediction_id: str,
+        max_wait: int = 600,
+        poll_interval: Optional[float] = None,
+        mode: str = FULL,
+        started: Optional[float] = None,
     ) -> dict:
         """영상 생성 완료까지 대기
 
         Args:
             prediction_id: 예측 ID
             max_wait: 최대 대기 시간 (초)
-            poll_interval: 폴링 간격 (초)
+            poll_interval: 폴링 간격 (초) - 없으면 모드별 렌더링 시간 분위수로 조절
+            mode: 렌더 모드 (폴링 간격 추정용)
+            started: 예측 생성 시각 (time.monotonic)
         """
-        elapsed = 0
-        while elapsed < max_wait:
-            status = await self.get_prediction_status(prediction_id)
+        started = started or time.monotonic()
+        while (elapsed := time.monotonic() - started) < max_wait:
+            try:
+                status = await self.get_prediction_status(prediction_id)
+            except RateLimited:
+                # 예측은 계속 진행 중 - 쿨다운 후 같은 키로 다시 조회
+                retries.labels("replicate", "rate_limited").inc()
+                await asyncio.sleep(eta_service.poll_delay("render_scene", mode, elapsed))
+                continue
 
             if status.get("status") == "completed":
                 return status
             elif status.get("status") == "failed":
                 raise Exception(f"Video generation failed: {status.get('error')}")
 
-            await asyncio.sleep(poll_interval)
-            elapsed += poll_interval
+            await asyncio.sleep(poll_interval or eta_service.poll_delay("render_scene", mode, elapsed))
+            replicate_polls.labels().inc()
 
+        self.prediction_credentials.pop(prediction_id, None)
         raise Exception("Video generation timeout")
 
+    async def _render_scene(
+        self, scene: dict, images: dict[str, bytes], mode: str, start: float, credential: Credential
+    ) -> dict:
+        """씬 하나 생성 + 완료 대기"""
+        photo_id = scene.get("photo_id")
+        video_prompt = scene.get("video_prompt", "")
+        # 이미지가 있으면 image-to-video, 없으면 text-to-video
+        if photo_id and photo_id in images:
+            generation = await self.generate_video_from_image(
+                image_data=images[photo_id],
+                prompt=video_prompt,
+                mode=mode,
+                credential=credential,
+            )
+        else:
+            generation = await self.generate_video_from_prompt(
+                prompt=video_prompt,
+                mode=mode,
+                credential=credential,
+            )
+
+        # 이미 완료된 경우 (Prefer: wait 사용 시)
+        if generation.get("video_url"):
+            return {
+                "status": "completed",
+                "video_url": generation.get("video_url"),
+                "scene_id": scene.get("scene_id"),
+            }
+        # 완료 대기 필요
+        result = await self.wait_for_completion(generation["prediction_id"], mode=mode, started=start)
+        result["scene_id"] = scene.get("scene_id")
+        return result
+
     async def generate_scene_videos(
-        self, scenes: list[dict], images: dict[str, bytes]
+        self,
+        scenes: list[dict],
+        images: dict[str, bytes],
+        on_scene_complete: Optional[Callable[[dict], Awaitable]] = None,
+        route: Optional[RenderRoute] = None,
+        project_id: Optional[str] = None,
     ) -> list[dict]:
         """여러 씬의 영상 생성
 
         Args:
             scenes: 스크립트의 씬 목록
             images: photo_id -> image_data 매핑
+            on_scene_complete: 씬 하나가 완료될 때마다 호출 (미리보기 생성 등)
+            route: 씬별 렌더 모드 선택 (없으면 모두 full)
+            project_id: 로컬 렌더링 결과 저장 위치 (없으면 로컬 렌더링 안 함)
 
         Returns:
-            생성된 영상 정보 목록
+            생성된 영상 정보 목록 (각 항목의 mode: full / draft / local,
+            upgrade: 품질을 낮춘 대체 렌더링이라 full로 교체할 대상인지)
         """
+        route = route or render_router.route(FULL)
         results = []
 
-        for scene in scenes:
-            photo_id = scene.get("photo_id")
-            video_prompt = scene.get("video_prompt", "")
-
-            # 이미지가 있으면 image-to-video, 없으면 text-to-video
-            if photo_id and photo_id in images:
-                image_data = images[photo_id]
-                generation = await self.generate_video_from_image(
-                    image_data=image_data,
-                    prompt=video_prompt,
-                )
-            else:
-                generation = await self.generate_video_from_prompt(
-                    prompt=video_prompt,
-                )
+        for index, scene in enumerate(scenes):
+            image_data = images.get(scene.get("photo_id"))
+            local = bool(project_id and image_data and local_render_service.available)
+            mode = route.next_mode(
+                len(scenes) - index, local=local, simple=local and local_render_service.is_simple(scene)
+            )
+            start = time.monotonic()
 
-            # 이미 완료된 경우 (Prefer: wait 사용 시)
-            if generation.get("video_url"):
-                result = {
-                    "status": "completed",
-                    "video_url": generation.get("video_url"),
-                    "scene_id": scene.get("scene_id"),
-                }
+            if mode == LOCAL:
+                result = await _render_locally(project_id, scene, image_data)
             else:
-                # 완료 대기 필요
-                result = await self.wait_for_completion(generation["prediction_id"])
-                result["scene_id"] = scene.get("scene_id")
-
+                predictions_in_flight.labels().inc()
+                try:
+                    async with track_stage("render_scene"):
+                        # 씬 하나는 생성~완료까지 같은 키 사용, 생성이 429면 다른 키로 재시도
+                        for attempt in range(len(replicate_pool) + 1):
+                            try:
+                                async with replicate_pool.acquire() as credential:
+                                    result = await self._render_scene(scene, images, mode, start, credential)
+                                break
+                            except RateLimited:
+                                if attempt == len(replicate_pool):
+                                    raise
+                                retries.labels("replicate", "rate_limited").inc()
+                    render_router.note_success()
+                except Exception as e:
+                    render_router.note_failure()
+                    if not local:
+                        raise
+                    # 제공자 장애 - 사진 씬은 로컬로 대체 (이후 백그라운드 교체 대상)
+                    logger.warning(
+                        "Replicate render failed for scene %s, rendering locally: %s", scene.get("scene_id"), e
+                    )
+                    mode = route.fall_back()
+                    start = time.monotonic()
+                    result = await _render_locally(project_id, scene, image_data)
+                finally:
+                    predictions_in_flight.labels().dec()
+
+            render_router.observe(mode, time.monotonic() - start)
+            eta_service.record("render_scene", time.monotonic() - start, model=mode)
+            result["scene_id"] = scene.get("scene_id")
+            result["mode"] = mode
+            result["upgrade"] = route.needs_upgrade(mode)
             results.append(result)
+            if on_scene_complete:
+                await on_scene_complete(result)
 
         return results
 
 
+async def _render_locally(project_id: str, scene: dict, image_data: bytes) -> dict:
+    async with track_stage("render_scene"):
+        return await local_render_service.render_scene(project_id, scene, image_data)
+
+
 class MockReplicateService:
     """테스트용 Mock Replicate 서비스"""
 
@@ -209,6 +320,8 @@ class MockReplicateService:
         self,
         image_data: bytes,
         prompt: str,
+        mode: str = FULL,
+        credential: Optional[Credential] = None,
     ) -> dict:
         await asyncio.sleep(2)
         return {
@@ -220,6 +333,8 @@ class MockReplicateService:
     async def generate_video_from_prompt(
         self,
         prompt: str,
+        mode: str = FULL,
+        credential: Optional[Credential] = None,
     ) -> dict:
         await asyncio.sleep(2)
         return {
@@ -235,7 +350,12 @@ class MockReplicateService:
         }
 
     async def wait_for_completion(
-        self, prediction_id: str, max_wait: int = 600, poll_interval: int = 10
+        self,
+        prediction_id: str,
+        max_wait: int = 600,
+        poll_interval: Optional[float] = None,
+        mode: str = FULL,
+        started: Optional[float] = None,
     ) -> dict:
         await asyncio.sleep(3)
         return {
@@ -244,24 +364,43 @@ class MockReplicateService:
         }
 
     async def generate_scene_videos(
-        self, scenes: list[dict], images: dict[str, bytes]
+        self,
+        scenes: list[dict],
+        images: dict[str, bytes],
+        on_scene_complete: Optional[Callable[[dict], Awaitable]] = None,
+        route: Optional[RenderRoute] = None,
+        project_id: Optional[str] = None,
     ) -> list[dict]:
+        route = route or render_router.route(FULL)
         results = []
-        for scene in scenes:
-            await asyncio.sleep(1)
-            results.append({
-                "scene_id": scene.get("scene_id"),
-                "status": "completed",
-                "video_url": f"https://example.com/replicate_scene_{scene.get('scene_id')}.mp4",
-            })
+        for index, scene in enumerate(scenes):
+            image_data = images.get(scene.get("photo_id"))
+            local = bool(project_id and image_data and local_render_service.available)
+            mode = route.next_mode(
+                len(scenes) - index, local=local, simple=local and local_render_service.is_simple(scene)
+            )
+            if mode == LOCAL:
+                result = await _render_locally(project_id, scene, image_data)
+            else:
+                await asyncio.sleep(0.3 if mode == DRAFT else 1)
+                result = {
+                    "status": "completed",
+                    "video_url": f"https://example.com/replicate_scene_{scene.get('scene_id')}_{mode}.mp4",
+                }
+            result["scene_id"] = scene.get("scene_id")
+            result["mode"] = mode
+            result["upgrade"] = route.needs_upgrade(mode)
+            results.append(result)
+            if on_scene_complete:
+                await on_scene_complete(result)
         return results
 
 
 def get_replicate_service():
     """Replicate API 키가 있으면 실제 서비스, 없으면 Mock 서비스"""
-    if settings.replicate_api_key:
+    if len(replicate_pool):
         return ReplicateService()
     return MockReplicateService()
 
 
-replicate_service = get_replicate_service()
+replicate_service = LazyService(get_replicate_service)
@@ -0,0 +1,191 @@
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+# 해시가 붙은 빌드 산출물 (Vite: assets/index-3f2a1b.js)
+IMMUTABLE_PREFIX = "assets/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 압축 효과가 있는 타입만 메모리 gzip 생성
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+MAX_INMEMORY_GZIP_SIZE = 512 * 1024
+
+# 선호 순서 (br > gzip)
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class StaticVariant:
+    """인코딩별 표현 (디스크 파일 또는 메모리 바이트)"""
+
+    etag: str
+    size: int
+    path: Optional[Path] = None
+    body: Optional[bytes] = None
+
+
+@dataclass
+class StaticAsset:
+    media_type: str
+    cache_control: str
+    variants: dict[str, StaticVariant] = field(default_factory=dict)  # "identity" | "gzip" | "br"
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _parse_accept_encoding(header: str) -> set[str]:
+    """Accept-Encoding 헤더에서 허용된 인코딩 추출 (q=0 제외)"""
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(token)
+    if "*" in accepted:
+        accepted.update(PRECOMPRESSED_SUFFIXES)
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 비교 (weak 비교, RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+class StaticManifest:
+    """SPA 정적 파일 매니페스트
+
+    시작 시 static/ 트리를 한 번 스캔하여 경로별 ETag, 캐시 정책,
+    사전 압축(.br/.gz) 변형을 기록. 요청마다 파일시스템을 조회하지 않음.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.assets: dict[str, StaticAsset] = {}
+        self.index: Optional[StaticAsset] = None
+
+    def build(self) -> "StaticManifest":
+        """static/ 트리 스캔"""
+        self.assets.clear()
+        if not self.root.exists():
+            return self
+
+        for file_path in sorted(self.root.rglob("*")):
+            if not file_path.is_file():
+                continue
+            # 사전 압축 파일은 원본의 변형으로만 등록
+            if file_path.suffix in PRECOMPRESSED_SUFFIXES.values() and file_path.with_suffix("").is_file():
+                continue
+
+            rel_path = file_path.relative_to(self.root).as_posix()
+            self.assets[rel_path] = self._build_asset(rel_path, file_path)
+
+        self.index = self.assets.get("index.html")
+        if self.index:
+            # SPA fallback은 메모리에서 바로 응답
+            for variant in self.index.variants.values():
+                if variant.body is None and variant.path is not None:
+                    variant.body = variant.path.read_bytes()
+        return self
+
+    def _build_asset(self, rel_path: str, file_path: Path) -> StaticAsset:
+        data = file_path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+
+        asset = StaticAsset(
+            media_type=media_type,
+            cache_control=(
+                IMMUTABLE_CACHE_CONTROL
+                if rel_path.startswith(IMMUTABLE_PREFIX)
+                else REVALIDATE_CACHE_CONTROL
+            ),
+        )
+        asset.variants["identity"] = StaticVariant(
+            etag=f'"{digest}"', size=len(data), path=file_path
+        )
+
+        # 빌드 단계에서 만든 사전 압축 파일 우선
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            compressed_path = file_path.with_name(file_path.name + suffix)
+            if compressed_path.is_file():
+                asset.variants[encoding] = StaticVariant(
+                    etag=f'"{digest}-{encoding}"',
+                    size=compressed_path.stat().st_size,
+                    path=compressed_path,
+                )
+
+        # .gz가 없으면 작은 텍스트 파일은 메모리에서 gzip
+        if (
+            "gzip" not in asset.variants
+            and _is_compressible(media_type)
+            and len(data) <= MAX_INMEMORY_GZIP_SIZE
+        ):
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                asset.variants["gzip"] = StaticVariant(
+                    etag=f'"{digest}-gzip"', size=len(compressed), body=compressed
+                )
+
+        return asset
+
+    def get(self, rel_path: str) -> Optional[StaticAsset]:
+        return self.assets.get(rel_path)
+
+    def respond(self, request: Request, asset: StaticAsset) -> Response:
+        """Accept-Encoding / If-None-Match를 반영한 응답 생성"""
+        accepted = _parse_accept_encoding(request.headers.get("accept-encoding", ""))
+        encoding = "identity"
+        for candidate in PRECOMPRESSED_SUFFIXES:
+            if candidate in accepted and candidate in asset.variants:
+                encoding = candidate
+                break
+        variant = asset.variants[encoding]
+
+        headers = {
+            "ETag": variant.etag,
+            "Cache-Control": asset.cache_control,
+        }
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, variant.etag):
+            return Response(status_code=304, headers=headers)
+
+        if variant.body is not None:
+            return Response(content=variant.body, media_type=asset.media_type, headers=headers)
+
+        # FileResponse는 etag가 이미 있으면 stat 기반 값으로 덮어쓰지 않음
+        return FileResponse(variant.path, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from ..config import get_settings
+from .metrics_service import Counter, registry
+from .redis_client import get_redis, mark_unavailable
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "status:"
+INVALIDATE_CHANNEL = "status:invalidate"
+
+status_cache_lookups = registry.register(Counter(
+    "status_cache_lookups_total", "Status cache lookups by layer", ("layer",),
+))
+
+
+# 남은 시간(상대값)은 읽을 때마다 다시 계산 - ETag에서 제외해 카운트다운만으로 304가 깨지지 않게 함
+RELATIVE_FIELDS = ("eta_seconds", "eta_p90_seconds", "poll_interval_seconds")
+
+
+def _etag(payload: dict) -> str:
+    stable = {key: value for key, value in payload.items() if key not in RELATIVE_FIELDS}
+    body = json.dumps(stable, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha1(body.encode("utf-8")).hexdigest()[:16] + '"'
+
+
+class StatusCache:
+    """GET /status 용 read-through 캐시 (프로세스 내 -> Redis)
+
+    파이프라인이 상태를 바꿀 때마다 set()으로 갱신하고, pub/sub으로 다른 워커의
+    프로세스 내 캐시를 무효화. Redis가 없으면 프로세스 내 캐시만 사용.
+    항목: {"payload": 상태 응답 dict, "etag": ETag, "written_at": 기록 시각(epoch 초)}
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.local: dict[str, tuple[float, dict]] = {}
+        self.local_ttl = settings.status_cache_local_ttl_seconds
+        self._listener: Optional[asyncio.Task] = None
+
+    def _get_local(self, project_id: str) -> Optional[dict]:
+        cached = self.local.get(project_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        self.local.pop(project_id, None)
+        return None
+
+    def _set_local(self, project_id: str, entry: dict):
+        self.local[project_id] = (time.monotonic() + self.local_ttl, entry)
+
+    async def get(self, project_id: str) -> Optional[dict]:
+        entry = self._get_local(project_id)
+        if entry:
+            status_cache_lookups.labels("local").inc()
+            return entry
+
+        client = await get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(KEY_PREFIX + project_id)
+            except Exception as e:
+                mark_unavailable(e)
+                raw = None
+            if raw:
+                entry = json.loads(raw)
+                self._set_local(project_id, entry)
+                status_cache_lookups.labels("redis").inc()
+                return entry
+
+        status_cache_lookups.labels("miss").inc()
+        return None
+
+    async def set(self, project_id: str, payload: dict, only_if_missing: bool = False) -> dict:
+        """캐시 갱신
+
+        only_if_missing: 조회 miss 후 채우기용 - 그 사이 다른 워커가 기록한 최신 상태를 덮어쓰지 않음
+        """
+        entry = {"payload": payload, "etag": _etag(payload), "written_at": time.time()}
+        self._set_local(project_id, entry)
+
+        client = await get_redis()
+        if client is not None:
+            try:
+                stored = await client.set(
+                    KEY_PREFIX + project_id, json.dumps(entry),
+                    ex=settings.status_cache_ttl_seconds, nx=only_if_missing,
+                )
+                if stored:
+                    await client.publish(INVALIDATE_CHANNEL, f"{self.worker_id}:{project_id}")
+            except Exception as e:
+                mark_unavailable(e)
+        return entry
+
+    async def invalidate(self, project_id: str):
+        self.local.pop(project_id, None)
+
+        client = await get_redis()
+        if client is not None:
+            try:
+                await client.delete(KEY_PREFIX + project_id)
+                await client.publish(INVALIDATE_CHANNEL, f"{self.worker_id}:{project_id}")
+            except Exception as e:
+                mark_unavailable(e)
+
+    async def _listen(self):
+        """다른 워커의 상태 변경 -> 프로세스 내 캐시에서 제거"""
+        while True:
+            client = await get_redis()
+            if client is None:
+                await asyncio.sleep(self.local_ttl)
+                continue
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        worker_id, _, project_id = message["data"].partition(":")
+                        if worker_id != self.worker_id:
+                            self.local.pop(project_id, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                mark_unavailable(e)
+
+    def start(self):
+        if settings.redis_enabled and self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+
+
+status_cache = StatusCache()
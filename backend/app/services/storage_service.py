@@ -1,25 +1,46 @@
 import os
+import shutil
 import uuid
 import aiofiles
 from pathlib import Path
 from typing import Optional
 from ..config import get_settings
+from .lazy import LazyService
+from .metrics_service import instrumented
 
 settings = get_settings()
 
 # 로컬 저장소 경로
 LOCAL_STORAGE_PATH = Path(__file__).parent.parent.parent / "storage"
-LOCAL_STORAGE_PATH.mkdir(exist_ok=True)
+
+# 다시 만들 수 있는 파생 파일 (할당량 초과 시 먼저 정리) - 원본 사진/최종 영상은 제외
+DERIVED_KINDS = ("preview", "hls", "clip")
+# 조립 전 씬 클립의 video_id 접두사 (최종 영상이 아니므로 파생 파일로 분류)
+CLIP_PREFIX = "clip-"
+
+
+def _video_kind(video_id: str) -> str:
+    return "clip" if video_id.startswith(CLIP_PREFIX) else "video"
+
+
+def _stored_file(key: str, project_id: Optional[str], kind: str, size: int, modified: float) -> dict:
+    """list_files 항목 (modified: epoch 초)"""
+    return {"key": key, "project_id": project_id, "kind": kind, "size": size, "modified": modified}
 
 
 class LocalStorageService:
     """로컬 파일 저장소 서비스 (개발용)"""
 
+    is_local = True
+
     def __init__(self):
         self.base_path = LOCAL_STORAGE_PATH
+        self.base_path.mkdir(exist_ok=True)
         (self.base_path / "photos").mkdir(exist_ok=True)
         (self.base_path / "videos").mkdir(exist_ok=True)
+        (self.base_path / "previews").mkdir(exist_ok=True)
 
+    @instrumented("storage", "upload_photo")
     async def upload_photo(self, project_id: str, photo_data: bytes, filename: str) -> str:
         """사진 업로드"""
         photo_id = str(uuid.uuid4())
@@ -31,6 +52,7 @@ class LocalStorageService:
 
         return photo_id
 
+    @instrumented("storage", "get_photo")
     async def get_photo(self, project_id: str, photo_id: str) -> Optional[bytes]:
         """사진 조회"""
         # 확장자 모르므로 패턴 매칭
@@ -39,6 +61,7 @@ class LocalStorageService:
                 return await f.read()
         return None
 
+    @instrumented("storage", "get_all_photos")
     async def get_all_photos(self, project_id: str) -> dict[str, bytes]:
         """프로젝트의 모든 사진 조회"""
         photos = {}
@@ -48,24 +71,132 @@ class LocalStorageService:
                 photos[photo_id] = await f.read()
         return photos
 
-    async def save_video(self, project_id: str, video_data: bytes) -> str:
-        """영상 저장"""
-        video_id = str(uuid.uuid4())
+    @instrumented("storage", "save_video")
+    async def save_video(self, project_id: str, video_data: bytes, video_id: Optional[str] = None) -> str:
+        """영상 저장 (video_id 반환)"""
+        video_id = video_id or str(uuid.uuid4())
         file_path = self.base_path / "videos" / f"{project_id}_{video_id}.mp4"
 
         async with aiofiles.open(file_path, "wb") as f:
             await f.write(video_data)
 
-        return str(file_path)
+        return video_id
+
+    @instrumented("storage", "save_video_asset")
+    async def save_video_asset(self, project_id: str, video_id: str, name: str, data: bytes, content_type: str):
+        """영상 부속 파일 저장 (HLS 플레이리스트/세그먼트)"""
+        asset_dir = self.base_path / "videos" / f"{project_id}_{video_id}_hls"
+        asset_dir.mkdir(exist_ok=True)
+
+        async with aiofiles.open(asset_dir / name, "wb") as f:
+            await f.write(data)
+
+    async def get_video(self, project_id: str, video_id: str) -> Optional[bytes]:
+        """영상 바이트 조회"""
+        file_path = self.get_video_path(project_id, video_id)
+        if file_path is None:
+            return None
+        async with aiofiles.open(file_path, "rb") as f:
+            return await f.read()
+
+    @instrumented("storage", "delete_video")
+    async def delete_video(self, project_id: str, video_id: str):
+        """영상 하나 삭제 (HLS 디렉토리 포함)"""
+        (self.base_path / "videos" / f"{project_id}_{video_id}.mp4").unlink(missing_ok=True)
+        shutil.rmtree(self.base_path / "videos" / f"{project_id}_{video_id}_hls", ignore_errors=True)
+
+    def get_video_path(self, project_id: str, video_id: str) -> Optional[Path]:
+        """로컬 영상 파일 경로"""
+        file_path = self.base_path / "videos" / f"{project_id}_{video_id}.mp4"
+        return file_path if file_path.is_file() else None
+
+    def get_video_asset_path(self, project_id: str, video_id: str, name: str) -> Optional[Path]:
+        """로컬 HLS 파일 경로"""
+        asset_dir = self.base_path / "videos" / f"{project_id}_{video_id}_hls"
+        file_path = asset_dir / name
+        # 경로 탈출 방지
+        if file_path.parent != asset_dir or not file_path.is_file():
+            return None
+        return file_path
+
+    @instrumented("storage", "save_preview")
+    async def save_preview(self, project_id: str, name: str, data: bytes, content_type: str) -> str:
+        """미리보기 파일 저장 (URL 반환)"""
+        file_path = self.base_path / "previews" / f"{project_id}_{name}"
+
+        async with aiofiles.open(file_path, "wb") as f:
+            await f.write(data)
+
+        return self.get_preview_url(project_id, name)
+
+    async def preview_exists(self, project_id: str, name: str) -> bool:
+        return (self.base_path / "previews" / f"{project_id}_{name}").is_file()
 
+    def get_preview_path(self, project_id: str, name: str) -> Optional[Path]:
+        """로컬 미리보기 파일 경로"""
+        previews_dir = self.base_path / "previews"
+        file_path = previews_dir / f"{project_id}_{name}"
+        # 경로 탈출 방지
+        if file_path.parent != previews_dir or not file_path.is_file():
+            return None
+        return file_path
+
+    def get_preview_url(self, project_id: str, name: str) -> str:
+        """미리보기 URL 반환 (로컬)"""
+        return f"/api/v1/storage/previews/{project_id}/{name}"
+
+    @instrumented("storage", "delete_project_files")
     async def delete_project_files(self, project_id: str):
         """프로젝트 관련 파일 삭제"""
         # 사진 삭제
         for file_path in (self.base_path / "photos").glob(f"{project_id}_*"):
             file_path.unlink()
-        # 영상 삭제
-        for file_path in (self.base_path / "videos").glob(f"{project_id}_*"):
+        # 미리보기 삭제
+        for file_path in (self.base_path / "previews").glob(f"{project_id}_*"):
             file_path.unlink()
+        # 영상 삭제 (HLS 디렉토리 포함)
+        for file_path in (self.base_path / "videos").glob(f"{project_id}_*"):
+            if file_path.is_dir():
+                shutil.rmtree(file_path)
+            else:
+                file_path.unlink()
+
+    def list_files(self):
+        """저장된 파일 순회 (수명 주기 스윕용, 동기 제너레이터 - 스레드에서 소비)
+
+        HLS 디렉토리는 하나의 항목으로 취급.
+        """
+        for folder, kind in (("photos", "photo"), ("videos", "video"), ("previews", "preview")):
+            directory = self.base_path / folder
+            if not directory.is_dir():
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    project_id = entry.name.split("_", 1)[0] if "_" in entry.name else None
+                    try:
+                        stat = entry.stat()
+                        if entry.is_dir():
+                            if not entry.name.endswith("_hls"):
+                                continue
+                            size = sum(f.stat().st_size for f in Path(entry.path).iterdir() if f.is_file())
+                            yield _stored_file(f"{folder}/{entry.name}", project_id, "hls", size, stat.st_mtime)
+                        else:
+                            # 씬 클립은 파생 파일 ({project_id}_clip-{uuid}.mp4)
+                            file_kind = _video_kind(entry.name.split("_", 1)[1]) if kind == "video" and project_id else kind
+                            yield _stored_file(f"{folder}/{entry.name}", project_id, file_kind, stat.st_size, stat.st_mtime)
+                    except FileNotFoundError:
+                        continue  # 순회 중 삭제된 파일
+
+    def delete_file(self, key: str):
+        """list_files 항목 삭제"""
+        file_path = (self.base_path / key).resolve()
+        # 경로 탈출 방지
+        if self.base_path.resolve() not in file_path.parents:
+            return
+        if file_path.is_dir():
+            shutil.rmtree(file_path, ignore_errors=True)
+        else:
+            file_path.unlink(missing_ok=True)
 
     def get_photo_url(self, project_id: str, photo_id: str) -> str:
         """사진 URL 반환 (로컬)"""
@@ -79,6 +210,8 @@ class LocalStorageService:
 class S3StorageService:
     """AWS S3 저장소 서비스 (프로덕션용)"""
 
+    is_local = False
+
     def __init__(self):
         import boto3
         self.s3 = boto3.client(
@@ -89,6 +222,7 @@ class S3StorageService:
         )
         self.bucket = settings.aws_s3_bucket
 
+    @instrumented("storage", "upload_photo")
     async def upload_photo(self, project_id: str, photo_data: bytes, filename: str) -> str:
         """사진 S3 업로드"""
         photo_id = str(uuid.uuid4())
@@ -104,6 +238,7 @@ class S3StorageService:
 
         return photo_id
 
+    @instrumented("storage", "get_photo")
     async def get_photo(self, project_id: str, photo_id: str) -> Optional[bytes]:
         """S3에서 사진 조회"""
         try:
@@ -119,6 +254,7 @@ class S3StorageService:
             pass
         return None
 
+    @instrumented("storage", "get_all_photos")
     async def get_all_photos(self, project_id: str) -> dict[str, bytes]:
         """프로젝트의 모든 사진 조회"""
         photos = {}
@@ -133,9 +269,10 @@ class S3StorageService:
 
         return photos
 
-    async def save_video(self, project_id: str, video_data: bytes) -> str:
-        """영상 S3 업로드"""
-        video_id = str(uuid.uuid4())
+    @instrumented("storage", "save_video")
+    async def save_video(self, project_id: str, video_data: bytes, video_id: Optional[str] = None) -> str:
+        """영상 S3 업로드 (video_id 반환)"""
+        video_id = video_id or str(uuid.uuid4())
         key = f"videos/{project_id}/{video_id}.mp4"
 
         self.s3.put_object(
@@ -143,9 +280,126 @@ class S3StorageService:
             Key=key,
             Body=video_data,
             ContentType="video/mp4",
+            # video_id마다 키가 달라지므로 불변 캐시
+            CacheControl="public, max-age=31536000, immutable",
         )
 
-        return f"https://{self.bucket}.s3.{settings.aws_region}.amazonaws.com/{key}"
+        return video_id
+
+    async def get_video(self, project_id: str, video_id: str) -> Optional[bytes]:
+        """영상 바이트 조회"""
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=f"videos/{project_id}/{video_id}.mp4")
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read()
+
+    @instrumented("storage", "delete_video")
+    async def delete_video(self, project_id: str, video_id: str):
+        """영상 하나 삭제 (HLS 객체 포함)"""
+        keys = [f"videos/{project_id}/{video_id}.mp4"] + [
+            obj["Key"]
+            for page in self.s3.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket, Prefix=f"videos/{project_id}/{video_id}/"
+            )
+            for obj in page.get("Contents", [])
+        ]
+        for i in range(0, len(keys), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True},
+            )
+
+    @instrumented("storage", "save_video_asset")
+    async def save_video_asset(self, project_id: str, video_id: str, name: str, data: bytes, content_type: str):
+        """영상 부속 파일 S3 업로드 (HLS 플레이리스트/세그먼트)"""
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=f"videos/{project_id}/{video_id}/hls/{name}",
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    def _object_url(self, key: str) -> str:
+        """CDN이 설정되어 있으면 CDN URL, 아니면 Pre-signed URL"""
+        if settings.cdn_base_url:
+            return f"{settings.cdn_base_url.rstrip('/')}/{key}"
+        return self.s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=3600,
+        )
+
+    @instrumented("storage", "save_preview")
+    async def save_preview(self, project_id: str, name: str, data: bytes, content_type: str) -> str:
+        """미리보기 S3 업로드 (URL 반환)"""
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=f"previews/{project_id}/{name}",
+            Body=data,
+            ContentType=content_type,
+            # 파일명이 내용 해시이므로 불변 캐시
+            CacheControl="public, max-age=31536000, immutable",
+        )
+        return self.get_preview_url(project_id, name)
+
+    async def preview_exists(self, project_id: str, name: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=f"previews/{project_id}/{name}")
+            return True
+        except Exception:
+            return False
+
+    def get_preview_url(self, project_id: str, name: str) -> str:
+        """S3 미리보기 URL (CDN 또는 Pre-signed)"""
+        return self._object_url(f"previews/{project_id}/{name}")
+
+    def get_video_url(self, project_id: str, video_id: str) -> str:
+        """S3 영상 URL (CDN 또는 Pre-signed)"""
+        return self._object_url(f"videos/{project_id}/{video_id}.mp4")
+
+    def get_video_asset_url(self, project_id: str, video_id: str, name: str) -> str:
+        """S3 HLS 파일 URL (CDN 또는 Pre-signed)"""
+        return self._object_url(f"videos/{project_id}/{video_id}/hls/{name}")
+
+    @instrumented("storage", "delete_project_files")
+    async def delete_project_files(self, project_id: str):
+        """프로젝트 관련 S3 객체 삭제 (사진/영상/HLS/미리보기)"""
+        for prefix in ("photos", "videos", "previews"):
+            keys = [
+                obj["Key"]
+                for page in self.s3.get_paginator("list_objects_v2").paginate(
+                    Bucket=self.bucket, Prefix=f"{prefix}/{project_id}/"
+                )
+                for obj in page.get("Contents", [])
+            ]
+            # delete_objects는 요청당 최대 1000개
+            for i in range(0, len(keys), 1000):
+                self.s3.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True},
+                )
+
+    def list_files(self):
+        """저장된 객체 순회 (수명 주기 스윕용, 동기 제너레이터 - 스레드에서 소비)"""
+        for page in self.s3.get_paginator("list_objects_v2").paginate(Bucket=self.bucket):
+            for obj in page.get("Contents", []):
+                parts = obj["Key"].split("/")
+                if len(parts) < 3 or parts[0] not in ("photos", "videos", "previews"):
+                    continue
+                if parts[0] == "photos":
+                    kind = "photo"
+                elif parts[0] == "previews":
+                    kind = "preview"
+                else:
+                    # videos/{project_id}/{video_id}.mp4 또는 videos/{project_id}/{video_id}/hls/{name}
+                    kind = "hls" if len(parts) > 3 else _video_kind(parts[2])
+                yield _stored_file(obj["Key"], parts[1], kind, obj["Size"], obj["LastModified"].timestamp())
+
+    def delete_file(self, key: str):
+        """list_files 항목 삭제"""
+        self.s3.delete_object(Bucket=self.bucket, Key=key)
 
     def get_photo_url(self, project_id: str, photo_id: str) -> str:
         """S3 사진 Pre-signed URL"""
@@ -164,4 +418,4 @@ def get_storage_service():
     return LocalStorageService()
 
 
-storage_service = get_storage_service()
+storage_service = LazyService(get_storage_service)
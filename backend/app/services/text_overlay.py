@@ -0,0 +1,327 @@
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 한글 글리프가 있는 글꼴 (overlay_font_path가 없을 때 순서대로 탐색)
+FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Bold.ttc",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "C:/Windows/Fonts/malgunbd.ttf",
+)
+# 프로젝트 스타일별 글자색 / 그림자색 / 타이틀 배경(scrim)색, 타이틀 세로 위치 (화면 높이 비율)
+OVERLAY_STYLES = {
+    "romantic": {"color": (255, 241, 246), "shadow": (70, 20, 45), "scrim": (45, 12, 30), "title_y": 0.42},
+    "nostalgic": {"color": (250, 236, 210), "shadow": (45, 30, 15), "scrim": (35, 24, 12), "title_y": 0.45},
+    "happy": {"color": (255, 255, 255), "shadow": (20, 30, 60), "scrim": (20, 30, 60), "title_y": 0.38},
+    "emotional": {"color": (245, 245, 245), "shadow": (0, 0, 0), "scrim": (0, 0, 0), "title_y": 0.45},
+    "cinematic": {"color": (235, 235, 230), "shadow": (0, 0, 0), "scrim": (0, 0, 0), "title_y": 0.5},
+}
+DEFAULT_STYLE = "emotional"
+CAPTION_FONT_SCALE = 0.034  # 화면 높이 대비 글자 크기
+TITLE_FONT_SCALE = 0.058
+SUBTITLE_FONT_SCALE = 0.03
+CAPTION_Y = 0.83  # 자막 블록 중심
+TEXT_WIDTH = 0.86  # 줄 바꿈 기준 너비 (화면 너비 비율)
+MAX_CAPTION_LINES = 3
+FADE_SECONDS = 0.3
+
+
+def font_path() -> Optional[str]:
+    """오버레이 글꼴 경로 (없으면 None - plan()이 오버레이를 건너뜀)"""
+    if settings.overlay_font_path:
+        return settings.overlay_font_path
+    return next((path for path in FONT_CANDIDATES if Path(path).is_file()), None)
+
+
+class GlyphAtlas:
+    """글꼴/크기별 글리프 비트맵 캐시 - 글자마다 한 번만 래스터화하고 줄은 비트맵을 이어 붙여 구성
+
+    한글은 완성형 음절이라 글자 단위 배치로 충분 (커닝은 적용하지 않음).
+    """
+
+    def __init__(self, path: Optional[str], size: int):
+        self.font = ImageFont.truetype(path, size) if path else ImageFont.load_default(size)
+        ascent, descent = self.font.getmetrics()
+        self.line_height = ascent + descent
+        self.glyphs: dict[str, tuple[np.ndarray, int, int, float]] = {}
+
+    def glyph(self, char: str) -> tuple[np.ndarray, int, int, float]:
+        """(alpha 비트맵, 왼쪽 오프셋, 위쪽 오프셋, advance)"""
+        cached = self.glyphs.get(char)
+        if cached is None:
+            left, top, right, bottom = self.font.getbbox(char)
+            image = Image.new("L", (max(right - left, 1), max(bottom - top, 1)))
+            ImageDraw.Draw(image).text((-left, -top), char, font=self.font, fill=255)
+            cached = self.glyphs[char] = (np.asarray(image), left, top, self.font.getlength(char))
+        return cached
+
+    def width(self, text: str) -> float:
+        return sum(self.glyph(char)[3] for char in text)
+
+    def wrap(self, text: str, max_width: float) -> list[str]:
+        """단어 단위 줄 바꿈 (한 단어가 너무 길면 글자 단위)"""
+        lines: list[str] = []
+        current = ""
+        for word in text.split():
+            candidate = f"{current} {word}" if current else word
+            if self.width(candidate) <= max_width:
+                current = candidate
+                continue
+            if current:
+                lines.append(current)
+            current = ""
+            for char in word:
+                if current and self.width(current + char) > max_width:
+                    lines.append(current)
+                    current = ""
+                current += char
+        if current:
+            lines.append(current)
+        return lines
+
+    def line(self, text: str) -> np.ndarray:
+        """한 줄 alpha 마스크 (line_height, 너비) uint8"""
+        mask = np.zeros((self.line_height, int(np.ceil(self.width(text))) + 2), dtype=np.uint8)
+        x = 0.0
+        for char in text:
+            bitmap, left, top, advance = self.glyph(char)
+            y0, x0 = max(top, 0), max(int(round(x)) + left, 0)
+            h = min(bitmap.shape[0], mask.shape[0] - y0)
+            w = min(bitmap.shape[1], mask.shape[1] - x0)
+            if h > 0 and w > 0:
+                target = mask[y0:y0 + h, x0:x0 + w]
+                np.maximum(target, bitmap[:h, :w], out=target)
+            x += advance
+        return mask
+
+
+@lru_cache(maxsize=8)
+def get_atlas(path: Optional[str], size: int) -> GlyphAtlas:
+    """글꼴/크기별 아틀라스 (프로세스 내 캐시)"""
+    return GlyphAtlas(path, size)
+
+
+@lru_cache(maxsize=256)
+def _line_mask(path: Optional[str], size: int, text: str) -> np.ndarray:
+    """렌더링된 줄 캐시 - 같은 문구(타이틀, 반복 자막)는 다시 조합하지 않음"""
+    return get_atlas(path, size).line(text)
+
+
+class Layer:
+    """프레임에 합성할 오버레이 - (y, x) 위치의 premultiplied RGB와 alpha (0-256 정수)
+
+    완전히 투명한 위아래 행은 잘라내 합성 영역을 최소화.
+    """
+
+    __slots__ = ("y", "x", "alpha", "color", "_scaled")
+
+    def __init__(self, y: int, x: int, alpha: np.ndarray, rgb: np.ndarray):
+        weights = np.round(alpha * 256).astype(np.uint16)
+        rows = np.flatnonzero(weights.any(axis=1))
+        top, bottom = (rows[0], rows[-1] + 1) if len(rows) else (0, 1)
+        self.y, self.x = y + top, x
+        self.alpha = weights[top:bottom, :, None]
+        self.color = np.round(rgb[top:bottom] * alpha[top:bottom, :, None] * (255 * 256)).astype(np.uint16)
+        self._scaled: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+    def scaled(self, opacity: float) -> tuple[np.ndarray, np.ndarray]:
+        """페이드용 불투명도 적용 (페이드 단계 수만큼만 계산해 재사용)"""
+        weight = int(opacity * 256)
+        if weight >= 256:
+            return self.alpha, self.color
+        cached = self._scaled.get(weight)
+        if cached is None:
+            cached = self._scaled[weight] = (
+                (self.alpha * weight) >> 8,
+                (self.color.astype(np.uint32) * weight >> 8).astype(np.uint16),
+            )
+        return cached
+
+
+def blend(frame: np.ndarray, layer: Layer, opacity: float = 1.0) -> np.ndarray:
+    """uint8 RGB 프레임에 레이어 합성 - 영역 전체를 정수 연산 한 번으로 처리 (frame을 직접 수정)
+
+    out = (frame * (256 - a) + premultiplied) >> 8, 가중치 합이 256이라 uint16 안에서 계산.
+    """
+    alpha, color = layer.scaled(opacity)
+    h, w = alpha.shape[:2]
+    region = frame[layer.y:layer.y + h, layer.x:layer.x + w]
+    region[...] = (region * (256 - alpha) + color) >> 8
+    return frame
+
+
+def _text_block(lines: list[str], path: Optional[str], size: int, width: int) -> np.ndarray:
+    """여러 줄을 가운데 정렬한 (높이, width) alpha 마스크 0-1"""
+    atlas = get_atlas(path, size)
+    block = np.zeros((atlas.line_height * len(lines), width), dtype=np.float32)
+    for index, text in enumerate(lines):
+        mask = _line_mask(path, size, text)[:, :width]
+        x = (width - mask.shape[1]) // 2
+        y = index * atlas.line_height
+        block[y:y + mask.shape[0], x:x + mask.shape[1]] = mask / 255.0
+    return block
+
+
+def _shadow(mask: np.ndarray, offset: int) -> np.ndarray:
+    """오른쪽 아래로 밀고 3x3 박스 블러한 그림자 alpha"""
+    shifted = np.zeros_like(mask)
+    shifted[offset:, offset:] = mask[:mask.shape[0] - offset, :mask.shape[1] - offset]
+    padded = np.pad(shifted, 1, mode="edge")
+    h, w = mask.shape
+    return sum(padded[dy:dy + h, dx:dx + w] for dy in range(3) for dx in range(3)) / 9.0
+
+
+def _over(top_alpha, top_rgb, bottom_alpha, bottom_rgb) -> tuple[np.ndarray, np.ndarray]:
+    """alpha 합성 (top over bottom) -> (alpha, straight RGB 0-1)"""
+    alpha = top_alpha + bottom_alpha * (1 - top_alpha)
+    rgb = top_rgb * top_alpha[..., None] + bottom_rgb * (bottom_alpha * (1 - top_alpha))[..., None]
+    return alpha, rgb / np.maximum(alpha, 1e-6)[..., None]
+
+
+def _styled(mask: np.ndarray, style: dict, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """텍스트 마스크 -> 글자색 + 그림자 합성 (alpha, RGB)"""
+    shadow = _shadow(mask, max(size // 18, 1)) * 0.75
+    color = np.broadcast_to(np.array(style["color"], dtype=np.float32) / 255, (*mask.shape, 3))
+    shadow_color = np.broadcast_to(np.array(style["shadow"], dtype=np.float32) / 255, (*mask.shape, 3))
+    return _over(mask, color, shadow, shadow_color)
+
+
+def _style(name: Optional[str]) -> dict:
+    return OVERLAY_STYLES.get((name or "").lower(), OVERLAY_STYLES[DEFAULT_STYLE])
+
+
+@lru_cache(maxsize=64)
+def caption_layer(text: str, style: Optional[str], width: int, height: int) -> Optional[Layer]:
+    """씬 자막 레이어 (화면 아래쪽, 최대 MAX_CAPTION_LINES줄)"""
+    path = font_path()
+    size = max(int(height * CAPTION_FONT_SCALE), 10)
+    lines = get_atlas(path, size).wrap(text, width * TEXT_WIDTH)[:MAX_CAPTION_LINES]
+    if not lines:
+        return None
+    pad = size // 4
+    mask = np.pad(_text_block(lines, path, size, width), ((pad, pad), (0, 0)))
+    alpha, rgb = _styled(mask, _style(style), size)
+    y = min(max(int(height * CAPTION_Y - mask.shape[0] / 2), 0), height - mask.shape[0])
+    return Layer(y, 0, alpha, rgb)
+
+
+@lru_cache(maxsize=8)
+def _scrim(style: Optional[str], width: int, height: int) -> tuple[np.ndarray, np.ndarray]:
+    """타이틀 카드 배경 - 타이틀 위치에서 가장 진한 세로 그라디언트 (스타일/크기별로 한 번만 생성)"""
+    config = _style(style)
+    y = np.arange(height, dtype=np.float32) / height
+    profile = 0.55 * np.exp(-((y - config["title_y"]) / 0.12) ** 2)
+    alpha = np.repeat(profile[:, None], width, axis=1)
+    rgb = np.broadcast_to(np.array(config["scrim"], dtype=np.float32) / 255, (height, width, 3))
+    return alpha, rgb
+
+
+@lru_cache(maxsize=32)
+def title_card(title: str, subtitle: str, style: Optional[str], width: int, height: int) -> Layer:
+    """타이틀 카드 레이어 (전체 화면) - 같은 스타일/문구면 프로젝트가 달라도 캐시 재사용"""
+    path = font_path()
+    config = _style(style)
+    scrim_alpha, scrim_rgb = _scrim(style, width, height)
+    alpha, rgb = scrim_alpha.copy(), np.array(scrim_rgb)
+
+    blocks = []
+    title_size = max(int(height * TITLE_FONT_SCALE), 12)
+    title_lines = get_atlas(path, title_size).wrap(title, width * TEXT_WIDTH)[:2]
+    if title_lines:
+        blocks.append((_text_block(title_lines, path, title_size, width), title_size))
+    subtitle_size = max(int(height * SUBTITLE_FONT_SCALE), 10)
+    subtitle_lines = get_atlas(path, subtitle_size).wrap(subtitle, width * TEXT_WIDTH)[:2]
+    if subtitle_lines:
+        blocks.append((_text_block(subtitle_lines, path, subtitle_size, width), subtitle_size))
+
+    gap = subtitle_size // 2
+    total = sum(block.shape[0] for block, _ in blocks) + gap * (len(blocks) - 1)
+    y = min(max(int(height * config["title_y"] - total / 2), 0), max(height - total, 0))
+    for block, size in blocks:
+        h = min(block.shape[0], height - y)
+        if h <= 0:
+            break
+        text_alpha, text_rgb = _styled(block[:h], config, size)
+        alpha[y:y + h], rgb[y:y + h] = _over(text_alpha, text_rgb, alpha[y:y + h], rgb[y:y + h])
+        y += h + gap
+    return Layer(0, 0, alpha, rgb)
+
+
+def plan(script: dict, style: Optional[str] = None) -> Optional[dict]:
+    """스크립트 -> 조립 단계 오버레이 (assembly_service에 그대로 전달, 렌더링할 문구가 없으면 None)
+
+    Returns:
+        title, subtitle, style, captions ({scene_id: 자막})
+    """
+    if not settings.overlay_enabled:
+        return None
+    captions = {
+        scene.get("scene_id"): scene["text_overlay"].strip()
+        for scene in script.get("scenes") or []
+        if isinstance(scene.get("text_overlay"), str) and scene["text_overlay"].strip()
+    }
+    title = (script.get("title") or "").strip() if settings.overlay_title_seconds > 0 else ""
+    if not captions and not title:
+        return None
+    if font_path() is None:
+        # Pillow 기본 글꼴에는 한글 글리프가 없어 두부(□)로 합성됨 - 글자 없이 조립
+        logger.warning("No Hangul font found (set OVERLAY_FONT_PATH); skipping title/captions")
+        return None
+    return {
+        "title": title,
+        "subtitle": (script.get("subtitle") or "").strip() if title else "",
+        "style": style,
+        "captions": captions,
+    }
+
+
+class OverlayTrack:
+    """조립 타임라인의 오버레이 - 처음 title_seconds는 타이틀 카드, 이후 씬 자막 (프레임마다 레이어 하나)
+
+    레이어는 캐시된 함수로 만들어 같은 워커 프로세스의 다음 조립에서도 재사용.
+    """
+
+    def __init__(self, overlays: dict, size: tuple[int, int], fps: int):
+        width, height = size
+        style = overlays.get("style")
+        self.title = (
+            title_card(overlays["title"], overlays.get("subtitle", ""), style, width, height)
+            if overlays.get("title") else None
+        )
+        self.title_frames = int(round(settings.overlay_title_seconds * fps)) if self.title else 0
+        self.captions = [
+            caption_layer(text, style, width, height) if text else None for text in overlays["captions"]
+        ]
+        self.fade = max(int(round(FADE_SECONDS * fps)), 1)
+
+    def _opacity(self, index: int, start: int, end: Optional[int]) -> float:
+        """[start, end) 구간의 페이드 인/아웃 (end를 아직 모르면 페이드 아웃 없음)"""
+        opacity = (index - start + 1) / self.fade
+        if end is not None:
+            opacity = min(opacity, (end - index) / self.fade)
+        return min(opacity, 1.0)
+
+    def apply(self, frame: np.ndarray, index: int, clip: int, local: int, length: Optional[int]) -> np.ndarray:
+        """출력 프레임 index (clip 안에서 local번째, 클립 출력 길이 length)에 오버레이 합성"""
+        if index < self.title_frames:
+            layer, opacity = self.title, self._opacity(index, 0, self.title_frames)
+        else:
+            layer = self.captions[clip] if clip < len(self.captions) else None
+            # 첫 씬 자막은 타이틀 카드가 끝난 뒤부터
+            start = max(self.title_frames - (index - local), 0)
+            opacity = self._opacity(local, start, length)
+        if layer is None or opacity <= 0:
+            return frame
+        return blend(frame.copy(), layer, opacity)
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import shutil
+import struct
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from ..config import get_settings
+from .http_clients import get_http_client
+from .metrics_service import instrumented
+from .storage_service import CLIP_PREFIX, storage_service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# stco/co64 오프셋을 담고 있는 컨테이너 박스
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+STREAM_CHUNK_SIZE = 64 * 1024
+VIDEO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HLS_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+
+def _iter_boxes(data: bytes, start: int, end: int):
+    """MP4 박스 순회 (type, offset, size, header_size)"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            raise ValueError(f"Invalid MP4 box at {offset}")
+        yield box_type, offset, size, header
+        offset += size
+
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, shift: int):
+    """moov 내부 stco/co64 청크 오프셋을 shift만큼 이동"""
+    for box_type, offset, size, header in _iter_boxes(moov, start, end):
+        body = offset + header
+        if box_type in CONTAINER_BOXES:
+            _shift_chunk_offsets(moov, body, offset + size, shift)
+        elif box_type == b"stco":
+            count = struct.unpack(">I", moov[body + 4:body + 8])[0]
+            for i in range(count):
+                pos = body + 8 + i * 4
+                value = struct.unpack(">I", moov[pos:pos + 4])[0] + shift
+                if value > 0xFFFFFFFF:
+                    raise ValueError("stco offset overflow")
+                moov[pos:pos + 4] = struct.pack(">I", value)
+        elif box_type == b"co64":
+            count = struct.unpack(">I", moov[body + 4:body + 8])[0]
+            for i in range(count):
+                pos = body + 8 + i * 8
+                value = struct.unpack(">Q", moov[pos:pos + 8])[0] + shift
+                moov[pos:pos + 8] = struct.pack(">Q", value)
+        elif box_type == b"cmov":
+            raise ValueError("Compressed moov is not supported")
+
+
+def faststart(data: bytes) -> bytes:
+    """moov 박스를 mdat 앞으로 이동 (qt-faststart와 동일)
+
+    이미 faststart 레이아웃이거나 지원하지 않는 구조면 원본 그대로 반환.
+    """
+    try:
+        boxes = list(_iter_boxes(data, 0, len(data)))
+    except ValueError:
+        return data
+
+    moov = next((b for b in boxes if b[0] == b"moov"), None)
+    mdats = [b for b in boxes if b[0] == b"mdat"]
+    if moov is None or not mdats:
+        return data
+    if moov[1] < mdats[0][1] or any(b[1] > moov[1] for b in mdats):
+        # 이미 moov가 앞에 있거나, moov 뒤에 mdat가 있는 경우
+        return data
+
+    _, moov_offset, moov_size, _ = moov
+    moov_box = bytearray(data[moov_offset:moov_offset + moov_size])
+    try:
+        _shift_chunk_offsets(moov_box, 8, moov_size, moov_size)
+    except ValueError:
+        return data
+
+    first_mdat = mdats[0][1]
+    parts = [data[:first_mdat], bytes(moov_box)]
+    for box_type, offset, size, _ in boxes:
+        if offset >= first_mdat and box_type != b"moov":
+            parts.append(data[offset:offset + size])
+    return b"".join(parts)
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """단일 bytes Range 파싱 -> (start, end) 포함 범위
+
+    다중 범위 등 처리하지 않는 형식은 None (전체 응답).
+    만족할 수 없는 범위는 ValueError.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_str, end_str = (part.strip() for part in spec.partition("-")[::2])
+    if not (start_str or end_str) or not all(part.isdigit() for part in (start_str, end_str) if part):
+        return None
+    if size == 0:
+        raise ValueError("Unsatisfiable range")
+
+    if not start_str:
+        # suffix range: 마지막 N 바이트
+        length = int(end_str)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+async def _read_file_range(path: Path, start: int, end: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def range_file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    etag: str,
+    cache_control: str = VIDEO_CACHE_CONTROL,
+) -> Response:
+    """Range / If-Range / If-None-Match를 지원하는 파일 응답"""
+    size = path.stat().st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": cache_control,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            )
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        _read_file_range(path, start, end) if size else iter([b""]),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+class VideoDeliveryService:
+    """최종 숏츠 전송 준비
+
+    - 렌더링 결과를 내려받아 faststart 레이아웃으로 저장
+    - 선택적으로 ffmpeg로 HLS 패키징 (첫 세그먼트를 짧게 하여 빠른 재생 시작)
+    - 저장 후에는 /api/v1/storage/videos/... 경로로 제공 (S3는 CDN/Pre-signed로 리다이렉트)
+    """
+
+    def __init__(self):
+        self.ffmpeg_path = settings.ffmpeg_path
+
+    def get_delivery_url(self, project_id: str, video_id: str) -> str:
+        return f"/api/v1/storage/videos/{project_id}/{video_id}"
+
+    def get_hls_url(self, project_id: str, video_id: str) -> str:
+        return f"/api/v1/storage/videos/{project_id}/{video_id}/hls/index.m3u8"
+
+    @instrumented("video", "download")
+    async def ingest_final_video(self, project_id: str, source_url: str) -> dict:
+        """원격 영상 다운로드 -> faststart -> 저장 (-> HLS)
+
+        Returns:
+            video_id, video_url, hls_url
+        """
+        client = get_http_client("download")
+        response = await client.get(source_url)
+        if response.status_code != 200:
+            raise Exception(f"Video download error: {response.status_code}")
+        video_data = response.content
+
+        return await self.store_video(project_id, video_data)
+
+    async def store_video(self, project_id: str, video_data: bytes, clip: bool = False) -> dict:
+        """영상 바이트를 faststart로 저장하고 전송 URL 반환
+
+        Args:
+            clip: 조립 전 씬 클립 - 파생 파일로 저장 (할당량 초과 시 정리 대상, HLS 없음)
+        """
+        video_data = await asyncio.to_thread(faststart, video_data)
+        video_id = await storage_service.save_video(
+            project_id, video_data, f"{CLIP_PREFIX}{uuid.uuid4()}" if clip else None
+        )
+
+        hls_url = None
+        if settings.video_hls_enabled and not clip:
+            try:
+                await self.package_hls(project_id, video_id, video_data)
+                hls_url = self.get_hls_url(project_id, video_id)
+            except Exception as e:
+                logger.warning("HLS packaging failed for %s: %s", project_id, e)
+
+        return {
+            "video_id": video_id,
+            "video_url": self.get_delivery_url(project_id, video_id),
+            "hls_url": hls_url,
+        }
+
+    @instrumented("ffmpeg", "package_hls")
+    async def package_hls(self, project_id: str, video_id: str, video_data: bytes):
+        """ffmpeg로 HLS(VOD) 패키징 후 저장소에 업로드"""
+        if not shutil.which(self.ffmpeg_path):
+            raise Exception("ffmpeg not found")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_dir = Path(tmp)
+            source = tmp_dir / "source.mp4"
+            source.write_bytes(video_data)
+
+            process = await asyncio.create_subprocess_exec(
+                self.ffmpeg_path, "-y", "-loglevel", "error",
+                "-i", str(source),
+                "-c", "copy",
+                "-f", "hls",
+                "-hls_time", "4",
+                "-hls_init_time", "1",  # 첫 세그먼트를 짧게 -> 1초 내 재생 시작
+                "-hls_playlist_type", "vod",
+                "-hls_segment_filename", str(tmp_dir / "segment_%03d.ts"),
+                str(tmp_dir / "index.m3u8"),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise Exception(f"ffmpeg error: {stderr.decode(errors='ignore')}")
+
+            for file_path in sorted(tmp_dir.iterdir()):
+                content_type = HLS_CONTENT_TYPES.get(file_path.suffix)
+                if content_type:
+                    await storage_service.save_video_asset(
+                        project_id, video_id, file_path.name, file_path.read_bytes(), content_type
+                    )
+
+
+video_delivery_service = VideoDeliveryService()
@@ -0,0 +1,113 @@
+"""컬러 그레이딩(3D LUT) 처리량 벤치마크 - 코어당 초당 프레임 수
+
+조립 단계와 같은 방식(프레임 단위 apply_lut)으로 합성 프레임을 그레이딩해
+1개 프로세스와 N개 프로세스에서의 fps를 측정하고, 코어당 fps와 실시간 배수를 보고.
+
+    cd backend
+    python -m benchmarks.color_grading --frames 60 --workers 1,4
+    python -m benchmarks.color_grading --gradings warm_vintage --lut-size 17,33,65
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import get_settings  # noqa: E402
+from app.services import color_grading  # noqa: E402
+
+settings = get_settings()
+
+
+def synthetic_frames(count: int, width: int, height: int, seed: int = 0) -> np.ndarray:
+    """사진과 비슷한 프레임 (부드러운 그라디언트 + 노이즈, 프레임마다 조금씩 이동)"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frames = np.empty((count, height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        shift = i * 2.0
+        base = np.stack([
+            128 + 100 * np.sin((x + shift) / 97),
+            128 + 90 * np.cos((y - shift) / 131),
+            128 + 80 * np.sin((x + y) / 173),
+        ], axis=-1)
+        base += rng.normal(0, 12, base.shape)
+        frames[i] = np.clip(base, 0, 255)
+    return frames
+
+
+def grade(args: tuple[str, int, int, int, int]) -> tuple[int, float]:
+    """워커: 프레임 생성 후 그레이딩 시간만 측정 -> (프레임 수, 초)"""
+    name, lut_size, frames, width, height = args
+    settings.color_lut_size = lut_size
+    color_grading.get_lut.cache_clear()
+    lut = color_grading.get_lut(name)
+    batch = synthetic_frames(frames, width, height, seed=os.getpid())
+    color_grading.apply_lut(batch[0], lut)  # 워밍업
+
+    start = time.perf_counter()
+    for frame in batch:
+        color_grading.apply_lut(frame, lut)
+    return len(batch), time.perf_counter() - start
+
+
+def measure(name: str, lut_size: int, workers: int, frames: int, width: int, height: int) -> dict:
+    jobs = [(name, lut_size, frames, width, height)] * workers
+    if workers == 1:
+        results = [grade(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(grade, jobs))
+    # 워커마다 측정 구간이 겹치므로 전체 처리량은 워커별 fps의 합
+    per_worker = [count / seconds for count, seconds in results]
+    total = sum(per_worker)
+    return {
+        "grading": name,
+        "lut_size": lut_size,
+        "workers": workers,
+        "fps_total": round(total, 1),
+        "fps_per_core": round(total / workers, 1),
+        "ms_per_frame": round(1000 * workers / total, 1),
+        "realtime_x": round(total / settings.assembly_fps, 2),
+    }
+
+
+def main():
+    builtin = [name for name in color_grading.GRADINGS if name != "natural"]
+    parser = argparse.ArgumentParser(description="Color grading fps-per-core benchmark")
+    parser.add_argument("--gradings", default=",".join(builtin))
+    parser.add_argument("--lut-size", default=str(settings.color_lut_size), help="쉼표 구분 (예: 17,33)")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="쉼표 구분 프로세스 수")
+    parser.add_argument("--frames", type=int, default=48, help="워커당 프레임 수")
+    parser.add_argument("--width", type=int, default=settings.assembly_width)
+    parser.add_argument("--height", type=int, default=settings.assembly_height)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{args.width}x{args.height}, {args.frames} frames/worker, cpu_count={os.cpu_count()}")
+    print(f"{'grading':16} {'lut':>4} {'workers':>7} {'fps':>8} {'fps/core':>9} {'ms/frame':>9} {'realtime':>9}")
+    for name in args.gradings.split(","):
+        for lut_size in (int(v) for v in args.lut_size.split(",")):
+            for workers in sorted({int(v) for v in args.workers.split(",")}):
+                row = measure(name, lut_size, workers, args.frames, args.width, args.height)
+                rows.append(row)
+                print(
+                    f"{name:16} {lut_size:>4} {workers:>7} {row['fps_total']:>8} {row['fps_per_core']:>9} "
+                    f"{row['ms_per_frame']:>9} {row['realtime_x']:>8}x"
+                )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"width": args.width, "height": args.height, "results": rows}, indent=2))
+        print(f"\nSaved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""앱 import 시간 / 콜드 스타트 측정 (예산 초과 시 종료 코드 1)
+
+`python -X importtime`으로 `app.main` import를 여러 번 측정해 중앙값을 예산과 비교하고,
+가장 느린 모듈과 import 시점에 로드되면 안 되는 모듈(boto3 등)을 보고.
+
+    cd backend
+    python -m benchmarks.import_time --budget-ms 800
+    python -m benchmarks.import_time --startup   # uvicorn 실행 ~ /health 응답까지
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+# 첫 사용 시 로드되어야 하는 모듈
+DEFAULT_FORBIDDEN = ["boto3", "botocore"]
+
+
+def measure_import(module: str) -> tuple[float, dict[str, int], list[str]]:
+    """(총 import 시간 ms, 모듈별 누적 시간 us, 로드된 금지 후보 모듈)"""
+    probe = f"import sys, json; import {module}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return cumulative.get(module, 0) / 1000, cumulative, loaded
+
+
+def measure_startup(timeout: float = 60.0) -> float:
+    """uvicorn 프로세스 시작 ~ /health 200 응답까지 (ms)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=os.environ.copy(),
+    )
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return (time.perf_counter() - start) * 1000
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError("App did not become healthy in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="중앙값이 이보다 크면 실패")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN, help="import 시 로드되면 실패할 모듈")
+    parser.add_argument("--startup", action="store_true", help="uvicorn 콜드 스타트도 측정")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total_ms, cumulative, loaded = measure_import(args.module)
+        totals.append(total_ms)
+    median_ms = statistics.median(totals)
+
+    print(f"{args.module} import: median {median_ms:.0f}ms (min {min(totals):.0f}, max {max(totals):.0f}, runs {args.runs})")
+    print("\nSlowest modules (cumulative, last run):")
+    # 하위 모듈은 상위 패키지 누적 시간에 포함되므로 최상위 패키지와 앱 모듈만 표시
+    rows = [(name, us) for name, us in cumulative.items() if "." not in name or name.startswith("app.")]
+    for name, us in sorted(rows, key=lambda row: -row[1])[: args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    failed = False
+    forbidden = [name for name in args.forbid if name in loaded]
+    if forbidden:
+        print(f"\nFAIL: loaded at import time: {', '.join(forbidden)}")
+        failed = True
+
+    if args.startup:
+        print(f"\nCold start to /health: {measure_startup():.0f}ms")
+
+    if args.budget_ms is not None:
+        if median_ms > args.budget_ms:
+            print(f"\nFAIL: {median_ms:.0f}ms exceeds budget {args.budget_ms:.0f}ms")
+            failed = True
+        else:
+            print(f"\nOK: within budget {args.budget_ms:.0f}ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
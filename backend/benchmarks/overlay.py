@@ -0,0 +1,109 @@
+"""자막/타이틀 오버레이 벤치마크 - 프레임마다 Pillow로 그리기 vs 글리프 아틀라스 레이어 합성
+
+같은 자막을 매 프레임 ImageDraw로 래스터화하는 방식과, 캐시된 레이어를 정수 알파 블렌딩하는
+조립 단계 방식의 프레임당 시간을 비교. 한글 글꼴은 OVERLAY_FONT_PATH 또는 --font로 지정.
+
+    cd backend
+    python -m benchmarks.overlay --frames 100
+    python -m benchmarks.overlay --font /usr/share/fonts/truetype/nanum/NanumGothicBold.ttf
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import get_settings  # noqa: E402
+from app.services import text_overlay  # noqa: E402
+from benchmarks.color_grading import synthetic_frames  # noqa: E402
+
+settings = get_settings()
+
+CAPTION = "처음 너를 만난 그 카페, 비 오던 여름날의 오후"
+TITLE = ("우리의 여름", "두 사람의 이야기")
+
+
+def pillow_caption(frame: np.ndarray, font: ImageFont.ImageFont, lines: list[str], style: dict) -> np.ndarray:
+    """기준: 프레임마다 자막을 새로 래스터화 (그림자 포함)"""
+    image = Image.fromarray(frame)
+    draw = ImageDraw.Draw(image)
+    width, height = image.size
+    draw.multiline_text(
+        (width / 2, height * text_overlay.CAPTION_Y), "\n".join(lines), font=font, anchor="mm", align="center",
+        fill=style["color"], stroke_width=max(font.size // 18, 1), stroke_fill=style["shadow"],
+    )
+    return np.asarray(image)
+
+
+def timed(func, frames: np.ndarray) -> float:
+    """프레임당 ms"""
+    func(frames[0])  # 워밍업 (레이어/아틀라스 생성)
+    start = time.perf_counter()
+    for frame in frames:
+        func(frame)
+    return 1000 * (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caption/title overlay per-frame benchmark")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=settings.assembly_width)
+    parser.add_argument("--height", type=int, default=settings.assembly_height)
+    parser.add_argument("--style", default=text_overlay.DEFAULT_STYLE)
+    parser.add_argument("--font", help="글꼴 경로 (기본: OVERLAY_FONT_PATH / 시스템 글꼴)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.font:
+        settings.overlay_font_path = args.font
+    path = text_overlay.font_path()
+    width, height = args.width, args.height
+    frames = synthetic_frames(args.frames, width, height)
+    style = text_overlay.OVERLAY_STYLES[args.style]
+
+    size = max(int(height * text_overlay.CAPTION_FONT_SCALE), 10)
+    font = ImageFont.truetype(path, size) if path else ImageFont.load_default(size)
+    lines = text_overlay.get_atlas(path, size).wrap(CAPTION, width * text_overlay.TEXT_WIDTH)
+
+    start = time.perf_counter()
+    caption = text_overlay.caption_layer(CAPTION, args.style, width, height)
+    card = text_overlay.title_card(*TITLE, args.style, width, height)
+    build_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    text_overlay.title_card(*TITLE, args.style, width, height)
+    cached_ms = 1000 * (time.perf_counter() - start)
+
+    rows = {
+        "pillow_caption_ms": timed(lambda frame: pillow_caption(frame, font, lines, style), frames),
+        "atlas_caption_ms": timed(lambda frame: text_overlay.blend(frame.copy(), caption), frames),
+        "atlas_caption_fade_ms": timed(lambda frame: text_overlay.blend(frame.copy(), caption, 0.5), frames),
+        "atlas_title_ms": timed(lambda frame: text_overlay.blend(frame.copy(), card), frames),
+    }
+    result = {
+        "width": width,
+        "height": height,
+        "font": path or "pillow-default",
+        "layer_build_ms": round(build_ms, 1),
+        "title_card_cached_ms": round(cached_ms, 3),
+        **{name: round(value, 2) for name, value in rows.items()},
+        "caption_speedup_x": round(rows["pillow_caption_ms"] / rows["atlas_caption_ms"], 1),
+    }
+
+    print(f"{width}x{height}, {args.frames} frames, font={result['font']}")
+    for name, value in result.items():
+        if name not in ("width", "height", "font"):
+            print(f"{name:24} {value:>10}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"\nSaved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
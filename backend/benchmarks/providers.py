@@ -0,0 +1,250 @@
+"""외부 API 대역 서버 (Vision annotate / Groq chat completions / Replicate predictions)
+
+부하 테스트에서 실제 네트워크 대신 사용. 각 제공자별로 지연 분포와 오류율을 설정할 수 있음.
+
+    python -m benchmarks.providers --port 9100 \\
+        --vision-latency lognormal:0.4,0.3 --groq-latency uniform:0.5,1.5 \\
+        --replicate-latency const:2 --replicate-error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import struct
+import time
+import uuid
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+PROVIDERS = ("vision", "groq", "replicate")
+
+
+class LatencyDistribution:
+    """지연 분포 (초)
+
+    형식: const:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("const", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "const":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "normal":
+            return max(random.gauss(*self.params), 0.0)
+        median, sigma = self.params
+        return random.lognormvariate(0.0, sigma) * median
+
+
+class ProviderState:
+    def __init__(self, latency: str, error_rate: float):
+        self.latency = LatencyDistribution(latency)
+        self.error_rate = error_rate
+        self.served: list[float] = []
+        self.errors = 0
+
+    async def simulate(self) -> bool:
+        """지연 후 성공 여부 반환"""
+        delay = self.latency.sample()
+        await asyncio.sleep(delay)
+        self.served.append(delay)
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return False
+        return True
+
+
+def _fake_mp4() -> bytes:
+    """faststart 처리가 가능한 최소 MP4 (moov가 mdat 뒤)"""
+
+    def box(box_type: bytes, body: bytes) -> bytes:
+        return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+    ftyp = box(b"ftyp", b"isom\0\0\0\0isommp41")
+    mdat = box(b"mdat", bytes(4096))
+    stco = box(b"stco", b"\0\0\0\0" + struct.pack(">II", 1, len(ftyp) + 8))
+    stbl = box(b"stbl", stco)
+    moov = box(b"moov", box(b"trak", box(b"mdia", box(b"minf", stbl))))
+    return ftyp + mdat + moov
+
+
+def build_app(config: dict) -> Starlette:
+    states = {
+        name: ProviderState(config[name]["latency"], config[name]["error_rate"])
+        for name in PROVIDERS
+    }
+    scene_count = config.get("scenes", 4)
+    predictions: dict[str, dict] = {}
+    fake_video = _fake_mp4()
+
+    async def vision_annotate(request: Request):
+        body = await request.json()
+        if not await states["vision"].simulate():
+            return JSONResponse({"error": {"message": "stand-in failure"}}, status_code=503)
+        return JSONResponse({
+            "responses": [
+                {
+                    "labelAnnotations": [
+                        {"description": "Sky"}, {"description": "Smile"}, {"description": "Beach"},
+                    ],
+                    "faceAnnotations": [{"joyLikelihood": "VERY_LIKELY"}],
+                    "imagePropertiesAnnotation": {
+                        "dominantColors": {"colors": [{"color": {"red": 200, "green": 150, "blue": 100}}]}
+                    },
+                    "landmarkAnnotations": [],
+                    "localizedObjectAnnotations": [{"name": "Person"}],
+                }
+                for _ in body.get("requests", [])
+            ]
+        })
+
+    async def groq_chat(request: Request):
+        body = await request.json()
+        if not await states["groq"].simulate():
+            return JSONResponse({"error": {"message": "stand-in failure"}}, status_code=503)
+
+        prompt = body["messages"][-1]["content"]
+        # 스크립트 프롬프트만 출력 형식에 "scenes"를 포함
+        if '"scenes"' not in prompt:
+            content = {
+                "overall_theme": "바닷가 여행",
+                "suggested_narrative_arc": "출발 → 바다 → 귀가",
+                "emotional_journey": ["설렘", "기쁨", "여운"],
+            }
+        else:
+            # 분석 결과의 실제 photo_id를 씬에 배정 (image-to-video 경로 사용)
+            analysis_part = prompt.split("## 출력 형식")[0]
+            photo_ids = list(dict.fromkeys(re.findall(r'"photo_id": "([^"]+)"', analysis_part))) or ["photo_1"]
+            step = 60 // scene_count
+            content = {
+                "title": "벤치마크",
+                "subtitle": "합성 스크립트",
+                "total_duration": 60,
+                "scenes": [
+                    {
+                        "scene_id": i + 1,
+                        "start_time": i * step,
+                        "end_time": (i + 1) * step,
+                        "photo_id": photo_ids[i % len(photo_ids)],
+                        "transition": "fade_in",
+                        "camera_movement": "slow_zoom_in",
+                        "emotion": "happy",
+                        "text_overlay": f"장면 {i + 1}",
+                        "music_intensity": ("low", "medium", "high")[min(i * 3 // scene_count, 2)],
+                        "video_prompt": "Cinematic slow zoom, soft lighting",
+                    }
+                    for i in range(scene_count)
+                ],
+                "overall_mood": "따뜻한",
+                "color_grading": "warm_vintage",
+                "music_style": "happy",
+            }
+        return JSONResponse({
+            "choices": [{"message": {"role": "assistant", "content": json.dumps(content, ensure_ascii=False)}}]
+        })
+
+    async def replicate_create(request: Request):
+        await request.body()
+        prediction_id = uuid.uuid4().hex
+        output = f"{request.base_url}replicate/files/{prediction_id}.mp4"
+
+        if request.headers.get("prefer", "").startswith("wait"):
+            if not await states["replicate"].simulate():
+                return JSONResponse({"detail": "stand-in failure"}, status_code=503)
+            return JSONResponse({"id": prediction_id, "status": "succeeded", "output": output}, status_code=201)
+
+        # 비동기 방식: 조회 시점에 완료 여부 결정
+        delay = states["replicate"].latency.sample()
+        failed = random.random() < states["replicate"].error_rate
+        predictions[prediction_id] = {"ready_at": time.monotonic() + delay, "failed": failed, "output": output}
+        states["replicate"].served.append(delay)
+        if failed:
+            states["replicate"].errors += 1
+        return JSONResponse({"id": prediction_id, "status": "starting", "output": None}, status_code=201)
+
+    async def replicate_get(request: Request):
+        prediction = predictions.get(request.path_params["prediction_id"])
+        if prediction is None:
+            return JSONResponse({"detail": "Not found"}, status_code=404)
+        if time.monotonic() < prediction["ready_at"]:
+            return JSONResponse({"status": "processing"})
+        if prediction["failed"]:
+            return JSONResponse({"status": "failed", "error": "stand-in failure"})
+        return JSONResponse({"status": "succeeded", "output": prediction["output"]})
+
+    async def replicate_file(request: Request):
+        return Response(fake_video, media_type="video/mp4")
+
+    async def stats(request: Request):
+        return JSONResponse({
+            name: {"served": state.served, "errors": state.errors}
+            for name, state in states.items()
+        })
+
+    async def reset_stats(request: Request):
+        for state in states.values():
+            state.served.clear()
+            state.errors = 0
+        return JSONResponse({"ok": True})
+
+    return Starlette(routes=[
+        Route("/vision/v1/images:annotate", vision_annotate, methods=["POST"]),
+        Route("/groq/openai/v1/chat/completions", groq_chat, methods=["POST"]),
+        Route("/replicate/v1/models/{owner}/{name}/predictions", replicate_create, methods=["POST"]),
+        Route("/replicate/v1/predictions/{prediction_id}", replicate_get),
+        Route("/replicate/files/{name}", replicate_file),
+        Route("/_stats", stats),
+        Route("/_stats/reset", reset_stats, methods=["POST"]),
+    ])
+
+
+def add_provider_arguments(parser: argparse.ArgumentParser):
+    defaults = {"vision": "lognormal:0.4,0.3", "groq": "lognormal:1.0,0.3", "replicate": "lognormal:3.0,0.4"}
+    for name in PROVIDERS:
+        parser.add_argument(f"--{name}-latency", default=defaults[name])
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+    parser.add_argument("--scenes", type=int, default=4)
+
+
+def provider_config(args: argparse.Namespace) -> dict:
+    config = {
+        name: {
+            "latency": getattr(args, f"{name}_latency"),
+            "error_rate": getattr(args, f"{name}_error_rate"),
+        }
+        for name in PROVIDERS
+    }
+    config["scenes"] = args.scenes
+    # 잘못된 분포 형식은 서버 시작 전에 실패
+    for name in PROVIDERS:
+        LatencyDistribution(config[name]["latency"])
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provider stand-in servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--config", help="JSON provider config (overrides individual flags)")
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    config = json.loads(args.config) if args.config else provider_config(args)
+    uvicorn.run(build_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
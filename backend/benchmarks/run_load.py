@@ -0,0 +1,447 @@
+"""엔드투엔드 부하/지연 벤치마크
+
+로컬 대역 서버(benchmarks.providers)를 띄우고, 실제 FastAPI 앱을 uvicorn으로 실행해
+create → upload → narrative → analyze → generate → (status 폴링) 흐름을 동시성별로 측정.
+
+    cd backend
+    python -m benchmarks.run_load --concurrency 1,4,16 --projects 32
+    python -m benchmarks.run_load compare benchmarks/results/a.json benchmarks/results/b.json
+
+결과: 처리량, 엔드포인트/단계별 p50/p95/p99, 앱 프로세스 최대 메모리 (JSON 저장).
+단계/외부 호출 지연은 대역 서버가 주입한 지연이 아니라 앱의 /metrics 히스토그램
+(pipeline_stage_duration_seconds, external_call_duration_seconds)을 레벨 전후로 수집한 차이에서 계산.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from .providers import PROVIDERS, add_provider_arguments, provider_config
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(q / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+_SAMPLE = re.compile(r'^(\w+?)(_bucket|_sum|_count)\{(.*)\} (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_histograms(text: str, names: tuple[str, ...]) -> dict:
+    """Prometheus 텍스트 -> {(메트릭, 라벨...): {"buckets": {le: 누적 수}, "sum", "count"}}"""
+    series: dict[tuple, dict] = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match or match.group(1) not in names:
+            continue
+        name, kind, raw_labels, value = match.groups()
+        labels = dict(_LABEL.findall(raw_labels))
+        le = labels.pop("le", None)
+        entry = series.setdefault((name, *labels.values()), {"buckets": {}, "sum": 0.0, "count": 0.0})
+        if kind == "_bucket":
+            entry["buckets"][float(le)] = float(value)
+        else:
+            entry[kind[1:]] = float(value)
+    return series
+
+
+def histogram_delta(after: dict, before: dict) -> dict:
+    """누적 히스토그램 두 시점의 차이 (이번 레벨에서 관측된 값만)"""
+    delta = {}
+    for key, entry in after.items():
+        old = before.get(key, {"buckets": {}, "sum": 0.0, "count": 0.0})
+        count = entry["count"] - old["count"]
+        if count > 0:
+            delta[key] = {
+                "buckets": {le: n - old["buckets"].get(le, 0.0) for le, n in entry["buckets"].items()},
+                "sum": entry["sum"] - old["sum"],
+                "count": count,
+            }
+    return delta
+
+
+def histogram_quantile(buckets: dict[float, float], q: float) -> float:
+    """버킷 안 선형 보간 백분위수 (Prometheus histogram_quantile과 같은 방식)"""
+    bounds = sorted(buckets)
+    if not bounds or not buckets[bounds[-1]]:
+        return 0.0
+    rank = q / 100 * buckets[bounds[-1]]
+    lower, below = 0.0, 0.0
+    for bound in bounds:
+        if buckets[bound] >= rank:
+            if bound == float("inf"):
+                return lower
+            inside = buckets[bound] - below
+            return lower + (bound - lower) * ((rank - below) / inside if inside else 1.0)
+        lower, below = bound, buckets[bound]
+    return lower
+
+
+def summarize_histograms(entries: list[dict], failures: float = 0.0) -> dict:
+    """같은 단계의 여러 시계열(outcome별)을 합쳐 summarize()와 같은 형태로"""
+    buckets: dict[float, float] = {}
+    for entry in entries:
+        for le, n in entry["buckets"].items():
+            buckets[le] = buckets.get(le, 0.0) + n
+    count = sum(entry["count"] for entry in entries)
+    return {
+        "count": int(count),
+        "mean": sum(entry["sum"] for entry in entries) / count if count else 0.0,
+        "p50": histogram_quantile(buckets, 50),
+        "p95": histogram_quantile(buckets, 95),
+        "p99": histogram_quantile(buckets, 99),
+        "errors": int(failures),
+    }
+
+
+def latency_sections(delta: dict) -> dict:
+    """히스토그램 차이 -> {"stages": 파이프라인 단계별, "external": 제공자.작업별}"""
+    grouped: dict[tuple[str, str], list[dict]] = {}
+    failures: dict[tuple[str, str], float] = {}
+    for key, entry in delta.items():
+        if key[0] == "pipeline_stage_duration_seconds":
+            _, stage, outcome = key
+            group = ("stages", stage)
+        else:
+            _, provider, operation, outcome = key
+            group = ("external", f"{provider}.{operation}")
+        grouped.setdefault(group, []).append(entry)
+        if outcome == "failure":
+            failures[group] = failures.get(group, 0.0) + entry["count"]
+    sections: dict[str, dict] = {"stages": {}, "external": {}}
+    for (section, name), entries in sorted(grouped.items()):
+        sections[section][name] = summarize_histograms(entries, failures.get((section, name), 0.0))
+    return sections
+
+
+HISTOGRAMS = ("pipeline_stage_duration_seconds", "external_call_duration_seconds")
+
+
+def make_photos(count: int, size: tuple[int, int] = (640, 480)) -> list[bytes]:
+    """서로 다른 테스트 JPEG 생성 (중복 제거에 걸리지 않도록 무작위 도형 배치)"""
+    from PIL import Image, ImageDraw
+
+    photos = []
+    for _ in range(count):
+        img = Image.new("RGB", size, tuple(random.randint(0, 255) for _ in range(3)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(12):
+            x0, y0 = random.randint(0, size[0]), random.randint(0, size[1])
+            x1, y1 = x0 + random.randint(20, size[0] // 2), y0 + random.randint(20, size[1] // 2)
+            draw.rectangle((x0, y0, x1, y1), fill=tuple(random.randint(0, 255) for _ in range(3)))
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=85)
+        photos.append(buffer.getvalue())
+    return photos
+
+
+class MemorySampler(threading.Thread):
+    """앱 프로세스 RSS 샘플링 (Linux /proc)"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_kb = 0
+        self._stop_event = threading.Event()
+
+    def _read_status(self, field: str) -> int:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1])
+        except (OSError, ValueError):
+            pass
+        return 0
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak_rss_kb = max(self.peak_rss_kb, self._read_status("VmRSS:"))
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        return {"peak_rss_mb": self.peak_rss_kb / 1024, "hwm_mb": self._read_status("VmHWM:") / 1024}
+
+
+class Journey:
+    """프로젝트 하나의 전체 흐름"""
+
+    def __init__(self, client: httpx.AsyncClient, photos: list[bytes], poll_interval: float):
+        self.client = client
+        self.photos = photos
+        self.poll_interval = poll_interval
+        self.timings: dict[str, float] = {}
+        self.errors: list[str] = []
+        self.final_status = None
+
+    async def _call(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.timings[name] = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    async def run(self, timeout: float):
+        start = time.perf_counter()
+        try:
+            project = (await self._call("create", "POST", "/api/v1/projects", json={})).json()
+            project_id = project["id"]
+            base = f"/api/v1/projects/{project_id}"
+
+            files = [("files", (f"photo_{i}.jpg", data, "image/jpeg")) for i, data in enumerate(self.photos)]
+            await self._call("upload", "POST", f"{base}/photos", files=files)
+            await self._call("narrative", "PUT", f"{base}/narrative", json={
+                "narrative": "친구들과 바닷가로 떠난 여름 여행", "style": "happy",
+            })
+            await self._call("analyze", "POST", f"{base}/analyze")
+            await self._call("generate", "POST", f"{base}/generate")
+
+            # 생성 완료까지 폴링 (status 엔드포인트 지연도 함께 수집)
+            generation_start = time.perf_counter()
+            status_latencies = []
+            while time.perf_counter() - generation_start < timeout:
+                poll_start = time.perf_counter()
+                response = await self.client.get(f"{base}/status")
+                status_latencies.append(time.perf_counter() - poll_start)
+                payload = response.json()
+                self.final_status = payload.get("status")
+                if self.final_status in TERMINAL_STATUSES:
+                    if self.final_status == "failed":
+                        self.errors.append(f"generation: {payload.get('message')}")
+                    break
+                await asyncio.sleep(self.poll_interval)
+            self.timings["generation"] = time.perf_counter() - generation_start
+            self.timings["status_polls"] = status_latencies
+
+            await self._call("delete", "DELETE", base)
+        except Exception as e:
+            self.errors.append(str(e))
+        self.timings["journey"] = time.perf_counter() - start
+
+
+async def run_level(
+    base_url: str, provider_url: str, concurrency: int, projects: int,
+    photos: list[bytes], poll_interval: float, timeout: float,
+) -> dict:
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await client.post(f"{provider_url}/_stats/reset")
+        # 앱 히스토그램은 프로세스 누적 -> 레벨 전후 차이만 사용
+        before = parse_histograms((await client.get("/metrics")).text, HISTOGRAMS)
+        semaphore = asyncio.Semaphore(concurrency)
+        journeys = [Journey(client, photos, poll_interval) for _ in range(projects)]
+
+        async def bounded(journey: Journey):
+            async with semaphore:
+                await journey.run(timeout)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(bounded(j) for j in journeys))
+        elapsed = time.perf_counter() - start
+        provider_stats = (await client.get(f"{provider_url}/_stats")).json()
+        after = parse_histograms((await client.get("/metrics")).text, HISTOGRAMS)
+
+    endpoints: dict[str, list[float]] = {}
+    for journey in journeys:
+        for name, value in journey.timings.items():
+            endpoints.setdefault(name, []).extend(value if isinstance(value, list) else [value])
+
+    completed = sum(1 for j in journeys if j.final_status == "completed" and not j.errors)
+    return {
+        "concurrency": concurrency,
+        "projects": projects,
+        "elapsed_s": elapsed,
+        "throughput_projects_per_min": completed / elapsed * 60 if elapsed else 0.0,
+        "completed": completed,
+        "failed": projects - completed,
+        "errors": sorted({e for j in journeys for e in j.errors})[:20],
+        "endpoints": {name: summarize(values) for name, values in endpoints.items()},
+        **latency_sections(histogram_delta(after, before)),
+        # 대역 서버가 주입한 오류 수 (지연은 설정값이라 보고하지 않음)
+        "provider_errors": {name: provider_stats[name]["errors"] for name in PROVIDERS},
+    }
+
+
+def _wait_for(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not start: {url}")
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    config = provider_config(args)
+    provider_url = f"http://127.0.0.1:{args.provider_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    providers = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.providers", "--port", str(args.provider_port),
+         "--config", json.dumps(config)],
+        cwd=BACKEND_DIR,
+    )
+    env = {
+        **os.environ,
+        "GOOGLE_VISION_API_KEY": "bench",
+        "GOOGLE_VISION_BASE_URL": f"{provider_url}/vision/v1",
+        "GROQ_API_KEY": "bench",
+        "GROQ_BASE_URL": f"{provider_url}/groq/openai/v1",
+        "REPLICATE_API_KEY": "bench",
+        "REPLICATE_BASE_URL": f"{provider_url}/replicate/v1",
+        # 외부 인프라 없이 실행
+        "AWS_S3_BUCKET": "",
+        "DEBUG": "False",
+    }
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.app_port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+    try:
+        _wait_for(f"{provider_url}/_stats")
+        _wait_for(f"{app_url}/health")
+
+        photos = make_photos(args.photos)
+        sampler = MemorySampler(app.pid)
+        sampler.start()
+        levels = []
+        for concurrency in args.concurrency:
+            projects = max(args.projects, concurrency)
+            print(f"== concurrency={concurrency} projects={projects}", flush=True)
+            result = asyncio.run(run_level(
+                app_url, provider_url, concurrency, projects, photos, args.poll_interval, args.timeout,
+            ))
+            levels.append(result)
+            print_level(result)
+        memory = sampler.stop()
+    finally:
+        app.terminate()
+        providers.terminate()
+        app.wait(timeout=10)
+        providers.wait(timeout=10)
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "label": args.label,
+        "config": {
+            "providers": config,
+            "photos": args.photos,
+            "poll_interval": args.poll_interval,
+        },
+        "memory": memory,
+        "levels": levels,
+    }
+
+
+def print_level(result: dict):
+    print(f"  throughput: {result['throughput_projects_per_min']:.1f} projects/min "
+          f"(completed {result['completed']}, failed {result['failed']})")
+    for section in ("endpoints", "stages", "external"):
+        for name, stats in result.get(section, {}).items():
+            print(f"  {section.rstrip('s'):<8} {name:<28} n={stats['count']:<5} "
+                  f"p50={stats['p50'] * 1000:8.1f}ms p95={stats['p95'] * 1000:8.1f}ms "
+                  f"p99={stats['p99'] * 1000:8.1f}ms")
+    for error in result["errors"]:
+        print(f"  error: {error}")
+
+
+def compare(base_path: Path, new_path: Path, threshold: float) -> int:
+    """두 결과 비교 - p95가 threshold 이상 느려지면 회귀로 보고 (종료 코드 1)"""
+    base = json.loads(base_path.read_text())
+    new = json.loads(new_path.read_text())
+    base_levels = {level["concurrency"]: level for level in base["levels"]}
+    regressions = 0
+
+    for level in new["levels"]:
+        old = base_levels.get(level["concurrency"])
+        if not old:
+            continue
+        print(f"== concurrency={level['concurrency']}")
+        old_tp, new_tp = old["throughput_projects_per_min"], level["throughput_projects_per_min"]
+        print(f"  throughput {old_tp:.1f} -> {new_tp:.1f} projects/min")
+        for name, stats in level["endpoints"].items():
+            old_stats = old["endpoints"].get(name)
+            if not old_stats or not old_stats["p95"]:
+                continue
+            change = stats["p95"] / old_stats["p95"] - 1
+            flag = "REGRESSION" if change > threshold else ""
+            regressions += bool(flag)
+            print(f"  {name:<14} p95 {old_stats['p95'] * 1000:8.1f}ms -> {stats['p95'] * 1000:8.1f}ms "
+                  f"({change:+.1%}) {flag}")
+
+    old_mem, new_mem = base["memory"]["peak_rss_mb"], new["memory"]["peak_rss_mb"]
+    print(f"peak memory {old_mem:.1f}MB -> {new_mem:.1f}MB")
+    return 1 if regressions else 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        parser = argparse.ArgumentParser(prog="run_load compare")
+        parser.add_argument("base", type=Path)
+        parser.add_argument("new", type=Path)
+        parser.add_argument("--threshold", type=float, default=0.10)
+        args = parser.parse_args(sys.argv[2:])
+        sys.exit(compare(args.base, args.new, args.threshold))
+
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 4, 16])
+    parser.add_argument("--projects", type=int, default=16, help="projects per concurrency level")
+    parser.add_argument("--photos", type=int, default=4, help="photos per project")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--provider-port", type=int, default=9100)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", type=Path)
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}{'-' + args.label if args.label else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"saved {output}")
+
+
+if __name__ == "__main__":
+    main()
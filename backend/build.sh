@@ -20,5 +20,13 @@ cd ../backend
 rm -rf static
 cp -r ../frontend/dist static
 
+echo "=== Precompressing static assets ==="
+find static -type f \( -name '*.html' -o -name '*.js' -o -name '*.css' -o -name '*.svg' -o -name '*.json' \) \
+  -exec gzip -k -9 -n {} \;
+if command -v brotli >/dev/null 2>&1; then
+  find static -type f \( -name '*.html' -o -name '*.js' -o -name '*.css' -o -name '*.svg' -o -name '*.json' \) \
+    -exec brotli -k -q 11 {} \;
+fi
+
 echo "=== Build complete ==="
 ls -la static/
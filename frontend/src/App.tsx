@@ -14,19 +14,30 @@ export default function App() {
   const [narrative, setNarrative] = useState('');
   const [style, setStyle] = useState('emotional');
   const [projectId, setProjectId] = useState<string | null>(null);
-  const [status, setStatus] = useState({ status: 'draft', progress: 0, message: '' });
+  const [status, setStatus] = useState<{
+    status: string;
+    progress: number;
+    message: string;
+    upgrading?: boolean;
+    eta_seconds?: number | null;
+  }>(
+    { status: 'draft', progress: 0, message: '' }
+  );
   const [videoUrl, setVideoUrl] = useState<string | null>(null);
+  // 서버가 남은 시간에 맞춰 권장하는 폴링 간격
+  const [pollInterval, setPollInterval] = useState(2000);
   const [error, setError] = useState<string | null>(null);
 
-  // 상태 폴링
+  // 상태 폴링 (초안 완료 후 full 품질로 교체되는 동안에도 계속)
   useEffect(() => {
     let interval: ReturnType<typeof setInterval>;
 
-    if (projectId && (status.status === 'analyzing' || status.status === 'generating')) {
+    if (projectId && (status.status === 'analyzing' || status.status === 'generating' || status.upgrading)) {
       interval = setInterval(async () => {
         try {
           const statusData = await api.getGenerationStatus(projectId);
           setStatus(statusData);
+          setPollInterval((statusData.poll_interval_seconds ?? 2) * 1000);
 
           if (statusData.status === 'completed' && statusData.video_url) {
             setVideoUrl(statusData.video_url);
@@ -37,11 +48,11 @@ export default function App() {
         } catch (err) {
           console.error('Status polling error:', err);
         }
-      }, 2000);
+      }, pollInterval);
     }
 
     return () => clearInterval(interval);
-  }, [projectId, status.status]);
+  }, [projectId, status.status, status.upgrading, pollInterval]);
 
   const handleNext = async () => {
     if (step === 'upload' && photos.length >= 3) {
@@ -188,6 +199,7 @@ export default function App() {
               status={status.status}
               progress={status.progress}
               message={status.message}
+              etaSeconds={status.eta_seconds}
             />
 
             {error && (
@@ -12,6 +12,10 @@ export interface Project {
   photo_count: number;
   narrative: string | null;
   video_url: string | null;
+  hls_url?: string | null;
+  thumbnail_url?: string | null;
+  storyboard_url?: string | null;
+  poster_urls?: string[];
   created_at: string;
   completed_at: string | null;
 }
@@ -23,6 +27,7 @@ export interface PhotoAnalysis {
   mood: string;
   colors: string[];
   key_elements: string[];
+  duplicate_of?: string | null;
 }
 
 export interface AnalysisResult {
@@ -31,6 +36,7 @@ export interface AnalysisResult {
   overall_theme: string;
   suggested_narrative_arc: string;
   emotional_journey: string[];
+  duplicate_groups?: string[][];
 }
 
 export interface GenerationStatus {
@@ -39,6 +45,14 @@ export interface GenerationStatus {
   progress: number;
   message: string;
   video_url: string | null;
+  hls_url?: string | null;
+  quality?: 'full' | 'draft' | null;
+  upgrading?: boolean;
+  eta_seconds?: number | null;
+  eta_p90_seconds?: number | null;
+  eta_confidence?: 'low' | 'medium' | 'high' | null;
+  estimated_completion_at?: string | null;
+  poll_interval_seconds?: number;
 }
 
 // API 함수들
@@ -4,15 +4,20 @@ interface ProgressIndicatorProps {
   status: string;
   progress: number;
   message: string;
+  etaSeconds?: number | null;
 }
 
+// 남은 시간 표시 (예: "약 3분 남음")
+const formatEta = (seconds: number) =>
+  seconds < 60 ? `약 ${Math.max(Math.round(seconds), 1)}초 남음` : `약 ${Math.round(seconds / 60)}분 남음`;
+
 const STEPS = [
   { key: 'upload', label: '사진 업로드', icon: ImageIcon },
   { key: 'analyze', label: 'AI 분석', icon: Sparkles },
   { key: 'generate', label: '영상 생성', icon: Film },
 ];
 
-export default function ProgressIndicator({ status, progress, message }: ProgressIndicatorProps) {
+export default function ProgressIndicator({ status, progress, message, etaSeconds }: ProgressIndicatorProps) {
   const getStepStatus = (stepKey: string) => {
     if (status === 'completed') return 'completed';
     if (status === 'failed') return 'failed';
@@ -110,6 +115,7 @@ export default function ProgressIndicator({ status, progress, message }: Progres
           <div className="flex items-center justify-center gap-2 text-blue-600">
             <Loader2 className="w-5 h-5 animate-spin" />
             <span className="font-medium">{message}</span>
+            {etaSeconds != null && <span className="text-sm text-gray-500">({formatEta(etaSeconds)})</span>}
           </div>
         )}
         {status === 'analyzing' && (